@@ -1,15 +1,32 @@
 import os
 import json
+import argparse
+import time
 import asyncio
 import aiofiles
-import psycopg2
 from datetime import datetime
 from tqdm.asyncio import tqdm
 from dotenv import load_dotenv
 import re
+import sys
 import hashlib
+import threading
+from functools import lru_cache
 from datetime import timezone
-from transformers import pipeline
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.leak_detector import LeakDetector
+from common.entity_extractor import EntityExtractor, DICTIONARY_DIR
+from common.metrics import Metrics
+from classification_cache import ClassificationCache
+from watermarks import WatermarkStore, entry_fingerprint
+from incident_writer import IncidentWriter, content_hash
+from json_stream import iter_json_entries
+from near_duplicates import NearDuplicateIndex
+from cascade import Cascade, combine_confidence, decide, observed_model_range, SKIP, REVIEW
+import classifier as model_backend
+from classifier import CANDIDATE_LABELS, HYPOTHESIS_TEMPLATE, BATCH_SIZE
 
 # Загрузка конфигурации из .env
 load_dotenv()
@@ -27,31 +44,97 @@ class Config:
             if getattr(self, var) is None:
                 raise ValueError(f"Environment variable {var} is not set in .env")
 
+        self.MODEL_NAME = os.getenv('MODEL_NAME', 'distilbert-base-multilingual-cased')
+        self.CACHE_SIZE = int(os.getenv('CLASSIFICATION_CACHE_SIZE', 50000))
+        self.DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 4))
+        self.CLASSIFIER_URL = os.getenv('CLASSIFIER_URL', 'http://127.0.0.1:8765')
+        self.CLASSIFIER_BACKEND = os.getenv('CLASSIFIER_BACKEND', 'pipeline')
+        self.AGENT_WORKERS = int(os.getenv('AGENT_WORKERS', 1))
+        self.STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 256))
+        # off — без каскада (решения совпадают с полным прогоном), "min,max" — заданный диапазон оценок,
+        # auto — диапазон по кэшу классификации: оценка вне него может изменить решение
+        self.CASCADE_MODEL_RANGE = os.getenv('CASCADE_MODEL_RANGE', 'off')
+        self.NEAR_DUP_DISTANCE = int(os.getenv('NEAR_DUP_DISTANCE', 6))
+        # Каталог словарей сущностей: geo.txt и organizations.txt
+        self.ENTITY_DICTIONARY_DIR = os.getenv('ENTITY_DICTIONARY_DIR', str(DICTIONARY_DIR))
+
     @staticmethod
     def get_output_dirs():
         script_dir = os.path.dirname(os.path.abspath(__file__))
         return {
             'PROCESSED_DIR': os.path.join(script_dir, 'processed'),
-            'REVIEW_DIR': os.path.join(script_dir, 'to_review')
+            'REVIEW_DIR': os.path.join(script_dir, 'to_review'),
+            'CACHE_DIR': os.path.join(script_dir, 'cache'),
+            'STATE_DIR': os.path.join(script_dir, 'state')
         }
 
 config = Config()
 
-# Инициализация DistilBERT
-try:
-    classifier = pipeline(
-        "zero-shot-classification",
-        model="distilbert-base-multilingual-cased",
-        device=-1,
-        batch_size=16
-    )
-    print("DistilBERT initialized successfully")
-except Exception as e:
-    print(f"Failed to initialize DistilBERT: {str(e)}")
-    classifier = None
+# Модель подключается лениво: прогон без новых записей не импортирует transformers
+classifier = None
+classifier_lock = threading.Lock()
+
+def get_classifier():
+    global classifier
+    if classifier is None:
+        classifier = model_backend.connect(config.MODEL_NAME, config.CLASSIFIER_URL, config.CLASSIFIER_BACKEND, config.AGENT_WORKERS)
+    return classifier
 
 TRUSTED_SOURCES = {'gazeta.ru', 't.me/dataleak'}
 
+ANALYSIS_PATTERNS = {
+    "credentials": r'\b(пароль|password|ключ|token|секрет|auth)\b',
+    "personal": r'\b(почта|email|телефон|имя|фамилия|адрес|ФИО|СНИЛС|паспорт)\b',
+    "financial": r'\b(карта|счёт|банковские|кредит|платёж|аккаунты)\b',
+    "health": r'\b(здоровье|диагноз|лечение|больница|пациент)\b',
+    "intellectual_property": r'\b(патент|авторское право|исходный код)\b',
+    "volume": r'\b(\d+\s*(тыс\.|тысяч|млн|миллион|Гб|Gb))\b',
+    "leak": r'\b(утечка|слив|хакер|взлом|leak|breach|доступ)\b'
+}
+DETECTOR = LeakDetector(ANALYSIS_PATTERNS, lowercase=True)
+
+# Организации и география ищутся по словарям одним проходом автомата
+ENTITIES = EntityExtractor.from_directory(config.ENTITY_DICTIONARY_DIR, categories=('geo', 'organizations'))
+PROPER_NAME_RE = re.compile(r'\b[А-Я][а-я]+\b')
+MANAGEMENT_COMPANY_RE = re.compile(r'\bУК [А-Я][а-я]+(?: [А-Я][а-я]+)*\b')
+
+# Версия правил меняется вместе с шаблонами, поэтому кэш не нужно сбрасывать вручную
+RULES_VERSION = hashlib.sha1(json.dumps(
+    [ANALYSIS_PATTERNS, PROPER_NAME_RE.pattern, ENTITIES.version, sorted(TRUSTED_SOURCES), CANDIDATE_LABELS, HYPOTHESIS_TEMPLATE],
+    ensure_ascii=False
+).encode('utf-8')).hexdigest()[:12]
+
+classification_cache = ClassificationCache(
+    os.path.join(Config.get_output_dirs()['CACHE_DIR'], 'classification_cache.json'),
+    version=f"{config.MODEL_NAME}:{config.CLASSIFIER_BACKEND}:{RULES_VERSION}",
+    max_entries=config.CACHE_SIZE
+)
+
+def build_cascade():
+    if config.CASCADE_MODEL_RANGE == 'off':
+        return Cascade(enabled=False)
+    if config.CASCADE_MODEL_RANGE == 'auto':
+        model_min, model_max = observed_model_range(
+            value.get('model_confidence') for value in classification_cache.entries.values()
+        )
+    else:
+        model_min, model_max = (float(x) for x in config.CASCADE_MODEL_RANGE.split(','))
+    return Cascade(model_min, model_max)
+
+cascade = build_cascade()
+
+near_duplicates = NearDuplicateIndex(
+    os.path.join(Config.get_output_dirs()['STATE_DIR'], 'near_duplicates.json'),
+    max_distance=config.NEAR_DUP_DISTANCE
+)
+dedup_stats = {"entries": 0, "duplicates": 0}
+
+incident_writer = IncidentWriter(config, max_connections=config.DB_POOL_SIZE)
+
+watermarks = WatermarkStore(os.path.join(Config.get_output_dirs()['STATE_DIR'], 'watermarks.json'))
+
+metrics = Metrics('ai_agent', Config.get_output_dirs()['STATE_DIR'])
+
 def extract_text(entry):
     for field in ['content', 'snippet', 'title', 'description']:
         if field in entry and isinstance(entry[field], str) and len(entry[field].strip()) >= 5:
@@ -59,19 +142,87 @@ def extract_text(entry):
     print(f"Invalid entry: no valid text field found in {json.dumps(entry, ensure_ascii=False)}")
     return None
 
-def determine_type_and_analysis(text, source):
-    analysis = {
-        "credentials": bool(re.search(r'\b(пароль|password|ключ|token|секрет|auth)\b', text, re.IGNORECASE)),
-        "personal": bool(re.search(r'\b(почта|email|телефон|имя|фамилия|адрес|ФИО|СНИЛС|паспорт)\b', text, re.IGNORECASE)),
-        "financial": bool(re.search(r'\b(карта|счёт|банковские|кредит|платёж|аккаунты)\b', text, re.IGNORECASE)),
-        "health": bool(re.search(r'\b(здоровье|диагноз|лечение|больница|пациент)\b', text, re.IGNORECASE)),
-        "intellectual_property": bool(re.search(r'\b(патент|авторское право|исходный код)\b', text, re.IGNORECASE)),
-        "volume": bool(re.search(r'\b(\d+\s*(тыс\.|тысяч|млн|миллион|Гб|Gb))\b', text, re.IGNORECASE)),
-        "leak": bool(re.search(r'\b(утечка|слив|хакер|взлом|leak|breach|доступ)\b', text, re.IGNORECASE))
-    }
+def classify_texts(texts):
+    """Пакетная классификация DistilBERT: {текст: уверенность модели в утечке}.
+
+    Повторяющиеся тексты оцениваются один раз, а уникальные сортируются по длине,
+    чтобы в одном батче оказывались тексты близкой длины и паддинг был минимальным.
+    """
+    unique_texts = sorted(set(texts), key=len)
+    if not unique_texts:
+        return {}
+    # Парсеры обрабатываются параллельно, а модель одна: батчи идут в неё по очереди
+    with classifier_lock:
+        return _classify_unique(unique_texts, len(texts))
+
+def _classify_unique(unique_texts, total):
+    global classifier
+    scores = {}
+    chunks = [unique_texts[start:start + BATCH_SIZE] for start in range(0, len(unique_texts), BATCH_SIZE)]
+    batches = 0
+    metrics.inc('model_texts', len(unique_texts))
+    metrics.inc('model_batches', len(chunks))
+    try:
+        pooled = hasattr(get_classifier(), 'score_many')
+    except Exception as e:
+        # Пул или клиент сервиса не поднялся — считаем в процессе
+        print(f"Classifier backend failed to start, loading model in-process: {str(e)}")
+        classifier = model_backend.LocalClassifier(config.MODEL_NAME, config.CLASSIFIER_BACKEND)
+        pooled = False
+    if pooled:
+        # Параллельный режим: батчи распределяются по процессам пула
+        try:
+            for chunk, chunk_scores in zip(chunks, classifier.score_many(chunks)):
+                if chunk_scores is None:
+                    continue
+                scores.update(zip(chunk, chunk_scores))
+                batches += 1
+        except Exception as e:
+            print(f"Classifier pool failed: {str(e)}")
+        print(f"DistilBERT: scored {len(scores)} of {len(unique_texts)} unique texts (of {total}) in {batches} of {len(chunks)} batches on {classifier.workers} workers")
+        return scores
+
+    for chunk in chunks:
+        if getattr(classifier, 'failed', False):
+            # Модель не загрузилась: остальные тексты получают оценку по умолчанию, как без модели
+            print("DistilBERT is unavailable, using default confidence for the remaining texts")
+            break
+        try:
+            backend = get_classifier()
+            try:
+                chunk_scores = backend.score(chunk)
+            except OSError as e:
+                if backend.name != "remote":
+                    raise
+                # Сервис упал посреди прогона — дальше считаем в процессе
+                print(f"Classifier service failed, loading model in-process: {str(e)}")
+                classifier = model_backend.LocalClassifier(config.MODEL_NAME, config.CLASSIFIER_BACKEND)
+                chunk_scores = classifier.score(chunk)
+            scores.update(zip(chunk, chunk_scores))
+            batches += 1
+        except Exception as e:
+            print(f"DistilBERT failed on batch of {len(chunk)} texts: {str(e)}")
+
+    print(f"DistilBERT: scored {len(scores)} of {len(unique_texts)} unique texts (of {total}) in {batches} of {len(chunks)} batches")
+    return scores
+
+def is_trusted_source(source):
+    return any(s in source.lower() for s in TRUSTED_SOURCES)
+
+def entry_source(entry, parser_id, file_path):
+    return entry.get('url', entry.get('link', f"{parser_id}/{os.path.basename(file_path)}"))
+
+def cache_key(text, source):
+    return classification_cache.key(text, is_trusted_source(source))
+
+@lru_cache(maxsize=4096)
+def rule_analysis(text):
+    # Результат правил зависит только от текста; кэш избавляет от повторного прогона
+    # регулярных выражений при отборе текстов для модели и при обработке записи
+    analysis = DETECTOR.analyze(text)
 
-    # Расширенный паттерн для сервисов
-    has_service = bool(re.search(r'\b(УК [А-Я][а-я]+(?: [А-Я][а-я]+)*|Газета\.Ru|Московский институт психоанализа|4Chan|Steam|ЦАМ|ПРАВОКАРД|[А-Я][а-я]+(?: [А-Я][а-я]+)*)\b', text))
+    # Сервис: имя собственное в тексте или организация из словаря
+    has_service = bool(PROPER_NAME_RE.search(text)) or bool(ENTITIES.find(text, ('organizations',)))
 
     # Упрощённое условие утечки
     is_leak = analysis["leak"] or (has_service and any(analysis[key] for key in ["credentials", "personal", "financial", "health", "intellectual_property"]))
@@ -79,27 +230,6 @@ def determine_type_and_analysis(text, source):
     # Исключение обобщённых утверждений
     if not has_service and analysis["volume"] and not any(analysis[key] for key in ["credentials", "personal", "financial", "health", "intellectual_property"]):
         is_leak = False
-        analysis["leak"] = False
-
-    # DistilBERT
-    model_confidence = 0.5
-    if classifier:
-        try:
-            result = classifier(text, candidate_labels=["утечка", "не утечка"], hypothesis_template="Этот текст указывает на {}.", multi_label=False)
-            model_is_leak = result["labels"][0] == "утечка"
-            model_confidence = result["scores"][0] if model_is_leak else 1 - result["scores"][0]
-            print(f"DistilBERT: label={result['labels'][0]}, score={result['scores'][0]}")
-        except Exception as e:
-            print(f"DistilBERT failed: {str(e)}")
-
-    # Confidence
-    confidence = 0.9 if any(s in source.lower() for s in TRUSTED_SOURCES) else 0.7
-    if is_leak or model_confidence > 0.7:
-        confidence = min(confidence + 0.2, 1.0)
-    if analysis["volume"]:
-        confidence = min(confidence + 0.1, 1.0)
-    confidence = (confidence + model_confidence) / 2
-    print(f"Analysis: {analysis}, Confidence: {confidence}")
 
     # Тип утечки
     if analysis["credentials"]:
@@ -116,12 +246,23 @@ def determine_type_and_analysis(text, source):
         leak_type = "Прочие данные"
 
     analysis["leak"] = is_leak
+    return leak_type, analysis
+
+def determine_type_and_analysis(text, source, model_confidence=0.5):
+    leak_type, analysis = rule_analysis(text)
+    analysis = dict(analysis)
+    confidence = combine_confidence(analysis["leak"], is_trusted_source(source), analysis["volume"], model_confidence)
+    print(f"Analysis: {analysis}, Confidence: {confidence}")
     return leak_type, analysis, confidence
 
+def early_decision(text, source):
+    _, analysis = rule_analysis(text)
+    return cascade.early_decision(analysis["leak"], is_trusted_source(source), analysis["volume"])
+
 def extract_entities(text):
-    geo_entities = re.findall(r'\b(Австралия|Санкт-Петербург|Москва|Россия)\b', text)
-    org_entities = re.findall(r'\b(УК [А-Я][а-я]+(?: [А-Я][а-я]+)*|Газета\.Ru|Московский институт психоанализа|4Chan|Steam|ЦАМ|ПРАВОКАРД)\b', text)
-    return list(set(geo_entities)), list(set(org_entities))
+    entities = ENTITIES.extract(text)
+    org_entities = entities['organizations'] + [m for m in dict.fromkeys(MANAGEMENT_COMPANY_RE.findall(text)) if m not in entities['organizations']]
+    return entities['geo'], org_entities
 
 def generate_recommendations(analysis, leak_type, geo_entities, org_entities):
     recommendations = []
@@ -178,30 +319,10 @@ def load_parser_configs():
             raise ValueError("Each parser in config.json must have 'id' and 'path' keys")
     return data
 
-def save_to_db(parser_id, entries):
+def save_to_db(parser_id, entries, attachments=()):
     try:
-        conn = psycopg2.connect(
-            host=config.DB_HOST,
-            port=config.DB_PORT,
-            dbname=config.DB_NAME,
-            user=config.DB_USER,
-            password=config.DB_PASSWORD
-        )
-        cursor = conn.cursor()
-        for entry in entries:
-            status = entry['status'] if entry['status'] in ['Новый', 'Подтверждён', 'Требует проверки'] else 'Новый'
-            cursor.execute('''
-                INSERT INTO incidents (type, source, status, description)
-                VALUES (%s, %s, %s, %s)
-            ''', (
-                entry['type'],
-                entry['source'],
-                status,
-                entry['description']
-            ))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with metrics.timer('db_write'):
+            incident_writer.write(entries, attachments)
     except Exception as e:
         print(f"Error saving to database: {str(e)}")
         raise
@@ -212,128 +333,283 @@ def is_valid_entry(entry):
 def generate_message_id(text):
     return int(hashlib.md5(text.encode('utf-8')).hexdigest(), 16) % 1000000
 
-async def process_single_file(file_path, parser_id):
+def fingerprint(entry, parser_id, file_path):
+    return entry_fingerprint(extract_text(entry), entry_source(entry, parser_id, file_path))
+
+async def stream_new_entries(file_path, parser_id, batch_size=None, present=None):
+    """Читает файл потоково и отдаёт пачки валидных записей, которых ещё нет в водяном знаке.
+
+    В present, если он передан, собираются отпечатки всех валидных записей файла.
+    """
+    batch_size = batch_size or config.STREAM_BATCH_SIZE
+    if not os.path.exists(file_path):
+        print(f"File {file_path} does not exist")
+        return
+
+    seen = watermarks.seen(parser_id)
+    total = new = 0
+    batch = []
+    try:
+        async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
+            async for entry in iter_json_entries(f, file_path):
+                total += 1
+                if not is_valid_entry(entry):
+                    continue
+                entry_fp = fingerprint(entry, parser_id, file_path)
+                if present is not None:
+                    present.add(entry_fp)
+                if entry_fp in seen:
+                    continue
+                new += 1
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+    except ValueError as e:
+        print(f"Invalid JSON in {file_path}: {str(e)}")
+        raise
+    except OSError as e:
+        print(f"Error reading {file_path}: {str(e)}")
+        raise
+    if batch:
+        yield batch
+    print(f"Found {new} new entries (of {total}) in {file_path}")
+
+def output_path(directory, prefix, parser_id, file_path, run_stamp):
+    # Каждый прогон пишет свой файл: прежние результаты не перечитываются и не перезаписываются
+    stem, ext = os.path.splitext(os.path.basename(file_path))
+    return os.path.join(directory, f"{prefix}_{parser_id}_{stem}_{run_stamp}{ext or '.json'}")
+
+async def write_output_file(path, source, timestamp, entries):
+    async with aiofiles.open(path, 'w', encoding='utf-8') as f:
+        await f.write(json.dumps({
+            "source": source,
+            "timestamp": timestamp,
+            "entries": entries
+        }, ensure_ascii=False, indent=2))
+
+def texts_for_model(entries, parser_id, file_path):
+    # Тексты без результата в кэше, которые правила не смогли решить сами
+    texts = []
+    for entry in entries:
+        text = extract_text(entry)
+        source = entry_source(entry, parser_id, file_path)
+        if cache_key(text, source) in classification_cache.entries:
+            continue
+        decision = early_decision(text, source)
+        cascade.count(decision)
+        if decision is None:
+            texts.append(text)
+    return texts
+
+def needs_model(cluster_id, is_representative, batch_representatives):
+    # Дубликат берёт оценку представителя; свою нужна, только если у кластера её нет
+    if is_representative or cluster_id in batch_representatives:
+        return is_representative
+    cluster = near_duplicates.decision(cluster_id)
+    return not cluster or cluster.get("model_confidence") is None
+
+def cluster_batch(entries, parser_id, file_path):
+    """Относит записи пачки к кластерам почти-дубликатов: [(cluster_id, представитель ли)]."""
+    clusters = []
+    for entry in entries:
+        text = extract_text(entry)
+        cluster_id = content_hash(entry_source(entry, parser_id, file_path), text)
+        clusters.append(near_duplicates.assign(text, cluster_id))
+    dedup_stats["entries"] += len(entries)
+    return clusters
+
+async def process_entries(file_path, parser_id, valid_entries, model_scores, timestamp, clusters=None):
+    """Классифицирует пачку записей, сохраняет её в БД и сдвигает водяной знак.
+
+    Почти-дубликаты не отправляются в модель: решение пересчитывается по оценке
+    модели представителя с учётом доверия к своему источнику. Дубликат
+    пропускается, только если пропуск — его собственное решение; при том же
+    статусе, что у представителя, источник привязывается к его инциденту,
+    иначе заводится свой инцидент. Возвращает списки записей (для processed_* и review_*).
+    """
+    processed_entries = []
+    needs_review_entries = []
+    db_entries = []
+    started = time.perf_counter()
+    attachments = []
+    # Решения представителей этой пачки: кластер -> {"incident", "status", "model_confidence"}
+    batch_decisions = {}
+    clusters = clusters or [(None, True)] * len(valid_entries)
+
+    for entry, (cluster_id, is_representative) in zip(valid_entries, clusters):
+        text = extract_text(entry)
+        source = entry_source(entry, parser_id, file_path)
+        key = cache_key(text, source)
+
+        representative = None
+        if not is_representative:
+            representative = batch_decisions.get(cluster_id) or near_duplicates.decision(cluster_id)
+            if representative and representative.get("model_confidence") is None:
+                representative = None
+
+        model_confidence = None
+        if representative:
+            dedup_stats["duplicates"] += 1
+            model_confidence = representative["model_confidence"]
+            leak_type, analysis, confidence = determine_type_and_analysis(text, source, model_confidence)
+        else:
+            cached = classification_cache.get(key)
+            if cached:
+                leak_type, analysis, confidence = cached['type'], cached['analysis'], cached['confidence']
+                model_confidence = cached.get('model_confidence')
+            elif text in model_scores:
+                model_confidence = model_scores[text]
+                leak_type, analysis, confidence = determine_type_and_analysis(text, source, model_confidence)
+                classification_cache.put(key, {
+                    "type": leak_type,
+                    "analysis": analysis,
+                    "confidence": confidence,
+                    "model_confidence": model_confidence
+                })
+            else:
+                # Решение правил без модели (каскад) либо модель недоступна
+                decision = early_decision(text, source)
+                if decision:
+                    leak_type, analysis = rule_analysis(text)
+                    analysis, confidence = dict(analysis), decision[1]
+                else:
+                    leak_type, analysis, confidence = determine_type_and_analysis(text, source)
+
+        status = decide(analysis["leak"], confidence)
+        if status == SKIP:
+            if is_representative:
+                batch_decisions[cluster_id] = {"incident": None, "status": SKIP, "model_confidence": model_confidence}
+            print(f"Skipping entry with low confidence: {text[:100]}...")
+            continue
+
+        if representative and representative["incident"] and representative["status"] == status:
+            attachments.append((representative["incident"], source))
+            near_duplicates.attach(cluster_id)
+            continue
+
+        geo_entities, org_entities = extract_entities(text)
+
+        recommendations = generate_recommendations(analysis, leak_type, geo_entities, org_entities)
+
+        description = (
+            f"Content: {text}\n"
+            f"Analysis: {json.dumps(analysis, ensure_ascii=False)}\n"
+            f"Confidence: {confidence:.2f}\n"
+            f"Entities: Geo: {', '.join(geo_entities) if geo_entities else 'None'}, Org: {', '.join(org_entities) if org_entities else 'None'}\n"
+            f"Recommendations:\n" + "\n".join(f"- {rec}" for rec in recommendations)
+        )
+
+        link = source
+        message_id = entry.get("message_id", generate_message_id(text))
+
+        output_entry = {
+            "date": timestamp,
+            "message_id": message_id,
+            "content": text,
+            "link": link,
+            "analysis": analysis,
+            "recommendations": recommendations
+        }
+
+        db_entry = {
+            "parser_id": parser_id,
+            "source": link,
+            "status": status,
+            "type": leak_type,
+            "description": description,
+            "content_hash": content_hash(link, text)
+        }
+
+        if status == REVIEW:
+            needs_review_entries.append(output_entry)
+        else:
+            processed_entries.append(output_entry)
+        db_entries.append(db_entry)
+        if is_representative:
+            batch_decisions[cluster_id] = {"incident": db_entry["content_hash"], "status": status, "model_confidence": model_confidence}
+
+    metrics.observe('analyze', time.perf_counter() - started)
+    metrics.inc('items_in', len(valid_entries))
+    metrics.inc('items_out', len(db_entries))
+
+    # Водяной знак и решения кластеров фиксируются только после коммита пачки в БД
+    if db_entries or attachments:
+        await asyncio.to_thread(save_to_db, parser_id, db_entries, attachments)
+    for cluster_id, cluster in batch_decisions.items():
+        if cluster_id is not None:
+            near_duplicates.decide(cluster_id, cluster["incident"], cluster["status"], cluster["model_confidence"])
+    watermarks.advance(parser_id, None, [fingerprint(entry, parser_id, file_path) for entry in valid_entries])
+
+    return processed_entries, needs_review_entries
+
+async def process_single_file(file_path, parser_id, valid_entries=None, model_scores=None):
     try:
         output_dirs = Config.get_output_dirs()
         os.makedirs(output_dirs['PROCESSED_DIR'], exist_ok=True)
         os.makedirs(output_dirs['REVIEW_DIR'], exist_ok=True)
 
-        if not os.path.exists(file_path):
-            print(f"File {file_path} does not exist")
-            return []
-
-        async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-            data = await f.read()
-        
-        try:
-            data = json.loads(data)
-        except json.JSONDecodeError as e:
-            print(f"Invalid JSON in {file_path}: {str(e)}")
-            return []
-
-        # Обработка разных структур
-        entries = []
-        if isinstance(data, list):
-            entries = data
-        elif isinstance(data, dict):
-            entries = data.get('entries', []) or data.get('Утечки информации', [])
-            if not entries:
-                entries = [data] if extract_text(data) else []
-        if not entries:
-            print(f"File {file_path} does not contain a valid list of entries: {json.dumps(data, ensure_ascii=False)[:500]}")
-            return []
-
-        valid_entries = [entry for entry in entries if is_valid_entry(entry)]
-        print(f"Found {len(valid_entries)} valid entries in {file_path}")
-        if not valid_entries:
-            return []
+        snapshot = None
+        present = None
+        if valid_entries is None:
+            snapshot = watermarks.snapshot(file_path)
+            if watermarks.is_unchanged(parser_id, snapshot):
+                print(f"No changes in {file_path} since last run")
+                return []
+            present = set()
+            batches = stream_new_entries(file_path, parser_id, present=present)
+        else:
+            batches = iter_batches(valid_entries)
 
         processed_entries = []
         needs_review_entries = []
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S%z")
-        
-        for entry in valid_entries:
-            text = extract_text(entry)
-            source = entry.get('url', entry.get('link', f"{parser_id}/{os.path.basename(file_path)}"))
-            
-            leak_type, analysis, confidence = determine_type_and_analysis(text, source)
-            
-            if not analysis["leak"] and confidence < 0.5:
-                print(f"Skipping entry with low confidence: {text[:100]}...")
-                continue
-
-            status = "Подтверждён" if confidence >= 0.85 else "Требует проверки"
-
-            geo_entities, org_entities = extract_entities(text)
-
-            recommendations = generate_recommendations(analysis, leak_type, geo_entities, org_entities)
-
-            description = (
-                f"Content: {text}\n"
-                f"Analysis: {json.dumps(analysis, ensure_ascii=False)}\n"
-                f"Confidence: {confidence:.2f}\n"
-                f"Entities: Geo: {', '.join(geo_entities) if geo_entities else 'None'}, Org: {', '.join(org_entities) if org_entities else 'None'}\n"
-                f"Recommendations:\n" + "\n".join(f"- {rec}" for rec in recommendations)
-            )
-
-            link = source
-            message_id = entry.get("message_id", generate_message_id(text))
-
-            output_entry = {
-                "date": timestamp,
-                "message_id": message_id,
-                "content": text,
-                "link": link,
-                "analysis": analysis,
-                "recommendations": recommendations
-            }
-
-            db_entry = {
-                "parser_id": parser_id,
-                "source": link,
-                "status": status,
-                "type": leak_type,
-                "description": description
-            }
-
-            if status == "Требует проверки":
-                needs_review_entries.append((output_entry, db_entry))
-            else:
-                processed_entries.append((output_entry, db_entry))
-
-        if processed_entries:
-            processed_path = os.path.join(
-                output_dirs['PROCESSED_DIR'],
-                f"processed_{parser_id}_{os.path.basename(file_path)}"
-            )
-            async with aiofiles.open(processed_path, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps({
-                    "source": file_path,
-                    "timestamp": timestamp,
-                    "entries": [entry[0] for entry in processed_entries]
-                }, ensure_ascii=False, indent=2))
-            save_to_db(parser_id, [entry[1] for entry in processed_entries])
-
-        if needs_review_entries:
-            review_path = os.path.join(
-                output_dirs['REVIEW_DIR'],
-                f"review_{parser_id}_{os.path.basename(file_path)}"
-            )
-            async with aiofiles.open(review_path, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps({
-                    "source": file_path,
-                    "timestamp": timestamp,
-                    "entries": [entry[0] for entry in needs_review_entries]
-                }, ensure_ascii=False, indent=2))
-            save_to_db(parser_id, [entry[1] for entry in needs_review_entries])
+        started_at = datetime.now(timezone.utc)
+        timestamp = started_at.strftime("%Y-%m-%dT%H:%M:%S%z")
+        run_stamp = started_at.strftime("%Y%m%dT%H%M%S%f")
+
+        try:
+            # Каждая пачка классифицируется и коммитится сразу, не дожидаясь конца файла
+            async for batch in batches:
+                clusters = cluster_batch(batch, parser_id, file_path)
+                batch_representatives = {cluster_id for cluster_id, is_representative in clusters if is_representative}
+                representatives = [
+                    entry for entry, (cluster_id, is_representative) in zip(batch, clusters)
+                    if needs_model(cluster_id, is_representative, batch_representatives)
+                ]
+                if model_scores is not None:
+                    batch_scores = model_scores
+                else:
+                    with metrics.timer('model'):
+                        # Модель считает в отдельном потоке, цикл событий тем временем пишет файлы и БД
+                        batch_scores = await asyncio.to_thread(classify_texts, texts_for_model(representatives, parser_id, file_path))
+                processed, needs_review = await process_entries(file_path, parser_id, batch, batch_scores, timestamp, clusters)
+                processed_entries.extend(processed)
+                needs_review_entries.extend(needs_review)
+        finally:
+            # Уже закоммиченные пачки попадают в файлы, даже если дальше случилась ошибка
+            if processed_entries:
+                processed_path = output_path(output_dirs['PROCESSED_DIR'], 'processed', parser_id, file_path, run_stamp)
+                await write_output_file(processed_path, file_path, timestamp, processed_entries)
+
+            if needs_review_entries:
+                review_path = output_path(output_dirs['REVIEW_DIR'], 'review', parser_id, file_path, run_stamp)
+                await write_output_file(review_path, file_path, timestamp, needs_review_entries)
+
+        # Файл дочитан и все пачки закоммичены — запоминаем его состояние
+        if snapshot:
+            watermarks.advance(parser_id, snapshot, [], present=present)
 
         print(f"Processed {file_path}: {len(processed_entries)} confirmed, {len(needs_review_entries)} for review")
-        return [entry[0] for entry in processed_entries + needs_review_entries]
+        return processed_entries + needs_review_entries
 
     except Exception as e:
         print(f"Error processing {file_path}: {str(e)}")
         return []
 
+async def iter_batches(entries):
+    for start in range(0, len(entries), config.STREAM_BATCH_SIZE):
+        yield entries[start:start + config.STREAM_BATCH_SIZE]
+
 async def process_parser(parser_config):
     parser_id = parser_config['id']
     file_path = parser_config['path']
@@ -343,19 +619,53 @@ async def process_parser(parser_config):
     print(f"Обработано {len(results)} записей для парсера {parser_id}")
     return results
 
-async def main():
+async def main(parser_ids=None):
     parser_configs = load_parser_configs()
+    if parser_ids:
+        # Планировщик запускает агента отдельно для каждого завершившегося парсера
+        unknown = set(parser_ids) - {parser['id'] for parser in parser_configs}
+        if unknown:
+            print(f"Парсеры не найдены в config.json: {', '.join(sorted(unknown))}")
+        parser_configs = [parser for parser in parser_configs if parser['id'] in parser_ids]
     all_results = []
-    
-    tasks = [process_parser(parser_config) for parser_config in parser_configs]
-    for f in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Processing all parsers"):
-        result = await f
-        all_results.extend(result)
 
+    tasks = [process_parser(parser_config) for parser_config in parser_configs]
+    with metrics.timer('total'):
+        for f in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Processing all parsers"):
+            result = await f
+            all_results.extend(result)
+
+    classification_cache.save()
+    near_duplicates.save()
+    incident_writer.close()
+    if hasattr(classifier, 'close'):
+        classifier.close()
+    print(f"Classification cache: {classification_cache.stats()}")
+    print(f"Cascade: {cascade.stats()}")
+    dedup_ratio = dedup_stats["duplicates"] / dedup_stats["entries"] if dedup_stats["entries"] else 0.0
+    print(f"Near-duplicates: {dedup_stats['duplicates']} of {dedup_stats['entries']} entries (dedup ratio {dedup_ratio:.3f})")
+    print(f"DB writer: {incident_writer.stats()}")
+    metrics.update('cache', classification_cache.stats())
+    metrics.update('cascade', cascade.stats())
+    metrics.update('near_dup', dict(dedup_stats, ratio=dedup_ratio))
+    metrics.update('db', incident_writer.stats())
+    metrics.write(f"Найдено {len(all_results)}")
     print(f"Обработка завершена. Найдено {len(all_results)} подозрительных или подтверждённых утечек")
     return all_results
 
+def parse_args():
+    arg_parser = argparse.ArgumentParser(description="Классификация результатов парсеров")
+    arg_parser.add_argument("--parser", action="append", dest="parsers", metavar="ID",
+                            help="обработать только указанный парсер из config.json (можно повторять)")
+    return arg_parser.parse_args()
+
 if __name__ == "__main__":
-    print("Запуск обработки...")
-    results = asyncio.run(main())
+    args = parse_args()
+    if args.parsers:
+        # Метрики частичного прогона не должны затирать сводку полного
+        suffix = '_'.join(args.parsers)
+        metrics.component = f"ai_agent_{suffix}"
+        metrics.output_dir = os.path.join(metrics.output_dir, 'by_parser', suffix)
+    print("Запуск обработки..." + (f" Парсеры: {', '.join(args.parsers)}" if args.parsers else ""))
+    results = asyncio.run(main(args.parsers))
     print(f"Обработка завершена. Найдено {len(results)} записей. Данные сохранены в PostgreSQL и в diplom/ai-agent/processed, diplom/ai-agent/to_review.")
\ No newline at end of file
@@ -0,0 +1,82 @@
+SKIP = "skip"
+REVIEW = "Требует проверки"
+CONFIRMED = "Подтверждён"
+
+
+def combine_confidence(is_leak, trusted, volume, model_confidence):
+    # Итоговая уверенность: правила + оценка модели
+    confidence = 0.9 if trusted else 0.7
+    if is_leak or model_confidence > 0.7:
+        confidence = min(confidence + 0.2, 1.0)
+    if volume:
+        confidence = min(confidence + 0.1, 1.0)
+    return (confidence + model_confidence) / 2
+
+
+def decide(is_leak, confidence):
+    if not is_leak and confidence < 0.5:
+        return SKIP
+    return CONFIRMED if confidence >= 0.85 else REVIEW
+
+
+class Cascade:
+    """Каскад правило -> модель.
+
+    Уверенность не убывает с ростом оценки модели, а решение (пропуск, проверка,
+    подтверждение) не убывает с ростом уверенности. Поэтому если на обоих концах
+    диапазона оценок модели [model_min, model_max] решение одинаковое, модель
+    его уже не изменит и её можно не вызывать. При диапазоне [0, 1] каскад
+    никогда не срабатывает и поведение совпадает с полным прогоном.
+    """
+
+    def __init__(self, model_min=0.0, model_max=1.0, enabled=True):
+        self.model_min = model_min
+        self.model_max = model_max
+        self.enabled = enabled
+        self.early_accept = 0
+        self.early_reject = 0
+        self.model_calls = 0
+
+    def early_decision(self, is_leak, trusted, volume):
+        """Возвращает (решение, уверенность) без модели или None, если решает модель."""
+        if not self.enabled:
+            return None
+        low = decide(is_leak, combine_confidence(is_leak, trusted, volume, self.model_min))
+        high = decide(is_leak, combine_confidence(is_leak, trusted, volume, self.model_max))
+        if low != high:
+            return None
+        # Для отчёта берём нейтральную оценку модели, прижатую к диапазону
+        neutral = min(max(0.5, self.model_min), self.model_max)
+        return low, combine_confidence(is_leak, trusted, volume, neutral)
+
+    def count(self, decision):
+        if decision is None:
+            self.model_calls += 1
+        elif decision[0] == SKIP:
+            self.early_reject += 1
+        else:
+            self.early_accept += 1
+
+    def stats(self):
+        skipped = self.early_accept + self.early_reject
+        total = skipped + self.model_calls
+        return {
+            'model_range': [self.model_min, self.model_max],
+            'early_accept': self.early_accept,
+            'early_reject': self.early_reject,
+            'model_calls': self.model_calls,
+            'skipped_ratio': round(skipped / total, 3) if total else 0.0
+        }
+
+
+def observed_model_range(scores, min_samples=200, margin=0.02):
+    """Диапазон оценок модели по уже посчитанным значениям (например, из кэша классификации).
+
+    При малом числе наблюдений возвращает [0, 1], то есть каскад выключен.
+    Решения совпадают с полным прогоном только для оценок внутри диапазона,
+    поэтому агент использует его лишь при CASCADE_MODEL_RANGE=auto.
+    """
+    scores = [s for s in scores if s is not None]
+    if len(scores) < min_samples:
+        return 0.0, 1.0
+    return max(0.0, min(scores) - margin), min(1.0, max(scores) + margin)
@@ -0,0 +1,78 @@
+import os
+import json
+import hashlib
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    # Нормализация не должна менять результат регулярных выражений,
+    # поэтому только приводим Unicode к NFC и убираем крайние пробелы
+    return unicodedata.normalize('NFC', text).strip()
+
+
+class ClassificationCache:
+    """Дисковый кэш классификации с вытеснением LRU.
+
+    Ключ — SHA-256 от нормализованного текста, версии модели и правил, поэтому
+    при смене модели или регулярных выражений старые записи просто перестают
+    находиться и со временем вытесняются.
+    """
+
+    def __init__(self, path, version, max_entries=50000):
+        self.path = path
+        self.version = version
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load()
+
+    def key(self, text, *parts):
+        material = '\x1f'.join([self.version, normalize_text(text), *map(str, parts)])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = OrderedDict(data.get('entries', []))
+        except (OSError, ValueError) as e:
+            print(f"Classification cache {self.path} is unreadable, starting empty: {str(e)}")
+            self.entries = OrderedDict()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': list(self.entries.items())}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / total, 3) if total else 0.0
+        }
@@ -0,0 +1,186 @@
+import os
+import json
+import multiprocessing
+import urllib.request
+import urllib.error
+from concurrent.futures import ProcessPoolExecutor
+
+CANDIDATE_LABELS = ["утечка", "не утечка"]
+HYPOTHESIS_TEMPLATE = "Этот текст указывает на {}."
+BATCH_SIZE = 16
+
+# pipeline — исходный пайплайн transformers, quantized — динамическое int8-квантование
+# линейных слоёв torch, onnx — модель, экспортированная в ONNX Runtime через optimum
+BACKENDS = ("pipeline", "quantized", "onnx")
+ONNX_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'onnx')
+# У чекпойнта без обученной головы классификации (distilbert-base-*) голова создаётся
+# случайно: фиксированный seed делает её одинаковой во всех процессах, сервисе и прогонах
+HEAD_SEED = int(os.getenv('CLASSIFIER_SEED', '42'))
+
+
+def model_leak_confidence(result):
+    # Вероятность метки "утечка" из ответа zero-shot пайплайна
+    model_is_leak = result["labels"][0] == CANDIDATE_LABELS[0]
+    return result["scores"][0] if model_is_leak else 1 - result["scores"][0]
+
+
+class LocalClassifier:
+    """Zero-shot пайплайн в текущем процессе. Тяжёлые библиотеки импортируются только при первом вызове."""
+
+    name = "local"
+
+    def __init__(self, model_name, backend="pipeline"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown classifier backend '{backend}', expected one of {', '.join(BACKENDS)}")
+        self.model_name = model_name
+        self.backend = backend
+        self.pipeline = None
+        # Неудачная загрузка (нет сети и весов в кэше) не повторяется до конца прогона
+        self.failed = False
+
+    def _load_model(self):
+        if self.backend == "quantized":
+            import torch
+            from transformers import AutoModelForSequenceClassification
+            model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+            return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        if self.backend == "onnx":
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+            export_dir = os.path.join(ONNX_CACHE_DIR, self.model_name.replace('/', '__'))
+            if os.path.isdir(export_dir):
+                return ORTModelForSequenceClassification.from_pretrained(export_dir)
+            model = ORTModelForSequenceClassification.from_pretrained(self.model_name, export=True)
+            model.save_pretrained(export_dir)
+            return model
+        return self.model_name
+
+    def load(self):
+        if self.failed:
+            raise RuntimeError(f"model {self.model_name} failed to load earlier in this run")
+        if self.pipeline is None:
+            try:
+                from transformers import AutoTokenizer, pipeline, set_seed
+                set_seed(HEAD_SEED)
+                self.pipeline = pipeline(
+                    "zero-shot-classification",
+                    model=self._load_model(),
+                    tokenizer=AutoTokenizer.from_pretrained(self.model_name),
+                    device=-1,
+                    batch_size=BATCH_SIZE
+                )
+            except Exception:
+                self.failed = True
+                raise
+            print(f"DistilBERT initialized successfully (backend: {self.backend})")
+        return self.pipeline
+
+    def score(self, texts):
+        results = self.load()(list(texts), candidate_labels=CANDIDATE_LABELS, hypothesis_template=HYPOTHESIS_TEMPLATE, multi_label=False)
+        if isinstance(results, dict):
+            results = [results]
+        return [model_leak_confidence(result) for result in results]
+
+
+# Классификатор процесса-воркера пула: загружается один раз в инициализаторе
+_worker_classifier = None
+
+
+def _init_worker(model_name, backend, threads):
+    global _worker_classifier
+    try:
+        # Делим ядра между воркерами, иначе каждый torch займёт все ядра сразу
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_classifier = LocalClassifier(model_name, backend)
+    _worker_classifier.load()
+
+
+def _score_chunk(chunk):
+    try:
+        return _worker_classifier.score(chunk)
+    except Exception as e:
+        print(f"DistilBERT failed in worker {os.getpid()} on batch of {len(chunk)} texts: {str(e)}")
+        return None
+
+
+class PooledClassifier:
+    """Пул процессов, в каждом из которых своя копия модели.
+
+    Батчи раздаются воркерам через executor.map, поэтому результаты
+    возвращаются в порядке отправки. Для батча, который не удалось оценить,
+    вместо списка оценок возвращается None. Воркеры запускаются через
+    forkserver (или spawn), а не fork: агент к этому моменту уже многопоточный
+    (asyncio, потоки aiofiles и записи в БД), и fork такого процесса может
+    оставить в дочернем захваченные блокировки.
+    """
+
+    name = "pool"
+
+    def __init__(self, model_name, backend="pipeline", workers=2):
+        self.workers = workers
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(method),
+            initializer=_init_worker,
+            initargs=(model_name, backend, threads)
+        )
+        print(f"Classifier pool started: {workers} workers x {threads} threads (backend: {backend})")
+
+    def score(self, texts):
+        result = self.executor.submit(_score_chunk, list(texts)).result()
+        if result is None:
+            raise RuntimeError("worker failed to score batch")
+        return result
+
+    def score_many(self, chunks):
+        return list(self.executor.map(_score_chunk, chunks))
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class RemoteClassifier:
+    """Клиент резидентного сервиса classifier_service.py с уже прогретой моделью."""
+
+    name = "remote"
+
+    def __init__(self, url, timeout=120):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _request(self, path, payload=None, timeout=None):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(
+            self.url + path,
+            data=data,
+            headers={'Content-Type': 'application/json; charset=utf-8'}
+        )
+        with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+    def is_available(self, model_name, backend="pipeline"):
+        try:
+            health = self._request('/health', timeout=2)
+        except (OSError, ValueError):
+            return False
+        return health.get('status') == 'ok' and health.get('model') == model_name and health.get('backend', 'pipeline') == backend
+
+    def score(self, texts):
+        return self._request('/classify', {'texts': list(texts)})['scores']
+
+
+def connect(model_name, service_url=None, backend="pipeline", workers=1):
+    # Сначала пробуем резидентный сервис с той же моделью и бэкендом, иначе грузим модель в процессе
+    if service_url:
+        remote = RemoteClassifier(service_url)
+        if remote.is_available(model_name, backend):
+            print(f"Using classifier service at {service_url}")
+            return remote
+        print(f"Classifier service at {service_url} is unavailable, loading model in-process")
+    if workers > 1:
+        return PooledClassifier(model_name, backend, workers)
+    return LocalClassifier(model_name, backend)
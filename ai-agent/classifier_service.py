@@ -0,0 +1,78 @@
+import os
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from dotenv import load_dotenv
+
+from classifier import LocalClassifier, BATCH_SIZE
+
+# Резидентный сервис классификации: держит модель в памяти между запусками агента.
+# Запуск: python ai-agent/classifier_service.py
+
+load_dotenv()
+
+MODEL_NAME = os.getenv('MODEL_NAME', 'distilbert-base-multilingual-cased')
+HOST = os.getenv('CLASSIFIER_HOST', '127.0.0.1')
+PORT = int(os.getenv('CLASSIFIER_PORT', 8765))
+MAX_TEXTS = int(os.getenv('CLASSIFIER_MAX_TEXTS', 1024))
+BACKEND = os.getenv('CLASSIFIER_BACKEND', 'pipeline')
+
+classifier = LocalClassifier(MODEL_NAME, BACKEND)
+# Пайплайн не потокобезопасен, запросы к модели выполняются по очереди
+model_lock = threading.Lock()
+
+
+class ClassifierHandler(BaseHTTPRequestHandler):
+    def _send_json(self, code, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {"status": "ok", "model": MODEL_NAME, "backend": BACKEND, "batch_size": BATCH_SIZE})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != '/classify':
+            return self._send_json(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            texts = json.loads(self.rfile.read(length).decode('utf-8'))['texts']
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise ValueError("texts must be a list of strings")
+            if len(texts) > MAX_TEXTS:
+                raise ValueError(f"too many texts in one request (max {MAX_TEXTS})")
+        except (ValueError, KeyError) as e:
+            return self._send_json(400, {"error": str(e)})
+
+        try:
+            with model_lock:
+                scores = classifier.score(texts) if texts else []
+        except Exception as e:
+            print(f"DistilBERT failed: {str(e)}")
+            return self._send_json(500, {"error": str(e)})
+        self._send_json(200, {"scores": scores})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    classifier.load()
+    server = ThreadingHTTPServer((HOST, PORT), ClassifierHandler)
+    print(f"Classifier service ({MODEL_NAME}, {BACKEND}) listening on http://{HOST}:{PORT}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
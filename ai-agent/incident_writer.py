@@ -0,0 +1,137 @@
+import time
+import hashlib
+import threading
+from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.extras import execute_values
+
+VALID_STATUSES = ['Новый', 'Подтверждён', 'Требует проверки']
+
+SCHEMA_SQL = '''
+    ALTER TABLE incidents ADD COLUMN IF NOT EXISTS content_hash TEXT;
+    CREATE UNIQUE INDEX IF NOT EXISTS incidents_content_hash_key ON incidents (content_hash);
+    CREATE TABLE IF NOT EXISTS incident_sources (
+        incident_hash TEXT NOT NULL,
+        source TEXT NOT NULL,
+        discovered_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (incident_hash, source)
+    );
+'''
+
+INSERT_SQL = '''
+    INSERT INTO incidents (type, source, status, description, content_hash)
+    VALUES %s
+    ON CONFLICT (content_hash) DO NOTHING
+'''
+
+ATTACH_SQL = '''
+    INSERT INTO incident_sources (incident_hash, source)
+    VALUES %s
+    ON CONFLICT DO NOTHING
+'''
+
+
+def content_hash(source, text):
+    return hashlib.sha256(f"{source}\x1f{text}".encode('utf-8')).hexdigest()
+
+
+class IncidentWriter:
+    """Пакетная запись инцидентов в PostgreSQL через общий пул соединений.
+
+    Все строки одного вызова write уходят одним multi-row INSERT в одной
+    транзакции. Уникальный content_hash и ON CONFLICT DO NOTHING делают
+    повторный прогон агента идемпотентным. Методы блокирующие: из асинхронного
+    кода их нужно вызывать через asyncio.to_thread.
+    """
+
+    def __init__(self, config, max_connections=4, page_size=500):
+        self.config = config
+        self.max_connections = max_connections
+        self.page_size = page_size
+        self.pool = None
+        self.lock = threading.Lock()
+        self.rows_written = 0
+        self.rows_skipped = 0
+        self.seconds = 0.0
+
+    def _get_pool(self):
+        with self.lock:
+            if self.pool is None:
+                self.pool = ThreadedConnectionPool(
+                    1, self.max_connections,
+                    host=self.config.DB_HOST,
+                    port=self.config.DB_PORT,
+                    dbname=self.config.DB_NAME,
+                    user=self.config.DB_USER,
+                    password=self.config.DB_PASSWORD
+                )
+                self._ensure_schema()
+            return self.pool
+
+    def _ensure_schema(self):
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(SCHEMA_SQL)
+            conn.commit()
+        finally:
+            self.pool.putconn(conn)
+
+    @staticmethod
+    def _rows(entries):
+        rows = {}
+        for entry in entries:
+            status = entry['status'] if entry['status'] in VALID_STATUSES else 'Новый'
+            key = entry.get('content_hash') or content_hash(entry['source'], entry['description'])
+            rows.setdefault(key, (entry['type'], entry['source'], status, entry['description'], key))
+        return list(rows.values())
+
+    def write(self, entries, attachments=()):
+        """Записывает инциденты и дополнительные источники уже известных инцидентов.
+
+        attachments — пары (content_hash инцидента, источник) для почти-дубликатов.
+        """
+        rows = self._rows(entries)
+        attachments = list(dict.fromkeys(attachments))
+        if not rows and not attachments:
+            return 0
+
+        pool = self._get_pool()
+        started = time.perf_counter()
+        conn = pool.getconn()
+        try:
+            with conn.cursor() as cursor:
+                inserted = 0
+                for start in range(0, len(rows), self.page_size):
+                    execute_values(cursor, INSERT_SQL, rows[start:start + self.page_size], page_size=self.page_size)
+                    inserted += cursor.rowcount
+                for start in range(0, len(attachments), self.page_size):
+                    execute_values(cursor, ATTACH_SQL, attachments[start:start + self.page_size], page_size=self.page_size)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn)
+
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.rows_written += inserted
+            self.rows_skipped += len(rows) - inserted
+            self.seconds += elapsed
+        print(f"DB: inserted {inserted} of {len(rows)} rows, attached {len(attachments)} sources in {elapsed:.2f}s ({len(rows) / elapsed if elapsed else 0:.0f} rows/s)")
+        return inserted
+
+    def stats(self):
+        total = self.rows_written + self.rows_skipped
+        return {
+            'inserted': self.rows_written,
+            'duplicates': self.rows_skipped,
+            'seconds': round(self.seconds, 3),
+            'rows_per_sec': round(total / self.seconds, 1) if self.seconds else 0.0
+        }
+
+    def close(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.closeall()
+                self.pool = None
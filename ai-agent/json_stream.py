@@ -0,0 +1,169 @@
+import json
+
+# Ключи, под которыми парсеры складывают списки записей
+ENTRY_KEYS = ('entries', 'Утечки информации')
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson')
+WHITESPACE = ' \t\n\r'
+
+
+def is_jsonl(path):
+    return path.lower().endswith(JSONL_EXTENSIONS)
+
+
+class EntryStreamParser:
+    """Потоковый разбор файлов результатов парсеров.
+
+    Текст подаётся кусками через feed(), который возвращает уже полностью
+    прочитанные записи. Поддерживаются все формы, которые пишут парсеры:
+    список записей, {"entries": [...]}, {"Утечки информации": [...]}, одиночный
+    объект-запись, а также JSONL (одна запись на строку). В памяти держится
+    только непрочитанный хвост буфера, а не весь файл.
+    """
+
+    def __init__(self, jsonl=False, max_buffer=64 * 1024 * 1024):
+        self.decoder = json.JSONDecoder()
+        self.jsonl = jsonl
+        self.max_buffer = max_buffer
+        self.buffer = ''
+        self.pos = 0
+        self.final = False
+        # start -> array | object -> (object_array) -> done
+        self.state = 'start'
+        self.in_list_key = False
+        self.list_entries = 0
+        self.other = {}
+        self.line_number = 0
+
+    def feed(self, text):
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        if len(self.buffer) > self.max_buffer:
+            raise ValueError(f"JSON value exceeds {self.max_buffer} bytes")
+        return self._parse_jsonl() if self.jsonl else self._parse()
+
+    def close(self):
+        self.final = True
+        entries = self.feed('')
+        if self.jsonl:
+            return entries
+        if self.buffer[self.pos:].strip(WHITESPACE) or self.state not in ('done', 'start'):
+            raise ValueError("unexpected end of JSON data")
+        if self.state == 'done' and not self.list_entries and self.other:
+            # Ни одного списка записей: сам объект может быть записью
+            entries.append(self.other)
+        return entries
+
+    def _parse_jsonl(self):
+        entries = []
+        while True:
+            end = self.buffer.find('\n', self.pos)
+            if end == -1:
+                if not self.final:
+                    break
+                end = len(self.buffer)
+            line = self.buffer[self.pos:end].strip(WHITESPACE)
+            self.pos = min(end + 1, len(self.buffer))
+            self.line_number += 1
+            if line:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"line {self.line_number}: {e}") from e
+            if end >= len(self.buffer):
+                break
+        return entries
+
+    def _skip_ws(self):
+        while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+            self.pos += 1
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else None
+
+    def _decode(self):
+        # None — значение ещё не дочитано, нужно больше данных
+        try:
+            value, end = self.decoder.raw_decode(self.buffer, self.pos)
+        except json.JSONDecodeError:
+            if self.final:
+                raise
+            return None, False
+        if end == len(self.buffer) and not self.final and isinstance(value, (int, float)):
+            # Число на границе куска может продолжиться в следующем
+            return None, False
+        self.pos = end
+        return value, True
+
+    def _parse(self):
+        entries = []
+        while True:
+            char = self._skip_ws()
+            if char is None or self.state == 'done':
+                return entries
+
+            if self.state == 'start':
+                if char == '[':
+                    self.state = 'array'
+                elif char == '{':
+                    self.state = 'object'
+                else:
+                    raise ValueError(f"expected list or object, got {char!r}")
+                self.pos += 1
+
+            elif self.state in ('array', 'object_array'):
+                if char == ',':
+                    self.pos += 1
+                elif char == ']':
+                    self.pos += 1
+                    self.state = 'done' if self.state == 'array' else 'object'
+                else:
+                    value, ok = self._decode()
+                    if not ok:
+                        return entries
+                    if isinstance(value, dict):
+                        entries.append(value)
+                        self.list_entries += 1
+
+            elif self.state == 'object':
+                if char == ',':
+                    self.pos += 1
+                elif char == '}':
+                    self.pos += 1
+                    self.state = 'done'
+                elif char == '"':
+                    start = self.pos
+                    key, ok = self._decode()
+                    if not ok:
+                        return entries
+                    if self._skip_ws() is None:
+                        self.pos = start
+                        return entries
+                    if self.buffer[self.pos] != ':':
+                        raise ValueError(f"expected ':' after key {key!r}")
+                    self.pos += 1
+                    value_char = self._skip_ws()
+                    if value_char is None:
+                        self.pos = start
+                        return entries
+                    if key in ENTRY_KEYS and value_char == '[':
+                        self.pos += 1
+                        self.state = 'object_array'
+                        continue
+                    value, ok = self._decode()
+                    if not ok:
+                        self.pos = start
+                        return entries
+                    self.other[key] = value
+                else:
+                    raise ValueError(f"unexpected character {char!r} in object")
+
+
+async def iter_json_entries(file, path, chunk_size=64 * 1024):
+    """Асинхронно читает открытый через aiofiles файл и отдаёт записи по мере разбора."""
+    parser = EntryStreamParser(jsonl=is_jsonl(path))
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        for entry in parser.feed(chunk):
+            yield entry
+    for entry in parser.close():
+        yield entry
@@ -0,0 +1,131 @@
+import os
+import re
+import json
+import hashlib
+
+TOKEN_RE = re.compile(r'\w+')
+FINGERPRINT_BITS = 64
+
+
+def simhash(text, shingle_size=3):
+    """64-битный SimHash по словесным шинглам нормализованного текста."""
+    tokens = TOKEN_RE.findall(text.lower().replace('ё', 'е'))
+    if len(tokens) > shingle_size:
+        shingles = [' '.join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    else:
+        shingles = [' '.join(tokens)]
+
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(FINGERPRINT_BITS) if weights[bit] > 0)
+
+
+class NearDuplicateIndex:
+    """Индекс почти-дубликатов между запусками агента.
+
+    Каждый кластер описывается репрезентативным текстом: его решение (хэш
+    инцидента или пропуск, статус) и оценка модели переиспользуются для
+    похожих текстов. Решение зависит и от доверия к источнику, поэтому
+    дубликат пересчитывает его по оценке модели представителя. Поиск
+    соседей с расстоянием Хэмминга не больше max_distance идёт по корзинам:
+    отпечаток делится на max_distance + 1 полос, и по принципу Дирихле хотя бы
+    одна полоса у близких отпечатков совпадает точно.
+    """
+
+    def __init__(self, path, max_distance=6, max_fingerprints=200000):
+        self.path = path
+        self.max_distance = max_distance
+        self.max_fingerprints = max_fingerprints
+        self.bands = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.bands
+        self.fingerprints = {}
+        self.clusters = {}
+        self.buckets = {}
+        self.pending = set()
+        self.load()
+
+    def _band_keys(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(band, fingerprint >> (band * self.band_bits) & mask) for band in range(self.bands)]
+
+    def _index(self, fingerprint, cluster_id):
+        self.fingerprints[fingerprint] = cluster_id
+        for key in self._band_keys(fingerprint):
+            self.buckets.setdefault(key, set()).add(fingerprint)
+
+    def find(self, fingerprint):
+        # Возвращает идентификатор кластера ближайшего отпечатка или None
+        if fingerprint in self.fingerprints:
+            return self.fingerprints[fingerprint]
+        for key in self._band_keys(fingerprint):
+            for candidate in self.buckets.get(key, ()):
+                if bin(candidate ^ fingerprint).count('1') <= self.max_distance:
+                    return self.fingerprints[candidate]
+        return None
+
+    def assign(self, text, cluster_id):
+        """Относит текст к существующему кластеру или открывает новый с cluster_id.
+
+        Возвращает (идентификатор кластера, True если текст — новый представитель).
+        """
+        fingerprint = simhash(text)
+        existing = self.find(fingerprint)
+        if existing is not None:
+            if fingerprint not in self.fingerprints:
+                self._index(fingerprint, existing)
+            return existing, False
+        self._index(fingerprint, cluster_id)
+        self.clusters[cluster_id] = {"incident": None, "decided": False, "sources": 1}
+        self.pending.add(cluster_id)
+        return cluster_id, True
+
+    def decision(self, cluster_id):
+        cluster = self.clusters.get(cluster_id)
+        if not cluster or not cluster["decided"]:
+            return None
+        return cluster
+
+    def decide(self, cluster_id, incident_hash, status=None, model_confidence=None):
+        # Вызывается после коммита в БД: incident_hash None — представитель пропущен,
+        # model_confidence None — решение принято без модели
+        cluster = self.clusters[cluster_id]
+        cluster["incident"] = incident_hash
+        cluster["status"] = status
+        cluster["model_confidence"] = model_confidence
+        cluster["decided"] = True
+        self.pending.discard(cluster_id)
+
+    def attach(self, cluster_id):
+        self.clusters[cluster_id]["sources"] += 1
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Near-duplicate index {self.path} is unreadable, starting empty: {str(e)}")
+            return
+        self.clusters = data.get('clusters', {})
+        for fingerprint, cluster_id in data.get('fingerprints', []):
+            self._index(int(fingerprint, 16), cluster_id)
+
+    def save(self):
+        # Кластеры без решения (коммит не состоялся) не сохраняем
+        for cluster_id in self.pending:
+            self.clusters.pop(cluster_id, None)
+        fingerprints = [(f"{fp:016x}", cid) for fp, cid in self.fingerprints.items() if cid in self.clusters]
+        fingerprints = fingerprints[-self.max_fingerprints:]
+        live = {cid for _, cid in fingerprints}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'clusters': {cid: c for cid, c in self.clusters.items() if cid in live},
+                'fingerprints': fingerprints
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,111 @@
+import os
+import json
+import hashlib
+
+
+def entry_fingerprint(text, source):
+    return hashlib.sha1(f"{source}\x1f{text}".encode('utf-8')).hexdigest()[:16]
+
+
+class WatermarkStore:
+    """Водяные знаки обработанных записей по каждому парсеру.
+
+    Для парсера хранятся размер и mtime файла на момент последнего успешного
+    прогона (JSON в path) и отпечатки уже обработанных записей. Парсеры
+    по-разному пишут результаты (web и paste перезаписывают файл, github и
+    telegram дописывают), поэтому новые записи определяются по отпечаткам, а
+    не по смещению. Водяной знак сдвигается только вызовом advance после
+    коммита в БД.
+
+    Отпечатки загружаются в память один раз и дописываются в журнал
+    <каталог path>/fingerprints/<парсер>.log, поэтому сдвиг стоит O(пачки),
+    а не O(всей истории). После полного прохода по файлу отпечатки записей,
+    которых в файле больше нет, удаляются, и история не длиннее самого файла.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.log_dir = os.path.join(os.path.dirname(path), 'fingerprints')
+        self.parsers = {}
+        self.fingerprints = {}
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.parsers = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Watermarks {self.path} are unreadable, processing everything: {str(e)}")
+            self.parsers = {}
+            return
+        # Прежний формат держал отпечатки списком внутри JSON: переносим их в журналы
+        legacy = {parser_id: state.pop('fingerprints') for parser_id, state in self.parsers.items() if 'fingerprints' in state}
+        for parser_id, fingerprints in legacy.items():
+            self.fingerprints[parser_id] = set(fingerprints)
+            self._rewrite_log(parser_id)
+        if legacy:
+            self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.parsers, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _log_path(self, parser_id):
+        return os.path.join(self.log_dir, f"{parser_id}.log")
+
+    def _rewrite_log(self, parser_id):
+        os.makedirs(self.log_dir, exist_ok=True)
+        path = self._log_path(parser_id)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.writelines(fp + '\n' for fp in self.fingerprints[parser_id])
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def snapshot(file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return {'file_size': stat.st_size, 'file_mtime': stat.st_mtime_ns}
+
+    def is_unchanged(self, parser_id, snapshot):
+        state = self.parsers.get(parser_id)
+        if not state or not snapshot:
+            return False
+        return state.get('file_size') == snapshot['file_size'] and state.get('file_mtime') == snapshot['file_mtime']
+
+    def seen(self, parser_id):
+        """Множество отпечатков парсера. Возвращается без копии: только для чтения."""
+        if parser_id not in self.fingerprints:
+            try:
+                with open(self._log_path(parser_id), 'r', encoding='utf-8') as f:
+                    self.fingerprints[parser_id] = {line.strip() for line in f if line.strip()}
+            except OSError:
+                self.fingerprints[parser_id] = set()
+        return self.fingerprints[parser_id]
+
+    def advance(self, parser_id, snapshot, fingerprints, present=None):
+        """Дописывает новые отпечатки; с snapshot фиксирует состояние файла.
+
+        present — отпечатки всех записей файла после полного прохода: остальные
+        удаляются из истории.
+        """
+        known = self.seen(parser_id)
+        new = [fp for fp in dict.fromkeys(fingerprints) if fp not in known]
+        if new:
+            os.makedirs(self.log_dir, exist_ok=True)
+            with open(self._log_path(parser_id), 'a', encoding='utf-8') as f:
+                f.writelines(fp + '\n' for fp in new)
+            known.update(new)
+        if present is not None and len(known) > len(present):
+            known &= present
+            self._rewrite_log(parser_id)
+        if snapshot:
+            state = self.parsers.setdefault(parser_id, {})
+            state.update(snapshot, record_count=len(known))
+            self.save()
@@ -0,0 +1,102 @@
+"""Бенчмарк бэкендов классификатора ИИ-агента на корпусе ai-agent/to_review.
+
+Для каждого бэкенда (pipeline, quantized, onnx) измеряются время загрузки,
+задержка одного батча (p50/p95), пропускная способность и совпадение меток
+"утечка"/"не утечка" с исходным пайплайном.
+
+    python benchmarks/classifier_bench.py --backends pipeline quantized onnx
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.resolve()
+ROOT_DIR = BASE_DIR.parent
+sys.path.insert(0, str(ROOT_DIR / "ai-agent"))
+
+from classifier import LocalClassifier, BACKENDS, BATCH_SIZE
+
+CORPUS_GLOB = str(ROOT_DIR / "ai-agent" / "to_review" / "*.json")
+
+
+def load_corpus(pattern, limit=None):
+    texts = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            texts.extend(e["content"] for e in json.load(f).get("entries", []) if e.get("content"))
+    texts = list(dict.fromkeys(texts))
+    return texts[:limit] if limit else texts
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def run_backend(backend, model_name, texts):
+    classifier = LocalClassifier(model_name, backend)
+    started = time.perf_counter()
+    classifier.load()
+    load_seconds = time.perf_counter() - started
+
+    # Тексты сортируются по длине так же, как в ai_agent.classify_texts
+    ordered = sorted(texts, key=len)
+    scores = {}
+    latencies = []
+    started = time.perf_counter()
+    for start in range(0, len(ordered), BATCH_SIZE):
+        chunk = ordered[start:start + BATCH_SIZE]
+        batch_started = time.perf_counter()
+        scores.update(zip(chunk, classifier.score(chunk)))
+        latencies.append(time.perf_counter() - batch_started)
+    total_seconds = time.perf_counter() - started
+
+    return scores, {
+        "load_seconds": round(load_seconds, 2),
+        "batch_latency_p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "batch_latency_p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "texts_per_sec": round(len(texts) / total_seconds, 2)
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    arg_parser.add_argument("--model", default=os.getenv("MODEL_NAME", "distilbert-base-multilingual-cased"))
+    arg_parser.add_argument("--corpus", default=CORPUS_GLOB)
+    arg_parser.add_argument("--limit", type=int, default=None)
+    arg_parser.add_argument("--output", default=None, help="путь для JSON с результатами")
+    args = arg_parser.parse_args()
+
+    texts = load_corpus(args.corpus, args.limit)
+    print(f"Текстов в корпусе: {len(texts)}")
+    if not texts:
+        return
+
+    backends = ["pipeline"] + [b for b in args.backends if b != "pipeline"]
+    reference = None
+    results = {}
+    for backend in backends:
+        scores, metrics = run_backend(backend, args.model, texts)
+        if reference is None:
+            reference = scores
+        agreement = sum((scores[t] > 0.5) == (reference[t] > 0.5) for t in texts) / len(texts)
+        metrics["label_agreement"] = round(agreement, 4)
+        metrics["mean_abs_score_diff"] = round(statistics.fmean(abs(scores[t] - reference[t]) for t in texts), 4)
+        results[backend] = metrics
+        print(f"{backend}: {metrics}")
+
+    report = {"model": args.model, "texts": len(texts), "batch_size": BATCH_SIZE, "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Генератор синтетических текстов об утечках и нейтральных текстов на русском и английском.
+
+Тексты трёх видов повторяют то, что видят парсеры: news — новостные заметки
+(web_parser, telegram), paste — дампы и заметки с pastebin, code — файлы
+конфигурации и исходники с GitHub. Размер задаётся в символах, доля утечек —
+параметром leak_ratio. Генерация детерминирована по seed.
+
+    python benchmarks/corpus.py --count 1000 --size 1500 --output corpus.json
+"""
+import argparse
+import json
+import random
+import string
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.resolve()
+ROOT_DIR = BASE_DIR.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from common.entity_extractor import DICTIONARY_DIR, load_dictionary
+
+KINDS = ("news", "paste", "code")
+
+RU_LEAK_TEMPLATES = [
+    "В открытом доступе оказалась база данных клиентов {org}: {volume} с {data}.",
+    "Хакеры заявили о взломе {org} и выложили слив на {volume}, в нём {data}.",
+    "Исследователи обнаружили утечку данных {org} из {city}: опубликовано {volume}, включая {data}.",
+    "{org} подтвердила компрометацию части учётных записей, злоумышленники получили {data}.",
+    "На теневом форуме продают дамп {org} объёмом {volume}: {data}."
+]
+RU_NEUTRAL_TEMPLATES = [
+    "{org} представила новое мобильное приложение для жителей {city}.",
+    "В {city_in} прошёл форум, на котором {org} рассказала о планах на следующий год.",
+    "Аналитики ожидают рост выручки {org} по итогам квартала.",
+    "Погода в {city_in} на выходных будет переменчивой, местами пройдут дожди.",
+    "Вставьте телефон и email в форму ниже, чтобы получить пример логина для тестового стенда."
+]
+RU_DATA = ["паролями и логинами", "паспортными данными", "номерами телефонов и адресами", "номерами банковских карт",
+           "медицинскими диагнозами", "email и ФИО сотрудников", "СНИЛС и датами рождения"]
+RU_FILLER = [
+    "Компания пока не прокомментировала ситуацию.",
+    "Эксперты советуют сменить пароли и включить двухфакторную аутентификацию.",
+    "Ранее подобные инциденты уже фиксировались в отрасли.",
+    "Представители регулятора начали проверку.",
+    "Подробности будут опубликованы позднее.",
+    "По данным источника, информация актуальна на начало месяца."
+]
+
+EN_LEAK_TEMPLATES = [
+    "A database belonging to {org} was found exposed online: {volume} with {data}.",
+    "Hackers claim a breach of {org} and leaked {volume} including {data}.",
+    "Researchers discovered a data leak at {org}, exposing {data}."
+]
+EN_NEUTRAL_TEMPLATES = [
+    "{org} announced a new mobile app for customers.",
+    "Analysts expect {org} revenue to grow next quarter.",
+    "The conference on cloud infrastructure took place last week."
+]
+EN_DATA = ["passwords and logins", "passport numbers", "phone numbers and addresses", "credit card numbers",
+           "medical records", "emails and full names"]
+EN_FILLER = [
+    "The company has not commented yet.",
+    "Experts recommend changing passwords and enabling two-factor authentication.",
+    "Similar incidents have been reported before.",
+    "More details are expected later."
+]
+
+RU_VOLUMES = ["1,2 млн. записей", "350 тыс. строк", "12 GB", "500 000 записей", "3 млн. строк"]
+EN_VOLUMES = ["1.2 million records", "350 GB", "12 GB", "500,000 rows"]
+CITIES = ["Москвы", "Санкт-Петербурга", "Казани", "Новосибирска", "Екатеринбурга"]
+CITIES_IN = ["Москве", "Санкт-Петербурге", "Казани", "Новосибирске", "Екатеринбурге"]
+EMAIL_DOMAINS = ["mail.ru", "yandex.ru", "gmail.com", "bk.ru", "inbox.ru"]
+
+
+def _organizations():
+    names = sorted(set(load_dictionary(DICTIONARY_DIR / "organizations.txt").values()))
+    return names or ["ООО Ромашка"]
+
+
+ORGANIZATIONS = _organizations()
+
+
+def _fill(rng, parts, filler, size):
+    # Добиваем текст нейтральными предложениями до нужного размера
+    text = " ".join(parts)
+    while len(text) < size:
+        text += " " + rng.choice(filler)
+    return text[:max(size, len(parts[0]))]
+
+
+def news_text(rng, leak, lang, size):
+    if lang == "en":
+        templates, data, volumes, filler = (EN_LEAK_TEMPLATES if leak else EN_NEUTRAL_TEMPLATES), EN_DATA, EN_VOLUMES, EN_FILLER
+    else:
+        templates, data, volumes, filler = (RU_LEAK_TEMPLATES if leak else RU_NEUTRAL_TEMPLATES), RU_DATA, RU_VOLUMES, RU_FILLER
+    sentence = rng.choice(templates).format(
+        org=rng.choice(ORGANIZATIONS), volume=rng.choice(volumes), data=rng.choice(data),
+        city=rng.choice(CITIES), city_in=rng.choice(CITIES_IN)
+    )
+    return _fill(rng, [sentence], filler, size)
+
+
+def _word(rng, length=8):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+
+def paste_text(rng, leak, lang, size):
+    if leak:
+        header = ("Слив базы клиентов, пароли и телефоны, утечка свежая" if lang == "ru"
+                  else "Leaked customer database: passwords and phone numbers")
+        lines = [header, "email:password:phone"]
+        while sum(map(len, lines)) < size:
+            lines.append(f"{_word(rng)}@{rng.choice(EMAIL_DOMAINS)}:{_word(rng, 10)}:+7{rng.randint(9000000000, 9999999999)}")
+    else:
+        lines = ["def main():" if lang == "en" else "# заметки к докладу"]
+        while sum(map(len, lines)) < size:
+            lines.append(f"    {_word(rng)} = {_word(rng, 5)}({rng.randint(0, 100)})" if lang == "en"
+                         else f"- {rng.choice(RU_FILLER)}")
+    return "\n".join(lines)[:size]
+
+
+def code_text(rng, leak, lang, size):
+    lines = [f"# {_word(rng)} settings"]
+    if leak:
+        lines += [
+            f"DB_PASSWORD={_word(rng, 16)}",
+            f"API_KEY=\"{''.join(rng.choice(string.ascii_letters + string.digits) for _ in range(32))}\"",
+            f"ADMIN_EMAIL={_word(rng)}@{rng.choice(EMAIL_DOMAINS)}"
+        ]
+    while sum(map(len, lines)) < size:
+        lines.append(f"{_word(rng).upper()}_{_word(rng, 4).upper()}={rng.randint(1, 65535)}")
+    return "\n".join(lines)[:size]
+
+
+GENERATORS = {"news": news_text, "paste": paste_text, "code": code_text}
+
+
+def generate_text(rng, kind="news", leak=True, lang="ru", size=1000):
+    return GENERATORS[kind](rng, leak, lang, size)
+
+
+def generate_item(seed, kind, index, leak_ratio=0.3, size=1000, en_ratio=0.2):
+    # Каждый элемент зависит только от (seed, вид, номер), поэтому стенд может
+    # отдавать любые номера в любом порядке без хранения всего корпуса
+    rng = random.Random(f"{seed}:{kind}:{index}")
+    leak = rng.random() < leak_ratio
+    lang = "en" if rng.random() < en_ratio else "ru"
+    text_size = max(80, int(rng.gauss(size, size * 0.25)))
+    return {
+        "id": f"{kind}-{index}",
+        "kind": kind,
+        "lang": lang,
+        "leak": leak,
+        "text": generate_text(rng, kind, leak, lang, text_size)
+    }
+
+
+def generate_corpus(count, seed=42, leak_ratio=0.3, size=1000, kinds=KINDS, en_ratio=0.2):
+    return [
+        generate_item(seed, kinds[i % len(kinds)], i, leak_ratio, size, en_ratio)
+        for i in range(count)
+    ]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--count", type=int, default=1000)
+    arg_parser.add_argument("--size", type=int, default=1000, help="средний размер текста в символах")
+    arg_parser.add_argument("--leak-ratio", type=float, default=0.3)
+    arg_parser.add_argument("--en-ratio", type=float, default=0.2)
+    arg_parser.add_argument("--kinds", nargs="+", default=list(KINDS), choices=KINDS)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--output", default=None, help="путь для JSON; по умолчанию stdout")
+    args = arg_parser.parse_args()
+
+    corpus = generate_corpus(args.count, args.seed, args.leak_ratio, args.size, tuple(args.kinds), args.en_ratio)
+    data = json.dumps(corpus, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(data)
+        print(f"Записано {len(corpus)} текстов, утечек: {sum(item['leak'] for item in corpus)}")
+    else:
+        print(data)
+
+
+if __name__ == "__main__":
+    main()
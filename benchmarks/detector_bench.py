@@ -0,0 +1,92 @@
+"""Микро-бенчмарк детектора утечек: тексты в секунду до и после.
+
+"До" — прежняя схема парсеров: отдельный re.search на каждую категорию.
+"После" — общий LeakDetector с заранее скомпилированными шаблонами (для
+встроенных шаблонов веб-парсера — с поиском по тексту в нижнем регистре).
+Тексты берутся из web_parser/web_parser_result/leaks.json: отдельно короткие
+сниппеты и они же, склеенные в длинные "страницы" по 20 штук.
+
+    python benchmarks/detector_bench.py --repeat 50
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+BASE_DIR = Path(__file__).parent.resolve()
+ROOT_DIR = BASE_DIR.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from common.leak_detector import LeakDetector
+
+SAMPLE_PATH = ROOT_DIR / "web_parser" / "web_parser_result" / "leaks.json"
+
+
+def load_texts(path):
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    return [" ".join(filter(None, (e.get("title"), e.get("snippet")))) for e in entries]
+
+
+def load_pattern_sets():
+    pattern_sets = {}
+    with open(ROOT_DIR / "paste_parser" / "config.yaml", "r", encoding="utf-8") as f:
+        pattern_sets["paste_parser"] = (yaml.safe_load(f)["patterns"], re.IGNORECASE, False)
+    with open(ROOT_DIR / "github_parser" / "config.yaml", "r", encoding="utf-8") as f:
+        pattern_sets["github_parser"] = (yaml.safe_load(f)["regex_patterns"], re.MULTILINE, False)
+    try:
+        sys.path.insert(0, str(ROOT_DIR / "web_parser"))
+        from webmain import ANALYSIS_PATTERNS
+        pattern_sets["web_parser"] = (ANALYSIS_PATTERNS, re.IGNORECASE, True)
+    except ImportError as e:
+        print(f"web_parser пропущен: {e}")
+    return pattern_sets
+
+
+def legacy_analyze(text, patterns, flags):
+    return {k: bool(re.search(p, text, flags)) for k, p in patterns.items()}
+
+
+def measure(func, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    elapsed = time.perf_counter() - start
+    return len(texts) * repeat / elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=50)
+    arg_parser.add_argument("--sample", default=str(SAMPLE_PATH))
+    args = arg_parser.parse_args()
+
+    snippets = load_texts(args.sample)
+    pages = [" ".join(snippets[i:i + 20]) for i in range(0, len(snippets), 20)]
+    print(f"Сниппетов: {len(snippets)}, страниц: {len(pages)}, повторов: {args.repeat}")
+
+    results = {}
+    for name, (patterns, flags, lowercase) in load_pattern_sets().items():
+        detector = LeakDetector(patterns, flags=flags, lowercase=lowercase)
+        for sample_name, texts in (("snippets", snippets), ("pages", pages)):
+            mismatches = sum(detector.analyze(t) != legacy_analyze(t, patterns, flags) for t in texts)
+            before = measure(lambda t: legacy_analyze(t, patterns, flags), texts, args.repeat)
+            after = measure(detector.analyze, texts, args.repeat)
+            results[f"{name}/{sample_name}"] = {
+                "before_texts_per_sec": round(before, 1),
+                "after_texts_per_sec": round(after, 1),
+                "speedup": round(after / before, 2),
+                "mismatches": mismatches
+            }
+            print(f"{name}/{sample_name}: до {before:,.0f} т/с, после {after:,.0f} т/с, x{after / before:.2f}, расхождений {mismatches}")
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Бенчмарк извлечения сущностей: автомат Ахо-Корасик против альтернации в регулярном выражении.
+
+Словарь из --names синтетических названий организаций (по умолчанию 10 000)
+собирается в EntityExtractor и в одно регулярное выражение вида \\b(имя1|имя2|...)\\b
+с re.IGNORECASE, как раньше были устроены SERVICE_RE и extract_entities.
+Измеряются время построения, тексты в секунду и совпадение найденных имён.
+
+    python benchmarks/entity_bench.py --names 10000 --texts 500
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.resolve()
+ROOT_DIR = BASE_DIR.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from common.entity_extractor import EntityExtractor, normalize
+
+SYLLABLES = ["ро", "ка", "ми", "тех", "сер", "вол", "гра", "нит", "лес", "дар", "бан", "ком", "сит", "пром", "тор", "ви", "ал", "нова", "ин", "стр"]
+PREFIXES = ["ООО", "АО", "ПАО", "Группа", "Банк", "УК", "Холдинг", "", "", ""]
+FILLER = ("в открытом доступе оказалась база данных с телефонами адресами и паспортными данными клиентов "
+          "по словам исследователей утечка затронула несколько миллионов записей и продолжает распространяться").split()
+
+
+def make_names(count, seed):
+    rng = random.Random(seed)
+    # Основа названия уникальна, чтобы имена не пересекались и обе реализации
+    # находили одно и то же множество
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 5))).capitalize())
+    return sorted(f"{rng.choice(PREFIXES)} {word}".strip() for word in sorted(words))
+
+
+def make_texts(names, count, seed, words=200, mentions=5):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        tokens = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(mentions):
+            tokens.insert(rng.randrange(len(tokens)), rng.choice(names))
+        texts.append(" ".join(tokens) + ".")
+    return texts
+
+
+def build_regex(names):
+    # Длинные имена первыми, чтобы альтернация предпочитала самое длинное совпадение
+    aliases = sorted((normalize(name) for name in names), key=len, reverse=True)
+    return re.compile(r"\b(" + "|".join(map(re.escape, aliases)) + r")\b", re.IGNORECASE)
+
+
+def regex_find(pattern, canonical, text):
+    return list(dict.fromkeys(canonical[m] for m in pattern.findall(normalize(text))))
+
+
+def measure(func, texts, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return len(texts) * repeat / (time.perf_counter() - started)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--names", type=int, default=10000)
+    arg_parser.add_argument("--texts", type=int, default=500)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args()
+
+    names = make_names(args.names, args.seed)
+    texts = make_texts(names, args.texts, args.seed + 1)
+    canonical = {normalize(name): name for name in names}
+
+    started = time.perf_counter()
+    extractor = EntityExtractor({"organizations": {name: name for name in names}})
+    automaton_build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    pattern = build_regex(names)
+    pattern.search("прогрев")
+    regex_build = time.perf_counter() - started
+
+    mismatches = sum(
+        set(extractor.find(text)) != set(regex_find(pattern, canonical, text))
+        for text in texts
+    )
+
+    automaton_rate = measure(extractor.find, texts, args.repeat)
+    regex_rate = measure(lambda text: regex_find(pattern, canonical, text), texts, args.repeat)
+
+    print(f"Имён в словаре: {len(names)}, текстов: {len(texts)}, средняя длина: {sum(map(len, texts)) // len(texts)} символов")
+    print(f"Построение: автомат {automaton_build:.2f}s, регулярное выражение {regex_build:.2f}s")
+    print(f"Ахо-Корасик: {automaton_rate:.1f} текстов/с")
+    print(f"Регулярное выражение: {regex_rate:.1f} текстов/с")
+    print(f"Ускорение: x{automaton_rate / regex_rate:.2f}, расхождений: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
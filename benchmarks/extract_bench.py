@@ -0,0 +1,83 @@
+"""Бенчмарк извлечения текста страниц: BeautifulSoup против потокового извлечения common/html_text.
+
+Страницы берутся из --pages-dir (сохранённые *.html) или генерируются как
+новостные страницы стенда (benchmarks/fake_sources.py) с --size символами
+текста. Для каждого способа измеряются страницы в секунду и пиковая память
+Python-объектов на страницу (tracemalloc); тексты сравниваются на совпадение.
+
+    python benchmarks/extract_bench.py --pages 200 --size 20000
+    python benchmarks/extract_bench.py --pages-dir saved_pages/
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.resolve()
+ROOT_DIR = BASE_DIR.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from bs4 import BeautifulSoup
+
+from common.html_text import extract_text, decode_html
+from fake_sources import SourceCorpus, news_page
+
+
+def bs4_extract(html):
+    # Прежний путь LeakParser.process_page
+    soup = BeautifulSoup(html, "lxml")
+    for element in soup(["script", "style", "nav", "footer", "header"]):
+        element.decompose()
+    title = soup.title.text.strip() if soup.title else ""
+    return title, " ".join(soup.stripped_strings)
+
+
+def load_pages(args):
+    if args.pages_dir:
+        return [decode_html(path.read_bytes()) for path in sorted(Path(args.pages_dir).glob("*.htm*"))]
+    corpus = SourceCorpus(news=args.pages, size=args.size, seed=args.seed)
+    return [news_page(corpus, index) for index in range(args.pages)]
+
+
+def measure(extract, pages):
+    started = time.perf_counter()
+    outputs = [extract(html) for html in pages]
+    seconds = time.perf_counter() - started
+
+    peaks = []
+    for html in pages[:20]:
+        tracemalloc.start()
+        extract(html)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return outputs, seconds, max(peaks) if peaks else 0
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--pages", type=int, default=200)
+    arg_parser.add_argument("--size", type=int, default=20000, help="символов текста на сгенерированной странице")
+    arg_parser.add_argument("--pages-dir", default=None, help="каталог с сохранёнными страницами *.html")
+    arg_parser.add_argument("--max-chars", type=int, default=10 ** 9, help="предел текста для потокового способа")
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args()
+
+    pages = load_pages(args)
+    if not pages:
+        print("Нет страниц для замера")
+        return
+    total_mb = sum(len(html) for html in pages) / 1e6
+    print(f"Страниц: {len(pages)}, объём HTML: {total_mb:.1f} млн символов")
+
+    reference, bs4_seconds, bs4_peak = measure(bs4_extract, pages)
+    streamed, stream_seconds, stream_peak = measure(lambda html: extract_text(html, args.max_chars), pages)
+
+    same = sum(a == b for a, b in zip(reference, streamed))
+    for name, seconds, peak in (("BeautifulSoup", bs4_seconds, bs4_peak), ("потоковый", stream_seconds, stream_peak)):
+        print(f"{name:>14}: {len(pages) / seconds:8.1f} стр/с, {total_mb / seconds:6.2f} млн симв/с, пик памяти {peak / 1e6:.1f} МБ")
+    print(f"Ускорение: x{bs4_seconds / stream_seconds:.1f}; совпадают заголовок и текст: {same} из {len(pages)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Локальный стенд источников для бенчмарков: pastebin, поиск и raw GitHub, новостные страницы.
+
+Страницы повторяют разметку, которую разбирают парсеры:
+    /archive                     — архив pastebin (table.maintable, ссылки /<ключ>)
+    /raw/<ключ>                  — текст пасты
+    /search?q=...&type=code&p=N  — выдача GitHub (a.v-align-middle на /<владелец>/<репозиторий>/blob/...)
+    /<владелец>/<репозиторий>/raw/<путь> — содержимое файла
+    /websearch?q=...&num=N       — JSON со ссылками на новости (замена поисковой системы)
+    /news/<номер>                — новостная страница со script/style/nav/header/footer (ETag, 304)
+Тексты берутся из benchmarks/corpus.py и детерминированы по seed.
+
+    python benchmarks/fake_sources.py --port 8800 --latency-ms 50
+"""
+import argparse
+import hashlib
+import html
+import json
+import threading
+import time
+from functools import lru_cache
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from corpus import generate_item
+
+REPO_OWNER = "bench"
+
+
+class SourceCorpus:
+    """Содержимое стенда: сколько паст, файлов и новостей отдаётся и каких размеров."""
+
+    def __init__(self, pastes=100, code_files=100, news=100, size=1000, leak_ratio=0.3, seed=42, per_page=10):
+        self.pastes = pastes
+        self.code_files = code_files
+        self.news = news
+        self.size = size
+        self.leak_ratio = leak_ratio
+        self.seed = seed
+        self.per_page = per_page
+        self.item = lru_cache(maxsize=4096)(self._item)
+
+    def _item(self, kind, index):
+        return generate_item(self.seed, kind, index, self.leak_ratio, self.size)
+
+    def paste_key(self, index):
+        return f"B{index:07d}"
+
+    def code_path(self, index):
+        return f"/{REPO_OWNER}/repo{index // 10}/blob/main/config{index}.env"
+
+    def leaks(self):
+        # Эталон для оценки полноты: номера элементов, сгенерированных как утечки
+        return {
+            kind: sum(self.item(kind, i)["leak"] for i in range(count))
+            for kind, count in (("paste", self.pastes), ("code", self.code_files), ("news", self.news))
+        }
+
+
+def archive_page(corpus):
+    rows = "\n".join(
+        f'<tr><td><span class="public"></span><a href="/{corpus.paste_key(i)}">Paste {i}</a></td>'
+        f'<td class="td_smaller h_800">1 min ago</td><td class="td_smaller h_800">text</td></tr>'
+        for i in range(corpus.pastes)
+    )
+    return (
+        "<html><head><title>Pastes Archive - Pastebin.com</title></head><body>"
+        '<table class="maintable"><tr><th>Name / Title</th><th>Posted</th><th>Syntax</th></tr>\n'
+        f"{rows}\n</table></body></html>"
+    )
+
+
+def github_search_page(corpus, page):
+    start = (page - 1) * corpus.per_page
+    links = "\n".join(
+        f'<div class="code-list-item"><a class="v-align-middle" href="{corpus.code_path(i)}">config{i}.env</a></div>'
+        for i in range(start, min(start + corpus.per_page, corpus.code_files))
+    )
+    return f"<html><head><title>Code search results</title></head><body><div class=\"code-list\">\n{links}\n</div></body></html>"
+
+
+def news_page(corpus, index):
+    item = corpus.item("news", index)
+    paragraphs = "".join(f"<p>{html.escape(sentence.strip())}.</p>" for sentence in item["text"].split(".") if sentence.strip())
+    return (
+        f"<html><head><title>Новость {index}</title>"
+        "<style>body { font-family: sans-serif; } .menu { display: flex; }</style>"
+        "<script>window.dataLayer = window.dataLayer || []; function track() { return 'утечка'; }</script>"
+        "</head><body>"
+        '<header><div class="logo">Новости</div></header>'
+        '<nav class="menu"><a href="/">Главная</a><a href="/news">Лента</a></nav>'
+        f"<article><h1>Новость {index}</h1>{paragraphs}</article>"
+        "<footer>© Новостной портал. Перепечатка материалов запрещена.</footer>"
+        "<script>track();</script></body></html>"
+    )
+
+
+def search_results(corpus, query, num):
+    # Выдача зависит от запроса, но стабильна между запусками
+    offset = int(hashlib.md5(query.encode("utf-8")).hexdigest(), 16) % max(corpus.news, 1)
+    return [f"/news/{(offset + i) % corpus.news}" for i in range(min(num, corpus.news))]
+
+
+class SourceHandler(BaseHTTPRequestHandler):
+    corpus = None
+    latency = 0.0
+
+    def _send(self, code, body, content_type="text/html; charset=utf-8", etag=None):
+        data = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_page(self, body):
+        # Новости отдаются с ETag и поддерживают условный GET
+        etag = f'"{hashlib.md5(body.encode("utf-8")).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        return self._send(200, body, etag=etag)
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        parsed = urlparse(self.path)
+        path, query = parsed.path, parse_qs(parsed.query)
+        corpus = self.corpus
+
+        if path == "/archive":
+            return self._send(200, archive_page(corpus))
+        if path.startswith("/raw/"):
+            key = path[len("/raw/"):]
+            index = int(key[1:]) if key[1:].isdigit() else -1
+            if 0 <= index < corpus.pastes:
+                return self._send(200, corpus.item("paste", index)["text"], "text/plain; charset=utf-8")
+            return self._send(404, "Not Found")
+        if path == "/search":
+            page = int(query.get("p", ["1"])[0])
+            return self._send(200, github_search_page(corpus, page))
+        if path.startswith(f"/{REPO_OWNER}/") and "/raw/" in path:
+            name = path.rsplit("/", 1)[-1]
+            digits = name[len("config"):-len(".env")]
+            if digits.isdigit() and int(digits) < corpus.code_files:
+                return self._send(200, corpus.item("code", int(digits))["text"], "text/plain; charset=utf-8")
+            return self._send(404, "Not Found")
+        if path == "/websearch":
+            num = int(query.get("num", ["10"])[0])
+            urls = [f"http://{self.headers.get('Host')}{link}" for link in search_results(corpus, query.get("q", [""])[0], num)]
+            return self._send(200, json.dumps(urls), "application/json")
+        if path.startswith("/news/"):
+            index = path[len("/news/"):]
+            if index.isdigit() and int(index) < corpus.news:
+                return self._send_page(news_page(corpus, int(index)))
+        return self._send(404, "Not Found")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeSources:
+    """Стенд в фоновом потоке; base_url доступен после start()."""
+
+    def __init__(self, corpus, host="127.0.0.1", port=0, latency_ms=0):
+        handler = type("BoundSourceHandler", (SourceHandler,), {"corpus": corpus, "latency": latency_ms / 1000})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8800)
+    arg_parser.add_argument("--items", type=int, default=100, help="паст, файлов и новостей каждого вида")
+    arg_parser.add_argument("--size", type=int, default=1000)
+    arg_parser.add_argument("--leak-ratio", type=float, default=0.3)
+    arg_parser.add_argument("--latency-ms", type=float, default=0)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args()
+
+    corpus = SourceCorpus(args.items, args.items, args.items, args.size, args.leak_ratio, args.seed)
+    sources = FakeSources(corpus, args.host, args.port, args.latency_ms)
+    print(f"Стенд источников слушает {sources.base_url}")
+    try:
+        sources.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sources.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""Сквозной бенчмарк парсеров и ИИ-агента на локальном стенде источников.
+
+Парсеры pastebin, GitHub и веб-парсер запускаются целиком (run()/main()) против
+benchmarks/fake_sources.py; их результаты, статусы и метрики пишутся во
+временный каталог, а не в рабочие *_result. Поисковую систему веб-парсера
+заменяет эндпоинт /websearch стенда (search.backend: json). У Telegram нет HTTP-аналога, поэтому для
+tgmain и для агента измеряется обработка сообщений корпуса без сети и БД.
+
+Результат — JSON с пропускной способностью, задержками и метриками этапов;
+с --compare он сравнивается с прошлым прогоном и сообщает о регрессиях.
+
+    python benchmarks/pipeline_bench.py --items 200 --latency-ms 20 --output bench.json
+    python benchmarks/pipeline_bench.py --compare bench.json
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+import yaml
+
+BASE_DIR = Path(__file__).parent.resolve()
+ROOT_DIR = BASE_DIR.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from corpus import generate_corpus
+from fake_sources import SourceCorpus, FakeSources
+
+TARGETS = ("paste", "github", "web", "telegram", "agent")
+
+
+def load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def redirect_paths(module, results_dir, files):
+    # Все файлы парсера переносятся во временный каталог прогона
+    results_dir.mkdir(parents=True, exist_ok=True)
+    module.RESULTS_DIR = results_dir
+    for name, file_name in files.items():
+        setattr(module, name, results_dir / file_name)
+
+
+def write_config(path, config):
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+    return path
+
+
+def read_summary(results_dir):
+    path = results_dir / "run_summary.json"
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        summary = json.load(f)
+    return {"stages": summary.get("stages", {}), "counters": summary.get("counters", {})}
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def latency_ms(latencies):
+    if not latencies:
+        return {}
+    return {
+        "p50": round(percentile(latencies, 0.5) * 1000, 2),
+        "p95": round(percentile(latencies, 0.95) * 1000, 2),
+        "max": round(max(latencies) * 1000, 2)
+    }
+
+
+def timed(func, latencies):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+    return wrapper
+
+
+def report(items, seconds, found, expected, latencies=None, extra=None):
+    result = {
+        "items": items,
+        "seconds": round(seconds, 3),
+        "items_per_sec": round(items / seconds, 2) if seconds else 0.0,
+        "found": found,
+        "expected_leaks": expected,
+        "latency_ms": latency_ms(latencies or [])
+    }
+    result.update(extra or {})
+    return result
+
+
+def bench_paste(base_url, corpus, workdir):
+    pastemain = load_module("pastemain", ROOT_DIR / "paste_parser" / "pastemain.py")
+    results_dir = workdir / "paste"
+    redirect_paths(pastemain, results_dir, {
+        "PROCESSED_PATH": "processed_ids.json", "RESULTS_PATH": "paste_result.json", "STATUS_PATH": "status.json"
+    })
+    with open(pastemain.CONFIG_PATH, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    config.update(base_url=base_url, delay_range=[0, 0])
+    monitor = pastemain.PastebinMonitor(write_config(workdir / "paste_config.yaml", config))
+
+    latencies = []
+    monitor.process_entry = timed(monitor.process_entry, latencies)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        monitor.run()
+    seconds = time.perf_counter() - started
+    return report(corpus.pastes, seconds, len(monitor.results), corpus.leaks()["paste"], latencies, read_summary(results_dir))
+
+
+def bench_github(base_url, corpus, workdir):
+    ghmain = load_module("ghmain", ROOT_DIR / "github_parser" / "ghmain.py")
+    results_dir = workdir / "github"
+    redirect_paths(ghmain, results_dir, {"PROCESSED_PATH": "processed_links.txt"})
+    with open(ghmain.CONFIG_PATH, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    config.update(
+        base_url=base_url,
+        queries=["password filename:.env"],
+        max_pages=math.ceil(corpus.code_files / corpus.per_page),
+        delay_between_requests=0,
+        delay_between_pages=0
+    )
+    ghmain.CONFIG_PATH = write_config(workdir / "github_config.yaml", config)
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ghmain.main()
+    seconds = time.perf_counter() - started
+
+    output_path = results_dir / config.get("output_file", "github_leaks.json")
+    found = len(json.loads(output_path.read_text(encoding="utf-8"))) if output_path.exists() else 0
+    summary = read_summary(results_dir)
+    # Отдельного обработчика файла у ghmain нет: задержка — среднее скачивание + анализ
+    stages = summary.get("stages", {})
+    per_file = [stages[name]["seconds"] / stages[name]["count"] for name in ("fetch_raw", "analyze") if stages.get(name, {}).get("count")]
+    extra = dict(summary, item_mean_ms=round(sum(per_file) * 1000, 2))
+    return report(corpus.code_files, seconds, found, corpus.leaks()["code"], None, extra)
+
+
+def bench_web(base_url, corpus, workdir, engine=None):
+    webmain = load_module("webmain", ROOT_DIR / "web_parser" / "webmain.py")
+    results_dir = workdir / "web"
+    redirect_paths(webmain, results_dir, {
+        "PROCESSED_PATH": "processed_urls.json", "PROCESSED_DB_PATH": "processed_urls.sqlite3", "RESULTS_PATH": "results.json", "STATUS_PATH": "status.json",
+        "SEARCH_CACHE_PATH": "search_cache.json"
+    })
+    with open(webmain.CONFIG_PATH, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    per_query = config["search"]["results_per_query"]
+    queries = math.ceil(corpus.news / per_query)
+    config["keywords"] = [f"утечка данных {i}" for i in range(queries)]
+    config["site_filters"] = ["site:ru"]
+    config["target_domains"] = [urlparse(base_url).netloc]
+    # Поиск идёт в эндпоинт /websearch стенда без ограничения частоты
+    config["search"].update(backend="json", endpoint=f"{base_url}/websearch", rate_per_minute=0)
+    config["crawling"]["delay_range"] = [0, 0]
+    if engine:
+        config["crawling"]["engine"] = engine
+    # Все «сайты» стенда живут на одном хосте, поэтому ограничение на хост снимается
+    config["crawling"]["per_host"] = config["crawling"].get("concurrency", 100)
+    webmain.CONFIG_PATH = write_config(workdir / "web_config.yaml", config)
+
+    parser = webmain.LeakParser()
+    latencies = []
+    # У асинхронного движка скачивание и обработка разделены: задержка — только обработка страницы
+    if config["crawling"].get("engine") == "async":
+        parser.process_fetched = timed(parser.process_fetched, latencies)
+    else:
+        parser.process_page = timed(parser.process_page, latencies)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        parser.run()
+    seconds = time.perf_counter() - started
+
+    visited = [int(url.rsplit("/", 1)[-1]) for url in parser.processed_urls]
+    expected = sum(corpus.item("news", index)["leak"] for index in visited)
+    return report(len(visited), seconds, len(parser.results), expected, latencies, read_summary(results_dir))
+
+
+def bench_telegram(items, workdir):
+    # tgmain при импорте требует учётные данные Telegram; к сети он не подключается
+    for name, value in (("API_ID", "1"), ("API_HASH", "benchmark"), ("PHONE", "+70000000000")):
+        os.environ.setdefault(name, value)
+    os.environ["TELEGRAM_SESSION"] = str(workdir / "bench_session")
+    tgmain = load_module("tgmain", ROOT_DIR / "telegram" / "telegram_parser" / "tgmain.py")
+    latencies = []
+    found = 0
+    started = time.perf_counter()
+    for item in items:
+        item_started = time.perf_counter()
+        found += bool(tgmain.filter_results(tgmain.analyze_content(item["text"])))
+        latencies.append(time.perf_counter() - item_started)
+    seconds = time.perf_counter() - started
+    return report(len(items), seconds, found, sum(item["leak"] for item in items), latencies, {"mode": "offline"})
+
+
+def bench_agent(items, workdir, with_model=False):
+    # Агент проверяет только наличие настроек БД; соединение открывается лениво и здесь не нужно
+    for name in ("DB_HOST", "DB_PORT", "DB_NAME", "DB_USER", "DB_PASSWORD"):
+        os.environ.setdefault(name, "benchmark")
+    sys.path.insert(0, str(ROOT_DIR / "ai-agent"))
+    ai_agent = load_module("ai_agent", ROOT_DIR / "ai-agent" / "ai_agent.py")
+    ai_agent.rule_analysis.cache_clear()
+
+    texts = [item["text"] for item in items]
+    model_seconds = 0.0
+    scores = {}
+    if with_model:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            scores = ai_agent.classify_texts(texts)
+        model_seconds = time.perf_counter() - started
+
+    latencies = []
+    found = 0
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for text in texts:
+            item_started = time.perf_counter()
+            leak_type, analysis, confidence = ai_agent.determine_type_and_analysis(text, "benchmark", scores.get(text, 0.5))
+            if ai_agent.decide(analysis["leak"], confidence) != ai_agent.SKIP:
+                found += 1
+                geo_entities, org_entities = ai_agent.extract_entities(text)
+                ai_agent.generate_recommendations(analysis, leak_type, geo_entities, org_entities)
+            latencies.append(time.perf_counter() - item_started)
+    seconds = time.perf_counter() - started + model_seconds
+    extra = {"mode": "model" if with_model else "rules", "model_seconds": round(model_seconds, 3)}
+    return report(len(items), seconds, found, sum(item["leak"] for item in items), latencies, extra)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, tolerance):
+    """Печатает изменение пропускной способности; возвращает список регрессий."""
+    regressions = []
+    for target, result in current["results"].items():
+        old = baseline.get("results", {}).get(target, {})
+        if "items_per_sec" not in result or not old.get("items_per_sec"):
+            continue
+        ratio = result["items_per_sec"] / old["items_per_sec"]
+        mark = ""
+        if ratio < 1 - tolerance:
+            regressions.append(target)
+            mark = "  <-- регрессия"
+        print(f"{target}: {old['items_per_sec']} -> {result['items_per_sec']} эл./с (x{ratio:.2f}){mark}")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--targets", nargs="+", default=list(TARGETS), choices=TARGETS)
+    arg_parser.add_argument("--items", type=int, default=100, help="элементов каждого вида на стенде и в корпусе")
+    arg_parser.add_argument("--size", type=int, default=1000, help="средний размер текста в символах")
+    arg_parser.add_argument("--leak-ratio", type=float, default=0.3)
+    arg_parser.add_argument("--latency-ms", type=float, default=0, help="искусственная задержка ответа стенда")
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--web-engine", choices=("threads", "async"), default=None,
+                            help="движок обхода веб-парсера; по умолчанию из его config.yaml")
+    arg_parser.add_argument("--with-model", action="store_true", help="включить классификацию моделью в бенчмарк агента")
+    arg_parser.add_argument("--output", default=None, help="путь для JSON с результатами")
+    arg_parser.add_argument("--compare", default=None, help="JSON прошлого прогона для сравнения")
+    arg_parser.add_argument("--tolerance", type=float, default=0.1, help="допустимое падение пропускной способности")
+    args = arg_parser.parse_args()
+
+    corpus = SourceCorpus(args.items, args.items, args.items, args.size, args.leak_ratio, args.seed)
+    messages = generate_corpus(args.items, args.seed, args.leak_ratio, args.size, kinds=("news",))
+    sources = FakeSources(corpus, latency_ms=args.latency_ms)
+    base_url = sources.start()
+    print(f"Стенд источников: {base_url}")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="leak_bench_") as tmp:
+        workdir = Path(tmp)
+        runners = {
+            "paste": lambda: bench_paste(base_url, corpus, workdir),
+            "github": lambda: bench_github(base_url, corpus, workdir),
+            "web": lambda: bench_web(base_url, corpus, workdir, args.web_engine),
+            "telegram": lambda: bench_telegram(messages, workdir),
+            "agent": lambda: bench_agent(messages, workdir, args.with_model)
+        }
+        for target in args.targets:
+            print(f"→ {target}")
+            try:
+                results[target] = runners[target]()
+            except ImportError as e:
+                # Зависимость парсера не установлена — цель пропускается, остальные измеряются
+                results[target] = {"skipped": f"не установлена зависимость: {e.name}"}
+            except Exception as e:
+                results[target] = {"skipped": f"{type(e).__name__}: {e}"}
+            print(f"  {json.dumps(results[target], ensure_ascii=False)}")
+    sources.stop()
+
+    report_data = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "items": args.items,
+            "size": args.size,
+            "leak_ratio": args.leak_ratio,
+            "latency_ms": args.latency_ms,
+            "web_engine": args.web_engine,
+            "seed": args.seed
+        },
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report_data, f, ensure_ascii=False, indent=2)
+        print(f"Результаты записаны в {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report_data, baseline, args.tolerance)
+        if regressions:
+            print(f"Регрессии производительности: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
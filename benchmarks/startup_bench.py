@@ -0,0 +1,82 @@
+"""Бенчмарк запуска заданий планировщика: новый интерпретатор против пула с forkserver.
+
+Пробный скрипт импортирует те же библиотеки, что и парсеры (requests, bs4,
+yaml, tqdm, telethon, ...), и сразу завершается, поэтому время задания —
+это чистые накладные расходы на запуск. Сравниваются медианы по --runs запускам
+subprocess (как раньше в scheduler.run_script) и WarmPool.run; время
+подъёма пула (старт forkserver'а и первое задание) выводится отдельно.
+
+    python benchmarks/startup_bench.py --runs 10
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.resolve()
+ROOT_DIR = BASE_DIR.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from common.warm_pool import WarmPool, PRELOAD_MODULES
+
+PROBE_TEMPLATE = """import sys
+sys.path.insert(0, {root!r})
+import importlib
+for name in {modules!r}:
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        pass
+"""
+
+
+def timed(func, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--runs", type=int, default=10)
+    arg_parser.add_argument("--modules", nargs="+", default=PRELOAD_MODULES,
+                            help="что импортирует пробный скрипт и что предзагружает пул")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        probe = Path(tmp) / "probe.py"
+        probe.write_text(PROBE_TEMPLATE.format(root=str(ROOT_DIR), modules=list(args.modules)), encoding="utf-8")
+
+        def cold():
+            subprocess.run([sys.executable, str(probe)], check=True)
+
+        pool = WarmPool(args.modules)
+
+        def warm():
+            exit_code, _ = pool.run(str(probe))
+            if exit_code != 0:
+                raise RuntimeError(f"пробный скрипт завершился с кодом {exit_code}")
+
+        # forkserver импортирует модули в фоне, поэтому подъём пула — это старт плюс первое задание
+        started = time.perf_counter()
+        pool.start()
+        warm()
+        pool_start = time.perf_counter() - started
+
+        cold_seconds = timed(cold, args.runs)
+        warm_seconds = timed(warm, args.runs)
+
+    print(f"Модулей: {len(args.modules)}, запусков: {args.runs}")
+    print(f"Новый интерпретатор: {cold_seconds * 1000:.1f} мс на задание")
+    print(f"Пул (forkserver):    {warm_seconds * 1000:.1f} мс на задание, подъём пула {pool_start * 1000:.0f} мс")
+    print(f"Ускорение запуска: x{cold_seconds / warm_seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
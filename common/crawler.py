@@ -0,0 +1,122 @@
+import time
+import random
+import asyncio
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+
+DEFAULT_CONCURRENCY = 100
+DEFAULT_PER_HOST = 4
+# Тело ответа длиннее лимита обрезается: страница целиком не нужна для анализа
+DEFAULT_MAX_BYTES = 5_000_000
+CHUNK_SIZE = 64 * 1024
+
+
+class FetchResult:
+    """Ответ сервера: статус, заголовки и тело (не длиннее max_bytes)."""
+
+    def __init__(self, url, status, headers, body, charset=None, truncated=False):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.charset = charset
+        self.truncated = truncated
+
+    @property
+    def text(self):
+        return self.body.decode(self.charset or "utf-8", errors="replace")
+
+
+class AsyncCrawler:
+    """Асинхронный обход страниц на одном aiohttp-клиенте с keep-alive.
+
+    Общее число запросов ограничено concurrency, запросы к одному хосту —
+    per_host, между запросами к одному хосту выдерживается пауза из
+    delay_range. Ответ читается потоком и обрывается на max_bytes.
+    Обработка страниц (разбор HTML, анализ) идёт в пуле из workers потоков,
+    чтобы не останавливать цикл событий.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST, delay_range=(0, 0),
+                 timeout=10, max_bytes=DEFAULT_MAX_BYTES, user_agents=None, workers=4, metrics=None):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.delay_range = tuple(delay_range)
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.user_agents = user_agents or ["Mozilla/5.0"]
+        self.workers = workers
+        self.metrics = metrics
+        self.host_limits = {}
+        self.host_next = {}
+
+    def _inc(self, name, value=1):
+        if self.metrics:
+            self.metrics.inc(name, value)
+
+    async def _wait_turn(self, host):
+        # Запросы к хосту разносятся во времени: каждый занимает свой слот
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self.host_next.get(host, now))
+        self.host_next[host] = start + random.uniform(*self.delay_range)
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def fetch(self, session, url, headers=None):
+        host = urlparse(url).netloc
+        limit = self.host_limits.setdefault(host, asyncio.Semaphore(self.per_host))
+        request_headers = {"User-Agent": random.choice(self.user_agents)}
+        request_headers.update(headers or {})
+        async with limit:
+            await self._wait_turn(host)
+            self._inc("http_requests")
+            started = time.perf_counter()
+            async with session.get(url, headers=request_headers) as response:
+                body = bytearray()
+                truncated = False
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    body += chunk
+                    if len(body) >= self.max_bytes:
+                        truncated = True
+                        del body[self.max_bytes:]
+                        break
+                if self.metrics:
+                    self.metrics.observe("fetch", time.perf_counter() - started)
+                    self.metrics.inc("bytes_downloaded", len(body))
+                if truncated:
+                    self._inc("responses_truncated")
+                return FetchResult(url, response.status, dict(response.headers), bytes(body), response.charset, truncated)
+
+    async def crawl(self, urls, handler, on_done=None, headers_for=None):
+        """Скачивает urls и вызывает handler(result) в потоке пула для каждого ответа.
+
+        headers_for(url) добавляет заголовки запроса (например, условного GET).
+        Ошибка сети или обработчика одной страницы не прерывает обход;
+        on_done(url, error) вызывается в цикле событий после каждой страницы.
+        """
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host, ttl_dns_cache=300)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="page") as executor:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                async def visit(url):
+                    error = None
+                    try:
+                        async with semaphore:
+                            result = await self.fetch(session, url, headers_for(url) if headers_for else None)
+                        await loop.run_in_executor(executor, handler, result)
+                    except Exception as e:
+                        error = e
+                        self._inc("page_errors")
+                    if on_done:
+                        on_done(url, error)
+
+                await asyncio.gather(*(visit(url) for url in urls))
+
+    def run(self, urls, handler, on_done=None, headers_for=None):
+        asyncio.run(self.crawl(urls, handler, on_done, headers_for))
@@ -0,0 +1,70 @@
+import re
+
+# Диапазоны полей: минута, час, день месяца, месяц, день недели (0 и 7 — воскресенье)
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@weekly': '0 0 * * 1',
+    '@monthly': '0 0 1 * *'
+}
+FIELD_RE = re.compile(r'^(\*|\d+(?:-\d+)?)(?:/(\d+))?$')
+
+
+def parse_field(text, low, high):
+    values = set()
+    for part in text.split(','):
+        match = FIELD_RE.match(part)
+        if not match:
+            raise ValueError(f"Некорректное поле cron: '{text}'")
+        base, step = match.group(1), int(match.group(2) or 1)
+        if base == '*':
+            start, end = low, high
+        elif '-' in base:
+            start, end = map(int, base.split('-'))
+        else:
+            start = int(base)
+            end = high if match.group(2) else start
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Поле cron вне диапазона {low}-{high}: '{text}'")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpression:
+    """Выражение cron из пяти полей: «минута час день месяц день_недели».
+
+    Поддерживаются *, списки, диапазоны, шаги (*/5, 10-30/10) и псевдонимы
+    @hourly, @daily, @weekly, @monthly. Как в cron, если ограничены и день
+    месяца, и день недели, достаточно совпадения любого из них.
+    """
+
+    def __init__(self, expression):
+        self.expression = expression.strip()
+        fields = ALIASES.get(self.expression, self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"В выражении cron должно быть 5 полей: '{expression}'")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            parse_field(field, low, high) for field, (low, high) in zip(fields, FIELD_RANGES)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    def matches(self, moment):
+        if moment.minute not in self.minutes or moment.hour not in self.hours or moment.month not in self.months:
+            return False
+        day_ok = moment.day in self.days
+        # datetime: понедельник = 0, cron: воскресенье = 0
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def __repr__(self):
+        return f"CronExpression('{self.expression}')"
+
+
+def is_cron(text):
+    text = text.strip()
+    return text in ALIASES or len(text.split()) == 5
@@ -0,0 +1,162 @@
+import re
+import hashlib
+import unicodedata
+from pathlib import Path
+
+DICTIONARY_DIR = Path(__file__).parent / 'dictionaries'
+# Короткие синонимы с заглавными буквами (РФ, Мск, Сбер) ищутся с учётом регистра
+SHORT_ALIAS_LEN = 4
+
+# Мягкий перенос удаляется, варианты дефиса и тире сводятся к обычному дефису
+NORMALIZE_TABLE = str.maketrans({
+    'ё': 'е', 'Ё': 'Е',
+    '\u00ad': None,
+    '\u2010': '-', '\u2011': '-', '\u2012': '-', '\u2013': '-', '\u2014': '-'
+})
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize(text, fold=True):
+    """Нормализация для поиска: NFKC, ё -> е, единые пробелы и дефисы, свёртка регистра (fold)."""
+    text = WHITESPACE_RE.sub(' ', unicodedata.normalize('NFKC', text).translate(NORMALIZE_TABLE))
+    return fold_case(text) if fold else text
+
+
+def fold_case(text):
+    folded = text.casefold()
+    if len(folded) == len(text):
+        return folded
+    # ß -> ss и подобные удлиняют строку; позиции в свёрнутом тексте должны совпадать с исходным
+    return ''.join(char.casefold() if len(char.casefold()) == 1 else char for char in text)
+
+
+def is_case_sensitive(alias):
+    return len(alias) <= SHORT_ALIAS_LEN and alias != alias.lower()
+
+
+def is_word_char(char):
+    return char.isalnum() or char == '_'
+
+
+def load_dictionary(path):
+    """Читает словарь: одна сущность на строку, синонимы через '|', первый — каноническое имя.
+
+    Пустые строки и строки, начинающиеся с '#', пропускаются. Синонимы
+    не длиннее SHORT_ALIAS_LEN с заглавными буквами ищутся с учётом регистра:
+    «РФ» не находится в домене «.рф», «Мск» — в «мск».
+    """
+    names = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            aliases = [alias.strip() for alias in line.split('|') if alias.strip()]
+            for alias in aliases:
+                names.setdefault(alias, aliases[0])
+    return names
+
+
+class EntityExtractor:
+    """Поиск организаций и географических названий по словарям.
+
+    Все синонимы из словарей собираются в один автомат Ахо-Корасик, который
+    строится один раз и находит все вхождения за один проход по тексту,
+    независимо от размера словаря. Текст и синонимы нормализуются одинаково,
+    а границы слов проверяются так же, как \\b в регулярных выражениях.
+    Для коротких синонимов (is_case_sensitive) совпадение дополнительно
+    сверяется с текстом без свёртки регистра.
+    """
+
+    def __init__(self, dictionaries):
+        # dictionaries: категория -> {синоним: каноническое имя}
+        self.categories = tuple(dictionaries)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        digest = hashlib.sha1()
+        for category, names in dictionaries.items():
+            for alias, canonical in sorted(names.items()):
+                exact = normalize(alias, fold=False) if is_case_sensitive(alias) else None
+                digest.update(f"{category}\x1f{alias}\x1f{canonical}\x1f{exact is not None}\n".encode('utf-8'))
+                self._add(normalize(alias), exact, (category, canonical))
+        self._build()
+        self.version = digest.hexdigest()[:12]
+        self.size = sum(len(names) for names in dictionaries.values())
+
+    @classmethod
+    def from_directory(cls, path=DICTIONARY_DIR, categories=None):
+        """Загружает все *.txt из каталога; имя файла без расширения — категория."""
+        dictionaries = {}
+        for file_path in sorted(Path(path).glob('*.txt')):
+            if categories is None or file_path.stem in categories:
+                dictionaries[file_path.stem] = load_dictionary(file_path)
+        return cls(dictionaries)
+
+    def _add(self, key, exact, payload):
+        if not key:
+            return
+        node = 0
+        for char in key:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = next_node
+        # Проверка границы нужна только со стороны буквы или цифры, как у \b
+        self._out[node] += ((len(key), is_word_char(key[0]), is_word_char(key[-1]), exact, payload),)
+
+    def _build(self):
+        # Обход в ширину: суффиксные ссылки и объединение выходов по ним
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                state = self._fail[node]
+                while state and char not in self._goto[state]:
+                    state = self._fail[state]
+                fail = self._goto[state].get(char, 0)
+                self._fail[child] = fail if fail != child else 0
+                self._out[child] += self._out[self._fail[child]]
+
+    def iter_matches(self, text):
+        """Отдаёт (категория, каноническое имя) для каждого вхождения в порядке окончания."""
+        original = normalize(text, fold=False)
+        text = fold_case(original)
+        goto, fail, out = self._goto, self._fail, self._out
+        length = len(text)
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not out[node]:
+                continue
+            for key_length, check_start, check_end, exact, payload in out[node]:
+                start = end - key_length
+                if check_start and start > 0 and is_word_char(text[start - 1]):
+                    continue
+                if check_end and end < length and is_word_char(text[end]):
+                    continue
+                if exact is not None and original[start:end] != exact:
+                    continue
+                yield payload
+
+    def find(self, text, categories=None):
+        """Уникальные канонические имена в порядке появления, опционально по категориям."""
+        found = {}
+        for category, canonical in self.iter_matches(text):
+            if categories is None or category in categories:
+                found.setdefault(canonical, category)
+        return list(found)
+
+    def extract(self, text):
+        """Словарь категория -> список уникальных канонических имён."""
+        result = {category: [] for category in self.categories}
+        for category, canonical in self.iter_matches(text):
+            if canonical not in result[category]:
+                result[category].append(canonical)
+        return result
@@ -0,0 +1,98 @@
+import re
+import codecs
+
+from lxml import etree
+
+# Поддеревья, текст которых не нужен для анализа
+SKIP_TAGS = frozenset(["script", "style", "nav", "footer", "header"])
+DEFAULT_MAX_CHARS = 200_000
+FEED_CHUNK = 64 * 1024
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+
+
+def decode_html(body, charset=None):
+    """Декодирует тело страницы: кодировка из заголовка, затем из <meta>, иначе UTF-8."""
+    if not charset:
+        match = META_CHARSET_RE.search(body[:4096])
+        charset = match.group(1).decode("ascii") if match else None
+    try:
+        codecs.lookup(charset or "utf-8")
+    except LookupError:
+        charset = None
+    return body.decode(charset or "utf-8", errors="replace")
+
+
+class _TextTarget:
+    # Получатель событий lxml: собирает текстовые узлы вне SKIP_TAGS и первый <title>
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        self.parts = []
+        self.size = 0
+        self.buffer = []
+        self.skip_depth = 0
+        self.in_title = False
+        self.title = None
+        self.title_parts = []
+        self.done = False
+
+    def _flush(self):
+        if not self.buffer:
+            return
+        text = "".join(self.buffer).strip()
+        self.buffer = []
+        if text and not self.done:
+            self.parts.append(text)
+            self.size += len(text) + 1
+            if self.size >= self.max_chars:
+                self.done = True
+
+    def start(self, tag, attrib):
+        self._flush()
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == "title" and self.title is None:
+            self.in_title = True
+
+    def end(self, tag):
+        self._flush()
+        if tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag == "title" and self.in_title:
+            self.in_title = False
+            self.title = "".join(self.title_parts).strip()
+
+    def data(self, data):
+        if self.skip_depth:
+            return
+        self.buffer.append(data)
+        if self.in_title:
+            self.title_parts.append(data)
+
+    def comment(self, text):
+        self._flush()
+
+    def close(self):
+        self._flush()
+        return self
+
+
+def extract_text(html, max_chars=DEFAULT_MAX_CHARS):
+    """Заголовок и видимый текст страницы за один проход потокового парсера.
+
+    Текст содержимого script/style/nav/footer/header пропускается прямо при
+    разборе, дерево документа не строится. Текстовые узлы соединяются
+    пробелом, как soup.stripped_strings; после max_chars символов разбор
+    прекращается. Возвращает (title, text).
+    """
+    target = _TextTarget(max_chars)
+    parser = etree.HTMLParser(target=target, remove_comments=True)
+    for start in range(0, len(html), FEED_CHUNK):
+        parser.feed(html[start:start + FEED_CHUNK])
+        if target.done:
+            break
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        target.close()
+    text = " ".join(target.parts)
+    return target.title or "", text[:max_chars]
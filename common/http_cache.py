@@ -0,0 +1,213 @@
+import os
+import gzip
+import json
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime, timedelta
+
+from common.url_canon import canonical_url
+
+META_SUFFIX = ".json"
+BODY_SUFFIX = ".html.gz"
+INDEX_NAME = "index.sqlite3"
+# Индекс сроков: выбор страниц для перепроверки и удаления без чтения всех метаданных
+INDEX_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS pages (
+        key TEXT PRIMARY KEY,
+        url TEXT NOT NULL,
+        first_fetched_at REAL NOT NULL,
+        checked_at REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS pages_checked ON pages (checked_at)",
+    "CREATE INDEX IF NOT EXISTS pages_first ON pages (first_fetched_at)",
+)
+
+
+class HttpCache:
+    """Дисковый HTTP-кэш страниц: валидаторы ETag/Last-Modified и тело в gzip.
+
+    На каждую страницу два файла в подкаталоге по первым символам ключа:
+    <ключ>.json с метаданными и <ключ>.html.gz с телом. Страница, проверенная
+    раньше чем revisit_after назад и скачанная впервые не раньше чем
+    revisit_for назад, перепроверяется условным GET; ответ 304 или то же
+    содержимое означают, что разбирать страницу заново не нужно. Ключ
+    записи — канонический адрес (key_func, по умолчанию canonical_url).
+
+    Сроки записей продублированы в SQLite-индексе index.sqlite3, поэтому
+    due_urls() и prune() — запросы по индексу, а не обход каталога. Индекс
+    кэша, созданного до его появления, строится из метаданных один раз.
+    """
+
+    def __init__(self, directory, revisit_after=timedelta(hours=24), revisit_for=timedelta(days=30), key_func=None):
+        self.directory = str(directory)
+        self.key_func = key_func or canonical_url
+        self.revisit_after = revisit_after
+        self.revisit_for = revisit_for
+        os.makedirs(self.directory, exist_ok=True)
+        index_path = os.path.join(self.directory, INDEX_NAME)
+        is_new = not os.path.exists(index_path)
+        self.conn = sqlite3.connect(index_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in INDEX_SQL:
+            self.conn.execute(statement)
+        self.conn.commit()
+        self.lock = threading.Lock()
+        if is_new:
+            self._rebuild_index()
+
+    def _key(self, url):
+        return hashlib.sha256(self.key_func(url).encode("utf-8")).hexdigest()
+
+    def _path(self, url, suffix):
+        return self._key_path(self._key(url), suffix)
+
+    def _key_path(self, key, suffix):
+        return os.path.join(self.directory, key[:2], key + suffix)
+
+    def _index(self, url, meta):
+        row = (
+            self._key(url), meta["url"],
+            datetime.fromisoformat(meta["first_fetched_at"]).timestamp(),
+            datetime.fromisoformat(meta["checked_at"]).timestamp()
+        )
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)", row)
+            self.conn.commit()
+
+    def _rebuild_index(self):
+        rows = []
+        for meta in self.iter_meta():
+            try:
+                first = datetime.fromisoformat(meta["first_fetched_at"]).timestamp()
+                checked = datetime.fromisoformat(meta["checked_at"]).timestamp()
+            except (KeyError, ValueError):
+                # Повреждённая запись удалится при ближайшем prune()
+                first = checked = 0.0
+            if meta.get("url"):
+                rows.append((self._key(meta["url"]), meta["url"], first, checked))
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)", rows)
+            self.conn.commit()
+        if rows:
+            print(f"Индекс HTTP-кэша построен: {len(rows)} страниц")
+
+    def _write_atomic(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, url):
+        try:
+            with open(self._path(url, META_SUFFIX), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_meta(self, url, meta):
+        self._write_atomic(self._path(url, META_SUFFIX), json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    def conditional_headers(self, url):
+        meta = self.get(url)
+        headers = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def is_due(self, meta, now=None):
+        now = now or datetime.now()
+        checked = datetime.fromisoformat(meta["checked_at"])
+        first = datetime.fromisoformat(meta["first_fetched_at"])
+        return now - checked >= self.revisit_after and now - first < self.revisit_for
+
+    def due_urls(self, now=None):
+        """Адреса страниц, которые пора перепроверить (условия is_due по индексу)."""
+        now = now or datetime.now()
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT url FROM pages WHERE checked_at <= ? AND first_fetched_at > ?",
+                ((now - self.revisit_after).timestamp(), (now - self.revisit_for).timestamp())
+            ).fetchall()
+        return {url for (url,) in rows}
+
+    def iter_meta(self):
+        # Полный обход каталога: нужен только для построения индекса
+        if not os.path.isdir(self.directory):
+            return
+        for bucket in os.scandir(self.directory):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith(META_SUFFIX):
+                    try:
+                        with open(entry.path, "r", encoding="utf-8") as f:
+                            yield json.load(f)
+                    except (OSError, ValueError):
+                        continue
+
+    def store(self, url, headers, body):
+        """Сохраняет ответ 200. Возвращает True, если содержимое новое или изменилось."""
+        now = datetime.now().isoformat()
+        meta = self.get(url) or {"url": url, "first_fetched_at": now}
+        digest = hashlib.sha256(body).hexdigest()
+        changed = meta.get("sha256") != digest
+        if changed:
+            self._write_atomic(self._path(url, BODY_SUFFIX), gzip.compress(body, compresslevel=6))
+            meta["fetched_at"] = now
+        # Имена заголовков без учёта регистра: requests и aiohttp отдают их по-разному
+        headers = {str(name).lower(): value for name, value in headers.items()}
+        meta.update(
+            sha256=digest,
+            size=len(body),
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            checked_at=now
+        )
+        self._save_meta(url, meta)
+        self._index(url, meta)
+        return changed
+
+    def touch(self, url):
+        # Ответ 304: страница не изменилась, отмечаем время проверки
+        meta = self.get(url)
+        if meta:
+            meta["checked_at"] = datetime.now().isoformat()
+            self._save_meta(url, meta)
+            self._index(url, meta)
+
+    def body(self, url):
+        try:
+            with open(self._path(url, BODY_SUFFIX), "rb") as f:
+                return gzip.decompress(f.read())
+        except OSError:
+            return None
+
+    def prune(self, now=None):
+        """Удаляет записи, которые больше не перепроверяются. Возвращает их число."""
+        now = now or datetime.now()
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT key FROM pages WHERE first_fetched_at <= ?",
+                ((now - self.revisit_for).timestamp(),)
+            ).fetchall()
+        for (key,) in rows:
+            for suffix in (META_SUFFIX, BODY_SUFFIX):
+                try:
+                    os.remove(self._key_path(key, suffix))
+                except OSError:
+                    pass
+        with self.lock:
+            self.conn.executemany("DELETE FROM pages WHERE key = ?", rows)
+            self.conn.commit()
+        return len(rows)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,119 @@
+import re
+
+
+# Экранированные последовательности, задающие символ кодом: после lower() текста
+# \x41 или \u0410 продолжали бы означать заглавную букву
+CODE_ESCAPES = frozenset("xuUN0")
+OCTAL_ESCAPE_RE = re.compile(r"[0-7]{3}")
+
+
+def lower_pattern(pattern):
+    # Приводим к нижнему регистру литералы шаблона, не трогая экранированные
+    # последовательности (\D, \S, \W, \B) и имена групп (?P<name>...), (?P=name)
+    result = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern):
+            result.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if pattern.startswith('(?', i):
+            if pattern.startswith('(?P<', i):
+                end = pattern.find('>', i)
+            elif pattern.startswith('(?P=', i):
+                end = pattern.find(')', i)
+            else:
+                end = i + 1
+            if end < 0:
+                # Незакрытое имя: шаблон всё равно не скомпилируется, оставляем как есть
+                result.append(pattern[i:])
+                break
+            result.append(pattern[i:end + 1])
+            i = end + 1
+            continue
+        result.append(char.lower())
+        i += 1
+    return ''.join(result)
+
+
+def is_lower_safe(pattern):
+    """Можно ли искать lower_pattern(pattern) по тексту в нижнем регистре вместо re.IGNORECASE.
+
+    Нельзя, если символ задан кодом (\\x41, \\u0410, \\N{...}, \\101)
+    или в классе символов есть диапазон, который lower() сужает ([A-z]).
+    """
+    i = 0
+    in_class = False
+    class_start = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern):
+            if pattern[i + 1] in CODE_ESCAPES or OCTAL_ESCAPE_RE.match(pattern, i + 1):
+                return False
+            i += 2
+            continue
+        if char == '[' and not in_class:
+            in_class = True
+            i += 1
+            # ] или ^] в начале класса — литерал
+            if pattern.startswith('^', i):
+                i += 1
+            if pattern.startswith(']', i):
+                i += 1
+            class_start = i
+            continue
+        if char == ']' and in_class:
+            in_class = False
+        elif in_class and char == '-' and class_start < i < len(pattern) - 1:
+            low, high = pattern[i - 1], pattern[i + 1]
+            cased = [c for c in (low, high) if c.lower() != c.upper()]
+            # Диапазон с буквой безопасен, только если обе границы — буквы одного регистра
+            if high != ']' and cased and (len(cased) < 2 or low.isupper() != high.isupper()):
+                return False
+        i += 1
+    return True
+
+
+class LeakDetector:
+    """Общий детектор категорий утечек для всех парсеров и ИИ-агента.
+
+    Шаблоны компилируются один раз при создании детектора. Шаблоны из
+    конфигов пользователя ищутся с флагами как есть. Для встроенных шаблонов
+    (lowercase=True) регистронезависимый поиск заменяется поиском по тексту,
+    приведённому к нижнему регистру один раз за вызов: это быстрее re.IGNORECASE
+    по каждой категории. Шаблоны, для которых такая замена меняет смысл
+    (см. is_lower_safe), ищутся с re.IGNORECASE.
+    """
+
+    def __init__(self, patterns, flags=re.IGNORECASE, lowercase=False):
+        self.patterns = dict(patterns)
+        self.flags = flags
+        self.categories = tuple(self.patterns)
+        # Исходные шаблоны нужны там, где важна позиция совпадения в тексте
+        self.compiled = {name: re.compile(pattern, flags) for name, pattern in self.patterns.items()}
+        lower_fast_path = bool(lowercase and flags & re.IGNORECASE)
+        scanners = []
+        for name, pattern in self.patterns.items():
+            if lower_fast_path and is_lower_safe(pattern):
+                scanners.append((name, re.compile(lower_pattern(pattern), flags & ~re.IGNORECASE), True))
+            else:
+                scanners.append((name, self.compiled[name], False))
+        self._scanners = tuple(scanners)
+        self.casefold = any(lowered for _, _, lowered in self._scanners)
+
+    def _texts(self, text):
+        return text, (text.lower() if self.casefold else text)
+
+    def scan(self, text):
+        # Возвращает множество категорий, шаблоны которых встречаются в тексте
+        text, lowered = self._texts(text)
+        return {name for name, scanner, low in self._scanners if scanner.search(lowered if low else text)}
+
+    def analyze(self, text):
+        text, lowered = self._texts(text)
+        return {name: scanner.search(lowered if low else text) is not None for name, scanner, low in self._scanners}
+
+    def any_match(self, text):
+        text, lowered = self._texts(text)
+        return any(scanner.search(lowered if low else text) for _, scanner, low in self._scanners)
@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import itertools
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# Общий идентификатор прогона: планировщик передаёт его парсерам и агенту через окружение
+RUN_ID_ENV = 'PIPELINE_RUN_ID'
+METRIC_PREFIX = 'leakmon'
+PROM_FILE = 'metrics.prom'
+SUMMARY_FILE = 'run_summary.json'
+
+
+_run_seq = itertools.count(1)
+
+
+def new_run_id():
+    # Номер в процессе различает прогоны планировщика, начатые в одну секунду
+    return f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{next(_run_seq)}"
+
+
+def current_run_id():
+    # Запуск вне планировщика получает собственный идентификатор
+    run_id = os.environ.get(RUN_ID_ENV)
+    if not run_id:
+        run_id = os.environ[RUN_ID_ENV] = new_run_id()
+    return run_id
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics:
+    """Таймеры этапов и счётчики одного прогона компонента конвейера.
+
+    Пишет два файла в output_dir (рядом со status.json компонента):
+    metrics.prom в текстовом формате Prometheus (для node_exporter textfile
+    collector) и run_summary.json со сводкой прогона. Методы потокобезопасны.
+    """
+
+    def __init__(self, component, output_dir, run_id=None):
+        self.component = component
+        self.output_dir = str(output_dir)
+        self.run_id = run_id or current_run_id()
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            entry = self.stages.setdefault(stage, {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            entry['count'] += 1
+            entry['seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+
+    def inc(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        with self.lock:
+            self.counters[name] = value
+
+    def update(self, prefix, values):
+        # Числовые поля готовой статистики (кэш, каскад, БД) под общим префиксом
+        for key, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.set(f"{prefix}_{key}", value)
+
+    def summary(self, status=None):
+        with self.lock:
+            return {
+                'run_id': self.run_id,
+                'component': self.component,
+                'status': status,
+                'started_at': self.started_at.isoformat(),
+                'finished_at': datetime.now().isoformat(),
+                'duration_seconds': round(time.perf_counter() - self.started, 3),
+                'stages': {
+                    stage: {key: round(value, 4) if isinstance(value, float) else value for key, value in entry.items()}
+                    for stage, entry in self.stages.items()
+                },
+                'counters': dict(self.counters)
+            }
+
+    def prometheus(self, summary):
+        component = _label(self.component)
+        lines = [
+            f"# HELP {METRIC_PREFIX}_run_info Идентификатор последнего прогона компонента",
+            f"# TYPE {METRIC_PREFIX}_run_info gauge",
+            f'{METRIC_PREFIX}_run_info{{component="{component}",run_id="{_label(self.run_id)}"}} 1',
+            f"# HELP {METRIC_PREFIX}_run_duration_seconds Длительность прогона",
+            f"# TYPE {METRIC_PREFIX}_run_duration_seconds gauge",
+            f'{METRIC_PREFIX}_run_duration_seconds{{component="{component}"}} {summary["duration_seconds"]}',
+            f"# HELP {METRIC_PREFIX}_run_finished_timestamp_seconds Время окончания прогона",
+            f"# TYPE {METRIC_PREFIX}_run_finished_timestamp_seconds gauge",
+            f'{METRIC_PREFIX}_run_finished_timestamp_seconds{{component="{component}"}} {time.time():.0f}'
+        ]
+        for metric, key, help_text in (
+            ('stage_duration_seconds', 'seconds', 'Суммарное время этапа за прогон'),
+            ('stage_max_duration_seconds', 'max_seconds', 'Самый долгий вызов этапа за прогон'),
+            ('stage_calls', 'count', 'Число вызовов этапа за прогон')
+        ):
+            lines.append(f"# HELP {METRIC_PREFIX}_{metric} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{metric} gauge")
+            for stage, entry in summary['stages'].items():
+                lines.append(f'{METRIC_PREFIX}_{metric}{{component="{component}",stage="{_label(stage)}"}} {entry[key]}')
+        lines.append(f"# HELP {METRIC_PREFIX}_counter Счётчики прогона: запросы, элементы, попадания в кэш, вызовы модели")
+        lines.append(f"# TYPE {METRIC_PREFIX}_counter gauge")
+        for name, value in summary['counters'].items():
+            lines.append(f'{METRIC_PREFIX}_counter{{component="{component}",name="{_label(name)}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def _write_atomic(self, file_name, content):
+        path = os.path.join(self.output_dir, file_name)
+        # Свой временный файл у каждого писателя: одновременные прогоны не мешают друг другу
+        tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def write(self, status=None):
+        # Ошибка записи метрик не должна ронять сам прогон
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            summary = self.summary(status)
+            self._write_atomic(SUMMARY_FILE, json.dumps(summary, ensure_ascii=False, indent=2))
+            self._write_atomic(PROM_FILE, self.prometheus(summary))
+            return summary
+        except OSError as e:
+            print(f"Не удалось записать метрики {self.component}: {e}")
+            return None
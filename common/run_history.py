@@ -0,0 +1,123 @@
+import os
+import json
+import threading
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+SCHEMA_SQL = '''
+    CREATE TABLE IF NOT EXISTS run_history (
+        id SERIAL PRIMARY KEY,
+        run_id TEXT NOT NULL,
+        module TEXT NOT NULL,
+        started_at TIMESTAMP NOT NULL,
+        finished_at TIMESTAMP NOT NULL,
+        duration_seconds DOUBLE PRECISION NOT NULL,
+        exit_code INTEGER,
+        timed_out BOOLEAN NOT NULL DEFAULT FALSE,
+        items_in INTEGER,
+        leaks INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS run_history_module_started_idx ON run_history (module, started_at DESC);
+'''
+
+INSERT_SQL = '''
+    INSERT INTO run_history (run_id, module, started_at, finished_at, duration_seconds, exit_code, timed_out, items_in, leaks)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+'''
+
+RECENT_SQL = '''
+    SELECT run_id, module, started_at, finished_at, duration_seconds, exit_code, timed_out, items_in, leaks
+    FROM run_history
+    WHERE module = %s
+    ORDER BY started_at DESC
+    LIMIT %s
+'''
+
+DB_ENV_VARS = ['DB_HOST', 'DB_PORT', 'DB_NAME', 'DB_USER', 'DB_PASSWORD']
+
+
+def read_counters(summary_path, run_id):
+    """Счётчики из run_summary.json модуля, если сводка относится к этому прогону."""
+    try:
+        with open(summary_path, 'r', encoding='utf-8') as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if summary.get('run_id') != run_id:
+        return {}
+    return summary.get('counters', {})
+
+
+class RunHistory:
+    """История запусков модулей в таблице run_history той же базы PostgreSQL, что и инциденты.
+
+    Одно соединение на процесс под блокировкой: записи редкие (одна на задание).
+    После ошибки соединение пересоздаётся при следующем вызове; сбой базы не
+    должен останавливать планировщик, поэтому ошибки только печатаются.
+    """
+
+    def __init__(self, db_params):
+        self.db_params = db_params
+        self.conn = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        # Те же переменные, что у ИИ-агента и server.js; без них история не ведётся
+        if any(os.getenv(var) is None for var in DB_ENV_VARS):
+            return None
+        return cls({
+            'host': os.getenv('DB_HOST'),
+            'port': os.getenv('DB_PORT'),
+            'dbname': os.getenv('DB_NAME'),
+            'user': os.getenv('DB_USER'),
+            'password': os.getenv('DB_PASSWORD')
+        })
+
+    def _connect(self):
+        if self.conn is None or self.conn.closed:
+            self.conn = psycopg2.connect(**self.db_params)
+            with self.conn.cursor() as cursor:
+                cursor.execute(SCHEMA_SQL)
+            self.conn.commit()
+        return self.conn
+
+    def _reset(self):
+        if self.conn is not None and not self.conn.closed:
+            self.conn.close()
+        self.conn = None
+
+    def record(self, run_id, module, started_at, finished_at, seconds, exit_code, timed_out, items_in=None, leaks=None):
+        with self.lock:
+            try:
+                conn = self._connect()
+                with conn.cursor() as cursor:
+                    cursor.execute(INSERT_SQL, (
+                        run_id, module, started_at, finished_at, seconds, exit_code, timed_out, items_in, leaks
+                    ))
+                conn.commit()
+                return True
+            except psycopg2.Error as e:
+                print(f"Не удалось записать историю запуска {module}: {e}")
+                self._reset()
+                return False
+
+    def recent(self, module, limit=10):
+        """Последние запуски модуля, новые первыми."""
+        with self.lock:
+            try:
+                conn = self._connect()
+                with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    cursor.execute(RECENT_SQL, (module, limit))
+                    rows = [dict(row) for row in cursor.fetchall()]
+                conn.commit()
+                return rows
+            except psycopg2.Error as e:
+                print(f"Не удалось прочитать историю запусков {module}: {e}")
+                self._reset()
+                return []
+
+    def close(self):
+        with self.lock:
+            self._reset()
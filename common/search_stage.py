@@ -0,0 +1,212 @@
+import os
+import re
+import json
+import time
+import random
+import importlib
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Фильтр даты в запросе сдвигается каждый день и не входит в ключ кэша
+DATE_FILTER_RE = re.compile(r"\b(?:after|before):\S+")
+
+
+def google_backend(options):
+    from googlesearch import search
+
+    lang = options.get("lang", "ru")
+
+    def run(query, num_results):
+        return list(search(query, num_results=num_results, lang=lang))
+    return run
+
+
+def json_backend(options):
+    # GET <endpoint>?q=...&num=N, ответ — JSON-список ссылок (локальный стенд, собственный прокси поиска)
+    import requests
+
+    endpoint = options["endpoint"]
+    timeout = options.get("timeout", 10)
+
+    def run(query, num_results):
+        response = requests.get(endpoint, params={"q": query, "num": num_results}, timeout=timeout)
+        response.raise_for_status()
+        return list(response.json())
+    return run
+
+
+SEARCH_BACKENDS = {"google": google_backend, "json": json_backend}
+
+
+def load_backend(name, options=None):
+    """Поисковый backend: google, json или "модуль:функция" — фабрика backend(options).
+
+    Backend — функция (query, num_results), возвращающая список ссылок.
+    """
+    options = options or {}
+    if name in SEARCH_BACKENDS:
+        return SEARCH_BACKENDS[name](options)
+    module_name, _, factory = name.partition(":")
+    if not factory:
+        raise ValueError(f"Неизвестный поисковый backend: {name}")
+    return getattr(importlib.import_module(module_name), factory)(options)
+
+
+def query_key(query):
+    return " ".join(DATE_FILTER_RE.sub(" ", query).lower().split())
+
+
+class TokenBucket:
+    """Ограничитель частоты: rate_per_minute запросов в минуту, до burst подряд."""
+
+    def __init__(self, rate_per_minute, burst=1):
+        self.rate = rate_per_minute / 60
+        self.capacity = max(burst, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Возвращает время ожидания в секундах; rate_per_minute <= 0 — без ограничения
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class QueryCache:
+    """Кэш выдачи поиска в JSON-файле: запрос → ссылки, запись живёт ttl."""
+
+    def __init__(self, path, ttl=timedelta(hours=12)):
+        self.path = str(path)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _fresh(self, entry, now):
+        try:
+            return now - datetime.fromisoformat(entry["fetched_at"]) < self.ttl
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def get(self, query, num_results):
+        with self.lock:
+            entry = self.entries.get(query_key(query))
+        # Выдача, запрошенная с меньшим числом результатов, не подходит
+        if entry and entry.get("num", 0) >= num_results and self._fresh(entry, datetime.now()):
+            return entry["urls"][:num_results]
+        return None
+
+    def put(self, query, num_results, urls):
+        with self.lock:
+            self.entries[query_key(query)] = {
+                "urls": list(urls), "num": num_results, "fetched_at": datetime.now().isoformat()
+            }
+
+    def save(self):
+        now = datetime.now()
+        with self.lock:
+            self.entries = {key: entry for key, entry in self.entries.items() if self._fresh(entry, now)}
+            data = json.dumps(self.entries, ensure_ascii=False, indent=2)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+
+class SearchStage:
+    """Этап поисковых запросов: пул из workers потоков под общим ограничителем частоты.
+
+    Одинаковые запросы (без учёта регистра, пробелов и фильтра даты)
+    выполняются один раз, выдача из QueryCache повторно не запрашивается.
+    После ошибки запрос повторяется до retries раз с паузой
+    random(0, min(backoff_max, backoff_base * 2^попытка)) секунд.
+    """
+
+    def __init__(self, backend, results_per_query=10, rate_per_minute=20, burst=1, workers=3,
+                 retries=3, backoff_base=5, backoff_max=120, cache=None, metrics=None):
+        self.backend = backend
+        self.results_per_query = results_per_query
+        self.limiter = TokenBucket(rate_per_minute, burst)
+        self.workers = max(workers, 1)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cache = cache
+        self.metrics = metrics
+
+    def _inc(self, name, value=1):
+        if self.metrics:
+            self.metrics.inc(name, value)
+
+    def _search(self, query):
+        for attempt in range(self.retries + 1):
+            waited = self.limiter.acquire()
+            if self.metrics and waited:
+                self.metrics.observe("search_rate_wait", waited)
+            self._inc("search_queries")
+            try:
+                started = time.perf_counter()
+                urls = list(self.backend(query, self.results_per_query))
+                if self.metrics:
+                    self.metrics.observe("search", time.perf_counter() - started)
+                return urls
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                self._inc("search_retries")
+                print(f"Ошибка поиска по запросу {query}: {e}. Повтор через {delay:.1f} с")
+                time.sleep(delay)
+
+    def _resolve(self, query):
+        if self.cache:
+            urls = self.cache.get(query, self.results_per_query)
+            if urls is not None:
+                self._inc("search_cache_hits")
+                return urls
+        print(f"Поиск по запросу: {query}")
+        urls = self._search(query)
+        if self.cache:
+            self.cache.put(query, self.results_per_query, urls)
+        return urls
+
+    def run(self, queries):
+        """Выполняет запросы. Возвращает ({запрос: ссылки}, {запрос: ошибка})."""
+        unique = {}
+        for query in queries:
+            unique.setdefault(query_key(query), query)
+        self._inc("search_duplicates", len(queries) - len(unique))
+
+        by_key, errors_by_key = {}, {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="search") as executor:
+            futures = {executor.submit(self._resolve, query): key for key, query in unique.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    by_key[key] = future.result()
+                except Exception as e:
+                    errors_by_key[key] = e
+                    self._inc("search_errors")
+        if self.cache:
+            self.cache.save()
+
+        results = {query: by_key[query_key(query)] for query in queries if query_key(query) in by_key}
+        errors = {unique[key]: error for key, error in errors_by_key.items()}
+        return results, errors
@@ -0,0 +1,119 @@
+from fnmatch import fnmatchcase
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Правила по умолчанию; парсер может переопределить любое из них секцией canonical в конфиге
+DEFAULT_RULES = {
+    "tracking_params": [
+        "utm_*", "fbclid", "gclid", "dclid", "yclid", "ysclid", "_openstat",
+        "mc_cid", "mc_eid", "igshid", "_ga", "rb_clickid"
+    ],
+    "force_https": True,
+    "strip_www": True,
+    "host_prefixes": ["m.", "mobile.", "amp."],
+    "strip_amp": True,
+    "github_hosts": ["github.com", "www.github.com", "raw.githubusercontent.com"],
+}
+RAW_GITHUB_HOST = "raw.githubusercontent.com"
+
+
+class UrlCanonicalizer:
+    """Приводит разные адреса одной страницы к одному ключу.
+
+    Отбрасываются фрагмент, порт по умолчанию и параметры отслеживания
+    (tracking_params, допускается маска «utm_*»), остальные параметры
+    сортируются. http приводится к https, у хоста убираются www. и префиксы
+    мобильных и AMP-версий (host_prefixes), из пути — сегмент amp. Ключ
+    нужен только для дедупликации: скачивается исходный адрес.
+
+    Адреса файлов GitHub (github_hosts) — blob/raw на github.com и
+    raw.githubusercontent.com с веткой или SHA коммита — сводятся к ключу
+    «github:владелец/репозиторий/путь». Имя ветки со «/» из адреса не
+    отличить от пути, такие ссылки дают разные ключи. Ключ не зависит от
+    версии файла: парсер GitHub добавляет к нему хэш содержимого.
+    """
+
+    def __init__(self, rules=None):
+        rules = dict(DEFAULT_RULES, **(rules or {}))
+        patterns = [name.lower() for name in rules["tracking_params"]]
+        self.tracking_names = {name for name in patterns if "*" not in name and "?" not in name}
+        self.tracking_masks = [name for name in patterns if name not in self.tracking_names]
+        self.force_https = rules["force_https"]
+        self.strip_www = rules["strip_www"]
+        self.host_prefixes = tuple(rules["host_prefixes"])
+        self.strip_amp = rules["strip_amp"]
+        self.github_hosts = {host.lower() for host in rules["github_hosts"]}
+
+    def is_tracking(self, name):
+        name = name.lower()
+        return name in self.tracking_names or any(fnmatchcase(name, mask) for mask in self.tracking_masks)
+
+    def _host(self, host):
+        if self.strip_www and host.startswith("www."):
+            host = host[len("www."):]
+        for prefix in self.host_prefixes:
+            # Префикс снимается, только если остаётся домен с точкой: m.ru остаётся m.ru
+            if host.startswith(prefix) and "." in host[len(prefix):]:
+                return host[len(prefix):]
+        return host
+
+    def _path(self, path):
+        segments = [segment for segment in path.split("/") if segment]
+        if self.strip_amp:
+            segments = [segment for segment in segments if segment.lower() not in ("amp", "amp.html")]
+            if segments and segments[-1].lower().endswith(".amp"):
+                segments[-1] = segments[-1][:-len(".amp")]
+        return "/" + "/".join(segments)
+
+    def _github(self, host, path):
+        segments = [segment for segment in path.split("/") if segment]
+        if host == RAW_GITHUB_HOST:
+            # /владелец/репозиторий/<ветка|SHA|refs/heads/ветка>/путь
+            skip = 5 if segments[2:4] == ["refs", "heads"] else 3
+        elif len(segments) >= 3 and segments[2] in ("blob", "raw"):
+            # /владелец/репозиторий/blob|raw/<ветка|SHA|refs/heads/ветка>/путь
+            skip = 6 if segments[3:5] == ["refs", "heads"] else 4
+        else:
+            return None
+        if len(segments) <= skip:
+            return None
+        # Имена владельца и репозитория на GitHub не зависят от регистра, путь — зависит
+        return f"github:{segments[0].lower()}/{segments[1].lower()}/{'/'.join(segments[skip:])}"
+
+    def canonical(self, url):
+        url = url.strip()
+        try:
+            return self._canonical(url)
+        except ValueError:
+            # Битый адрес (порт http://host:abc/, незакрытый IPv6) сравнивается как есть
+            return url
+
+    def _canonical(self, url):
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            return url
+        host = (parts.hostname or "").lower().rstrip(".")
+        if host in self.github_hosts:
+            key = self._github(host, parts.path)
+            if key:
+                return key
+        port = parts.port
+        if self.force_https:
+            scheme = "https"
+        host = self._host(host)
+        netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+
+        query = [
+            (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not self.is_tracking(name) and not (self.strip_amp and name.lower() == "amp")
+        ]
+        return urlunsplit((scheme, netloc, self._path(parts.path), urlencode(sorted(query)), ""))
+
+    __call__ = canonical
+
+
+DEFAULT_CANONICALIZER = UrlCanonicalizer()
+
+
+def canonical_url(url):
+    return DEFAULT_CANONICALIZER.canonical(url)
@@ -0,0 +1,131 @@
+import os
+import math
+import json
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+
+SCHEMA_SQL = '''
+    CREATE TABLE IF NOT EXISTS processed (
+        url TEXT PRIMARY KEY,
+        processed_at TEXT NOT NULL
+    ) WITHOUT ROWID
+'''
+
+
+class BloomFilter:
+    """Фильтр Блума в bytearray: «нет» — точно нет, «да» — нужно проверить в базе."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        # Двойное хеширование: k позиций из двух 64-битных половин одного blake2b
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class ProcessedUrlStore:
+    """Множество обработанных URL в SQLite (WAL) с проверкой и добавлением по одному.
+
+    Заменяет JSON-список, который переписывался целиком на каждой контрольной
+    точке: добавление — одна вставка, проверка — поиск по первичному ключу.
+    Добавленные адреса видны сразу, а на диске фиксируются вызовом commit()
+    вместе с результатами, чтобы после сбоя не остались адреса без
+    сохранённых результатов. Методы потокобезопасны. С bloom=True перед
+    базой стоит фильтр Блума, и большинство проверок новых адресов обходится
+    без запроса к базе. При первом открытии импортирует прежний JSON-список
+    legacy_json. key_func приводит адрес к ключу (например, канонический URL)
+    при проверке, добавлении и импорте.
+    """
+
+    def __init__(self, path, bloom=False, legacy_json=None, error_rate=0.01, key_func=None):
+        self.path = str(path)
+        self.key_func = key_func or (lambda url: url)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(SCHEMA_SQL)
+        self.conn.commit()
+        self.lock = threading.Lock()
+        self.lookups = 0
+        self.bloom_skips = 0
+
+        if legacy_json and len(self) == 0:
+            self._import_json(legacy_json)
+
+        self.bloom = None
+        if bloom:
+            count = len(self)
+            # Запас вдвое, чтобы доля ложных срабатываний не росла до следующего запуска
+            self.bloom = BloomFilter(max(count * 2, 100_000), error_rate)
+            for (url,) in self.conn.execute("SELECT url FROM processed"):
+                self.bloom.add(url)
+
+    def _import_json(self, legacy_json):
+        try:
+            with open(legacy_json, "r", encoding="utf-8") as f:
+                urls = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = datetime.now().isoformat()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO processed (url, processed_at) VALUES (?, ?)",
+                ((self.key_func(url), now) for url in urls)
+            )
+            self.conn.commit()
+        print(f"Импортировано {len(urls)} обработанных URL из {legacy_json}")
+
+    def __contains__(self, url):
+        url = self.key_func(url)
+        if self.bloom is not None and url not in self.bloom:
+            self.bloom_skips += 1
+            return False
+        with self.lock:
+            self.lookups += 1
+            return self.conn.execute("SELECT 1 FROM processed WHERE url = ?", (url,)).fetchone() is not None
+
+    def add(self, url):
+        url = self.key_func(url)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO processed (url, processed_at) VALUES (?, ?)",
+                (url, datetime.now().isoformat())
+            )
+            if self.bloom is not None:
+                self.bloom.add(url)
+
+    def commit(self):
+        with self.lock:
+            self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM processed").fetchone()[0]
+
+    def __iter__(self):
+        with self.lock:
+            urls = [url for (url,) in self.conn.execute("SELECT url FROM processed")]
+        return iter(urls)
+
+    def stats(self):
+        return {"urls": len(self), "db_lookups": self.lookups, "bloom_skips": self.bloom_skips}
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
@@ -0,0 +1,81 @@
+import os
+import sys
+import runpy
+import signal
+import multiprocessing
+
+# Зависимости парсеров, которые forkserver импортирует один раз при старте.
+# Отсутствующие модули forkserver пропускает молча
+PRELOAD_MODULES = [
+    'requests', 'bs4', 'lxml.html', 'yaml', 'tqdm', 'aiofiles', 'dotenv', 'telethon',
+    'googlesearch', 'common.leak_detector', 'common.entity_extractor', 'common.metrics'
+]
+# Зависимости ИИ-агента: сотни мегабайт и секунды импорта, поэтому их подгружает
+# только пул, в котором запускается агент (планировщик)
+AGENT_PRELOAD_MODULES = ['torch', 'transformers']
+# Сколько ждать завершения после SIGTERM, прежде чем послать SIGKILL
+KILL_GRACE_SECONDS = 10
+
+
+def _run_job(script_path, args, log_path, env, cwd):
+    # Выполняется в отдельном процессе, порождённом forkserver'ом
+    os.setsid()
+    if log_path:
+        log_fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.dup2(log_fd, 1)
+        os.dup2(log_fd, 2)
+        os.close(log_fd)
+    if env:
+        os.environ.update(env)
+    script_path = os.path.abspath(script_path)
+    if cwd:
+        os.chdir(cwd)
+    # Как при запуске «python script.py»: каталог скрипта первым в sys.path
+    sys.path.insert(0, os.path.dirname(script_path))
+    sys.argv = [script_path, *args]
+    # Блок if __name__ == "__main__" скрипта вызывает его main()/run()
+    runpy.run_path(script_path, run_name='__main__')
+
+
+class WarmPool:
+    """Запуск скриптов конвейера в процессах от forkserver'а с заранее импортированными зависимостями.
+
+    Каждое задание — отдельный процесс в своей группе: падение, утечка памяти или
+    зависание скрипта не затрагивают вызывающий процесс, а по таймауту группа
+    останавливается целиком. Экономится только время импорта библиотек.
+    Модуль __main__ вызывающего процесса импортируется в задании заново
+    (как при spawn), поэтому его запуск должен быть под if __name__ == "__main__".
+    """
+
+    def __init__(self, preload=None):
+        self.context = multiprocessing.get_context('forkserver')
+        self.context.set_forkserver_preload(list(PRELOAD_MODULES if preload is None else preload))
+
+    def start(self):
+        # Поднимает forkserver заранее, чтобы импорт не попал во время первого задания
+        from multiprocessing import forkserver
+        forkserver.ensure_running()
+        return self
+
+    def run(self, script_path, args=(), log_path=None, env=None, cwd=None, timeout=None):
+        """Выполняет скрипт и ждёт его завершения. Возвращает (код возврата, таймаут)."""
+        process = self.context.Process(
+            target=_run_job, args=(script_path, list(args), log_path, env, cwd), daemon=False
+        )
+        process.start()
+        process.join(timeout)
+        if process.exitcode is None:
+            self._stop(process)
+            return process.exitcode, True
+        return process.exitcode, False
+
+    def _stop(self, process):
+        # Процесс сам стал лидером группы, поэтому останавливаем и его потомков
+        for sig, wait in ((signal.SIGTERM, KILL_GRACE_SECONDS), (signal.SIGKILL, None)):
+            try:
+                os.killpg(process.pid, sig)
+            except ProcessLookupError:
+                pass
+            process.join(wait)
+            if process.exitcode is not None:
+                return
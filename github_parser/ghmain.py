@@ -1,13 +1,22 @@
 import requests
 from bs4 import BeautifulSoup
 import re
+import sys
 import time
 import json
 import yaml
+import hashlib
 from pathlib import Path
 from datetime import datetime
+from urllib.parse import urlparse
 
 BASE_DIR = Path(__file__).parent.resolve()
+sys.path.insert(0, str(BASE_DIR.parent))
+
+from common.leak_detector import LeakDetector
+from common.metrics import Metrics
+from common.url_canon import UrlCanonicalizer, DEFAULT_RULES
+
 CONFIG_PATH = BASE_DIR / "config.yaml"
 RESULTS_DIR = BASE_DIR / "github_parser_result"
 PROCESSED_PATH = RESULTS_DIR / "processed_links.txt"
@@ -16,53 +25,82 @@ def load_config():
     with open(CONFIG_PATH, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
-def load_processed_links():
+def create_canonicalizer(config, base_url):
+    # Ссылки blob/raw и по ветке/SHA одного файла сводятся к «github:владелец/репозиторий/путь»
+    rules = dict(config.get("canonical", {}))
+    hosts = list(rules.get("github_hosts", DEFAULT_RULES["github_hosts"]))
+    rules["github_hosts"] = hosts + [urlparse(base_url).hostname or ""]
+    return UrlCanonicalizer(rules)
+
+def load_processed_links(canonical):
     if not PROCESSED_PATH.exists():
         return set()
+    # Ссылки, сохранённые до канонизации, приводятся к ключу при загрузке; строки
+    # без хэша содержимого ни с чем не совпадут, и такие файлы проверятся один раз заново
     with open(PROCESSED_PATH, "r", encoding="utf-8") as f:
-        return set(line.strip() for line in f if line.strip())
+        return set(canonical(line.strip()) for line in f if line.strip())
+
+def content_key(file_key, content):
+    # Файл и его содержимое: новый коммит в уже найденный файл анализируется заново
+    return f"{file_key}@{hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]}"
 
 def save_processed_link(url):
     with open(PROCESSED_PATH, "a", encoding="utf-8") as f:
         f.write(url + "\n")
 
-def analyze_content(text, regex_config):
-    analysis = {key: False for key in regex_config}
-    for key, pattern in regex_config.items():
-        if re.search(pattern, text, re.MULTILINE):
-            analysis[key] = True
+def analyze_content(text, detector):
+    analysis = detector.analyze(text)
     analysis["volume"] = False
     analysis["leak"] = any(analysis.values())
     return analysis
 
-def scrape_github(config, processed_links, headers):
+def scrape_github(config, processed_links, headers, metrics, canonical):
     print("В процессе выполнения...")
     results = []
-    base_url = "https://github.com"
+    seen_links = set()
+    base_url = config.get("base_url", "https://github.com").rstrip("/")
+    detector = LeakDetector(config["regex_patterns"], flags=re.MULTILINE)
 
     for query in config["queries"]:
         for page in range(1, config["max_pages"] + 1):
-            search_url = f"https://github.com/search?q={query.replace(' ', '+')}&type=code&p={page}"
+            search_url = f"{base_url}/search?q={query.replace(' ', '+')}&type=code&p={page}"
             print(f"Fetching: {search_url}")
             try:
-                resp = requests.get(search_url, headers=headers)
+                metrics.inc("http_requests")
+                with metrics.timer("search_page"):
+                    resp = requests.get(search_url, headers=headers)
                 soup = BeautifulSoup(resp.text, "html.parser")
                 code_links = soup.select("a.v-align-middle")
+                metrics.inc("items_in", len(code_links))
 
                 for link in code_links:
                     file_path = base_url + link['href']
-                    if file_path in processed_links:
-                        print(f"Пропущено (уже обработано): {file_path}")
+                    file_key = canonical(file_path)
+                    if file_key in seen_links:
+                        # Тот же файл по другой ссылке (другая ветка, коммит, blob/raw) в этом прогоне
+                        metrics.inc("canonical_duplicates")
+                        metrics.inc("fetches_avoided")
                         continue
 
                     raw_url = file_path.replace("/blob/", "/raw/")
                     try:
-                        raw_resp = requests.get(raw_url, headers=headers)
+                        metrics.inc("http_requests")
+                        with metrics.timer("fetch_raw"):
+                            raw_resp = requests.get(raw_url, headers=headers)
                         if raw_resp.status_code != 200:
+                            metrics.inc("http_errors")
                             continue
+                        # Только после удачного скачивания: иначе файл попробуют по другой ссылке
+                        seen_links.add(file_key)
 
                         content = raw_resp.text
-                        analysis = analyze_content(content, config["regex_patterns"])
+                        processed_key = content_key(file_key, content)
+                        if processed_key in processed_links:
+                            metrics.inc("skipped_processed")
+                            print(f"Пропущено (уже обработано): {file_path}")
+                            continue
+                        with metrics.timer("analyze"):
+                            analysis = analyze_content(content, detector)
                         if not analysis["leak"]:
                             continue
 
@@ -78,12 +116,16 @@ def scrape_github(config, processed_links, headers):
                         }
 
                         results.append(result)
-                        save_processed_link(file_path)
+                        metrics.inc("items_out")
+                        processed_links.add(processed_key)
+                        save_processed_link(processed_key)
                         time.sleep(config["delay_between_requests"])
                     except Exception as e:
+                        metrics.inc("http_errors")
                         print(f"Ошибка при анализе файла: {e}")
                 time.sleep(config["delay_between_pages"])
             except Exception as e:
+                metrics.inc("search_errors")
                 print(f"Ошибка при обработке страницы поиска: {e}")
     return results
 
@@ -104,19 +146,25 @@ def ensure_dirs():
 def main():
     print("Начал работу")
     ensure_dirs()
+    metrics = Metrics("GitHubparser", RESULTS_DIR)
+    status = "Произошла ошибка"
     try:
         config = load_config()
         headers = config.get("headers", {"User-Agent": "Mozilla/5.0"})
-        processed_links = load_processed_links()
+        canonical = create_canonicalizer(config, config.get("base_url", "https://github.com"))
+        processed_links = load_processed_links(canonical)
         output_path = RESULTS_DIR / config.get("output_file", "github_leaks.json")
 
-        new_results = scrape_github(config, processed_links, headers)
-        save_results(new_results, output_path)
-        status = "Обнаружил утечки" if new_results else "Не обнаружил утечек"
+        new_results = scrape_github(config, processed_links, headers, metrics, canonical)
+        with metrics.timer("save"):
+            save_results(new_results, output_path)
+        print("Обнаружил утечки" if new_results else "Не обнаружил утечек")
+        status = "Закончил работу успешно"
         print(status)
-        print("Закончил работу успешно")
     except Exception as e:
         print(f"Произошла ошибка: {e}")
+    finally:
+        metrics.write(status)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,6 +4,8 @@ import sys
 import subprocess
 import signal
 
+from common.warm_pool import WarmPool
+
 # Конфигурация: список сервисов с командами и рабочими директориями
 SERVICES = [
     ("tg_parser", ["python", "tgmain.py"], "diplom/telegram/telegram_parser"),
@@ -12,14 +14,18 @@ SERVICES = [
     ("web_parser", ["python", "web_parser.py"], "diplom/web_parser"),
 ]
 
-def run_services_sequentially():
+def run_services_sequentially(pool=None):
     for name, cmd, cwd in SERVICES:
         print(f"[оркестратор] Запуск {name}…")
         try:
-            # Запускаем процесс в нужной директории
-            process = subprocess.Popen(cmd, cwd=cwd)
-            process.wait()  # Ждём завершения
-            exit_code = process.returncode
+            if pool:
+                # Скрипт выполняется в процессе от forkserver'а с уже импортированными библиотеками
+                exit_code, _ = pool.run(os.path.join(cwd, cmd[1]), cmd[2:], cwd=cwd)
+            else:
+                # Запускаем процесс в нужной директории
+                process = subprocess.Popen(cmd, cwd=cwd)
+                process.wait()  # Ждём завершения
+                exit_code = process.returncode
 
             print(f"[оркестратор] {name} завершился с кодом {exit_code}")
             if exit_code != 0:
@@ -33,4 +39,4 @@ def run_services_sequentially():
             break
 
 if __name__ == "__main__":
-    run_services_sequentially()
\ No newline at end of file
+    run_services_sequentially(WarmPool().start() if '--warm' in sys.argv else None)
\ No newline at end of file
@@ -1,6 +1,6 @@
 import requests
 from bs4 import BeautifulSoup
-import re
+import sys
 import time
 import random
 import json
@@ -11,6 +11,11 @@ from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.resolve()
+sys.path.insert(0, str(BASE_DIR.parent))
+
+from common.leak_detector import LeakDetector
+from common.metrics import Metrics
+
 CONFIG_PATH = BASE_DIR / "config.yaml"
 RESULTS_DIR = BASE_DIR / "paste_result"
 PROCESSED_PATH = RESULTS_DIR / "processed_ids.json"
@@ -28,7 +33,12 @@ class PastebinMonitor:
         self.whitelist = self.config["whitelist"]
         self.delay_range = tuple(self.config["delay_range"])
         self.threads = self.config.get("threads", 10)
+        self.base_url = self.config.get("base_url", "https://pastebin.com").rstrip("/")
+
+        self.detector = LeakDetector(self.patterns)
+        self.whitelist_detector = LeakDetector({f"whitelist_{i}": p for i, p in enumerate(self.whitelist)})
 
+        self.metrics = Metrics("pastebinparser", RESULTS_DIR)
         self.processed_ids = self.load_processed_ids()
         self.results = []
 
@@ -54,10 +64,13 @@ class PastebinMonitor:
 
     def fetch_archive_links(self):
         paste_keys = set()
-        url = "https://pastebin.com/archive"
+        url = f"{self.base_url}/archive"
         try:
-            response = requests.get(url, timeout=10)
+            self.metrics.inc("http_requests")
+            with self.metrics.timer("archive"):
+                response = requests.get(url, timeout=10)
             if response.status_code != 200:
+                self.metrics.inc("http_errors")
                 self.save_status("Произошла ошибка", f"Ошибка получения страницы: {response.status_code}")
                 print(f"Произошла ошибка: Ошибка получения страницы: {response.status_code}")
                 return []
@@ -77,16 +90,22 @@ class PastebinMonitor:
 
     def fetch_paste_content(self, paste_key):
         try:
-            url = f"https://pastebin.com/raw/{paste_key}"
-            response = requests.get(url, timeout=10)
-            return response.text if response.status_code == 200 else None
+            url = f"{self.base_url}/raw/{paste_key}"
+            self.metrics.inc("http_requests")
+            with self.metrics.timer("fetch"):
+                response = requests.get(url, timeout=10)
+            if response.status_code != 200:
+                self.metrics.inc("http_errors")
+                return None
+            return response.text
         except Exception as e:
+            self.metrics.inc("http_errors")
             print(f"Произошла ошибка при получении пасты {paste_key}: {e}")
             return None
 
     def extract_snippet(self, text):
-        for pattern in self.patterns.values():
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self.detector.compiled.values():
+            match = pattern.search(text)
             if match:
                 start = max(match.start() - 50, 0)
                 end = min(match.end() + 100, len(text))
@@ -95,18 +114,11 @@ class PastebinMonitor:
 
     def analyze_content(self, text):
         # Пропускаем текст, если он соответствует белому списку
-        for pattern in self.whitelist:
-            if re.search(pattern, text, re.IGNORECASE):
-                return {}
+        if self.whitelist_detector.any_match(text):
+            return {}
         # Требуем минимум два совпадения для подтверждения утечки
-        findings = {}
-        match_count = 0
-        for label, pattern in self.patterns.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                findings[label] = True
-                match_count += 1
-            else:
-                findings[label] = False
+        findings = self.detector.analyze(text)
+        match_count = sum(findings.values())
         return findings if match_count >= 2 else {}
 
     def process_entry(self, paste_key):
@@ -119,10 +131,12 @@ class PastebinMonitor:
         if not content:
             return
 
-        analysis = self.analyze_content(content)
+        with self.metrics.timer("analyze"):
+            analysis = self.analyze_content(content)
+        self.metrics.inc("pastes_processed")
         if any(analysis.values()):
             result = {
-                "url": f"https://pastebin.com/{paste_key}",
+                "url": f"{self.base_url}/{paste_key}",
                 "service": "pastebin.com",
                 "title": "",
                 "snippet": self.extract_snippet(content),
@@ -131,6 +145,7 @@ class PastebinMonitor:
                 "timestamp": datetime.utcnow().isoformat()
             }
             self.results.append(result)
+            self.metrics.inc("items_out")
             print(f"Обнаружил утечки: {result['url']}")
 
         self.processed_ids.add(paste_key)
@@ -139,30 +154,38 @@ class PastebinMonitor:
         # Очищаем старый статус перед началом
         self.save_status("Начал работу")
         print("Начал работу")
+        status = "Произошла ошибка"
         try:
             all_keys = self.fetch_archive_links()
             new_keys = [k for k in all_keys if k not in self.processed_ids]
+            self.metrics.set("archive_keys", len(all_keys))
+            self.metrics.set("items_in", len(new_keys))
             print(f"В процессе выполнения... Найдено {len(new_keys)} новых записей")
 
             if not new_keys:
-                self.save_status("Не обнаружил утечек")
-                print("Не обнаружил утечек")
+                status = "Не обнаружил утечек"
+                self.save_status(status)
+                print(status)
                 return
 
-            with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            with self.metrics.timer("process_total"), ThreadPoolExecutor(max_workers=self.threads) as executor:
                 list(tqdm(executor.map(self.process_entry, new_keys), total=len(new_keys), desc="Обработка паст"))
 
-            self.save_results()
-            self.save_processed_ids()
+            with self.metrics.timer("save"):
+                self.save_results()
+                self.save_processed_ids()
 
             status = "Обнаружил утечки" if self.results else "Не обнаружил утечек"
             self.save_status(status)
             print(status)
-            self.save_status("Закончил работу успешно")
-            print("Закончил работу успешно")
+            status = "Закончил работу успешно"
+            self.save_status(status)
+            print(status)
         except Exception as e:
             self.save_status("Произошла ошибка", e)
             print(f"Произошла ошибка: {e}")
+        finally:
+            self.metrics.write(status)
 
 if __name__ == "__main__":
     monitor = PastebinMonitor()
@@ -1,17 +1,54 @@
 import json
 import subprocess
+import signal
 import time
 import schedule
 import os
 import logging
 import sys
+import re
+import shutil
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from logging.handlers import RotatingFileHandler
-from threading import Lock
+from threading import Lock, Thread
+
+from dotenv import load_dotenv
+
+from common.metrics import Metrics, new_run_id, RUN_ID_ENV
+from common.warm_pool import WarmPool, PRELOAD_MODULES, AGENT_PRELOAD_MODULES
+from common.cron import CronExpression, is_cron
+from common.run_history import RunHistory, read_counters
 
 # Привязка всех путей к директории, где лежит этот скрипт
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_FILE = os.path.join(BASE_DIR, 'config.json')
 AGENT_SCRIPT = os.path.join(BASE_DIR, 'ai-agent/ai_agent.py')
+LOGS_DIR = os.path.join(BASE_DIR, 'logs')
+# Вывод каждого задания последнего прогона: logs/jobs/<модуль>.log
+JOB_LOGS_DIR = os.path.join(LOGS_DIR, 'jobs')
+# Метрики каждого прогона в своём каталоге logs/runs/<run_id>: прогоны по расписаниям
+# модулей идут одновременно и не должны затирать сводки друг друга
+RUNS_DIR = os.path.join(LOGS_DIR, 'runs')
+RUNS_KEEP = 200
+
+# Значения по умолчанию для ключей max_parallel и timeouts в config.json
+DEFAULT_MAX_PARALLEL = 4
+DEFAULT_TIMEOUT = 3600
+# Сколько ждать завершения после SIGTERM, прежде чем послать SIGKILL
+KILL_GRACE_SECONDS = 10
+OUTPUT_TAIL_LINES = 20
+# Как часто проверять, не изменился ли config.json
+CONFIG_POLL_SECONDS = 5
+# Интервалы в schedules: 15m, 2h, 1d
+INTERVAL_RE = re.compile(r'^(\d+)\s*([mhd])$')
+INTERVAL_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days'}
+INTERVAL_MINUTES = {'m': 1, 'h': 60, 'd': 1440}
+# Адаптивный режим: во сколько раз можно сократить или растянуть интервал модуля
+# и сколько последних запусков из истории учитывать
+ADAPTIVE_MIN_FACTOR = 0.25
+ADAPTIVE_MAX_FACTOR = 8
+ADAPTIVE_HISTORY = 10
 
 PARSER_PATHS = {
     'webparser': os.path.join(BASE_DIR, 'web_parser/webmain.py'),
@@ -20,14 +57,45 @@ PARSER_PATHS = {
     'telegramparser': os.path.join(BASE_DIR, 'telegram/telegram_parser/tgmain.py')
 }
 
-run_lock = Lock()
+# Идентификаторы тех же парсеров в ai-agent/config.json
+AGENT_PARSER_IDS = {
+    'webparser': 'web_parser',
+    'GitHubparser': 'github_parser',
+    'pastebinparser': 'paste',
+    'telegramparser': 'telegram_parser'
+}
+
+# run_summary.json, которые пишут модули (common/metrics.py): из них берутся
+# число новых записей (items_in) и найденных утечек (items_out)
+SUMMARY_PATHS = {
+    'webparser': os.path.join(BASE_DIR, 'web_parser/leak_parser_result/run_summary.json'),
+    'GitHubparser': os.path.join(BASE_DIR, 'github_parser/github_parser_result/run_summary.json'),
+    'pastebinparser': os.path.join(BASE_DIR, 'paste_parser/paste_result/run_summary.json'),
+    'telegramparser': os.path.join(BASE_DIR, 'telegram/telegram_parser/telegram_parser_result/run_summary.json')
+}
+AGENT_STATE_DIR = os.path.join(BASE_DIR, 'ai-agent/state')
+
+# Модули, которые сейчас выполняются, и блокировка запусков агента
+running_lock = Lock()
+running_modules = set()
+agent_lock = Lock()
+# Пул с заранее импортированными зависимостями (ключ warm_pool в config.json)
+warm_pool = None
+warm_pool_lock = Lock()
+# Время следующего запуска модулей с адаптивным интервалом
+adaptive_lock = Lock()
+adaptive_due = {}
+
+load_dotenv()
+# История запусков в PostgreSQL (таблица run_history); без настроек БД не ведётся
+run_history = RunHistory.from_env()
 
 # Логирование: файл + консоль
-os.makedirs(os.path.join(BASE_DIR, 'logs'), exist_ok=True)
+os.makedirs(LOGS_DIR, exist_ok=True)
 logger = logging.getLogger('scheduler')
 logger.setLevel(logging.INFO)
 
-file_handler = RotatingFileHandler(os.path.join(BASE_DIR, 'logs/scheduler.log'), maxBytes=1_000_000, backupCount=3)
+file_handler = RotatingFileHandler(os.path.join(LOGS_DIR, 'scheduler.log'), maxBytes=1_000_000, backupCount=3)
 file_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
 
 console_handler = logging.StreamHandler(sys.stdout)
@@ -40,7 +108,12 @@ def load_config():
     if not os.path.exists(CONFIG_FILE):
         default_config = {
             "frequency": "daily",
-            "modules": []
+            "modules": [],
+            "max_parallel": DEFAULT_MAX_PARALLEL,
+            "pipeline": True,
+            "warm_pool": False,
+            "adaptive": False,
+            "timeouts": {"default": DEFAULT_TIMEOUT}
         }
         with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
             json.dump(default_config, f, indent=2, ensure_ascii=False)
@@ -50,63 +123,438 @@ def load_config():
     with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def run_script(script_path):
+def job_timeout(config, name):
+    # timeouts: {"default": секунды, "<модуль>": секунды}
+    timeouts = config.get('timeouts', {})
+    return timeouts.get(name, timeouts.get('default', DEFAULT_TIMEOUT))
+
+def get_warm_pool(config):
+    global warm_pool
+    if not config.get('warm_pool', False):
+        return None
+    # Потоки расписания могут прийти сюда одновременно: forkserver должен подняться один раз
+    with warm_pool_lock:
+        if warm_pool is None:
+            # warm_pool_preload заменяет список модулей; по умолчанию — зависимости парсеров
+            # и, если агент на месте, его torch и transformers
+            preload = config.get('warm_pool_preload')
+            if preload is None:
+                preload = PRELOAD_MODULES + (AGENT_PRELOAD_MODULES if os.path.isfile(AGENT_SCRIPT) else [])
+            warm_pool = WarmPool(preload).start()
+            logger.info("Запущен пул процессов с предзагруженными зависимостями")
+        return warm_pool
+
+def stop_process(process):
+    # Скрипт запущен в отдельной группе процессов: останавливаем её целиком,
+    # чтобы не осталось дочерних процессов (браузеров, воркеров модели)
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=KILL_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+def output_tail(log_path, lines=OUTPUT_TAIL_LINES):
+    try:
+        with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+            return ''.join(f.readlines()[-lines:]).rstrip()
+    except OSError:
+        return ''
+
+def run_script(script_path, run_id=None, metrics=None, stage=None, timeout=None, args=(), pool=None):
+    """Запускает скрипт с таймаутом, вывод пишет в logs/jobs/<stage>.log.
+
+    С pool (WarmPool) скрипт выполняется в процессе от forkserver'а без повторного
+    импорта зависимостей, иначе — новым интерпретатором.
+
+    Возвращает словарь с кодом возврата, признаком таймаута и длительностью.
+    """
+    name = stage or os.path.basename(script_path)
+    os.makedirs(JOB_LOGS_DIR, exist_ok=True)
+    log_path = os.path.join(JOB_LOGS_DIR, f"{name}.log")
+    result = {"name": name, "exit_code": None, "timed_out": False, "seconds": 0.0, "log": log_path,
+              "started_at": datetime.now()}
+
+    started = time.perf_counter()
+    logger.info(f"Запуск скрипта: {script_path}" + (f" (таймаут {timeout} с)" if timeout else "")
+                + (" в пуле" if pool else ""))
     try:
-        logger.info(f"Запуск скрипта: {script_path}")
-        subprocess.run(['python', script_path], check=True)
-        logger.info(f"Успешно завершён: {script_path}")
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Ошибка при выполнении {script_path}: {e}")
-
-def run_parsers():
-    if run_lock.locked():
-        logger.warning("Предыдущий запуск ещё не завершён. Новый запуск пропущен.")
+        if pool:
+            result["exit_code"], result["timed_out"] = pool.run(
+                script_path, args, log_path, {RUN_ID_ENV: run_id} if run_id else None, timeout=timeout
+            )
+        else:
+            env = dict(os.environ, **{RUN_ID_ENV: run_id}) if run_id else None
+            with open(log_path, 'w', encoding='utf-8') as log_file:
+                process = subprocess.Popen(
+                    [sys.executable, script_path, *args],
+                    stdout=log_file, stderr=subprocess.STDOUT, env=env, start_new_session=True
+                )
+                try:
+                    result["exit_code"] = process.wait(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    result["timed_out"] = True
+                    stop_process(process)
+                    result["exit_code"] = process.returncode
+    except OSError as e:
+        logger.error(f"Не удалось запустить {script_path}: {e}")
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    result["finished_at"] = datetime.now()
+
+    if result["timed_out"]:
+        logger.error(f"{name}: превышен таймаут {timeout} с, процесс остановлен")
+    elif result["exit_code"] == 0:
+        logger.info(f"Успешно завершён: {script_path} за {result['seconds']:.1f} с")
+    else:
+        logger.error(f"Ошибка при выполнении {script_path}: код {result['exit_code']}\n{output_tail(log_path)}")
+
+    if metrics:
+        if result["timed_out"]:
+            metrics.inc('scripts_timed_out')
+        elif result["exit_code"] != 0:
+            metrics.inc('scripts_failed')
+        metrics.observe(name, result["seconds"])
+    return result
+
+def summary_path(name):
+    if name == 'ai_agent':
+        return os.path.join(AGENT_STATE_DIR, 'run_summary.json')
+    if name.startswith('ai_agent_'):
+        return os.path.join(AGENT_STATE_DIR, 'by_parser', name[len('ai_agent_'):], 'run_summary.json')
+    return SUMMARY_PATHS.get(name)
+
+def record_run(run_id, result):
+    # Строка истории на каждое задание: длительность, код возврата и отдача модуля
+    if run_history is None:
         return
+    path = summary_path(result['name'])
+    counters = read_counters(path, run_id) if path else {}
+    run_history.record(
+        run_id, result['name'], result['started_at'], result['finished_at'], result['seconds'],
+        result['exit_code'], result['timed_out'], counters.get('items_in'), counters.get('items_out')
+    )
 
-    with run_lock:
-        logger.info("=== Запуск парсеров по расписанию ===")
-        config = load_config()
-        modules = config.get('modules', [])
+def prune_runs():
+    # Идентификаторы прогонов начинаются со времени запуска, поэтому сортировка по имени — по времени
+    try:
+        run_dirs = sorted(os.listdir(RUNS_DIR))
+    except OSError:
+        return
+    for name in run_dirs[:-RUNS_KEEP]:
+        shutil.rmtree(os.path.join(RUNS_DIR, name), ignore_errors=True)
+
+def claim_modules(modules):
+    # Модуль, предыдущий запуск которого ещё идёт, пропускается; остальные работают
+    with running_lock:
+        busy = [name for name in modules if name in running_modules]
+        free = [name for name in modules if name not in running_modules]
+        running_modules.update(free)
+    if busy:
+        logger.warning(f"Предыдущий запуск ещё не завершён, пропускаем: {', '.join(busy)}")
+    return free
+
+def run_agent(run_id, metrics, stage, timeout, args=(), pool=None):
+    # Запуски агента из разных циклов идут по одному: у них общие файлы состояния
+    # (кэш классификации, водяные знаки, индекс почти-дубликатов)
+    with agent_lock:
+        return run_script(AGENT_SCRIPT, run_id, metrics, stage, timeout, args, pool)
+
+class AgentQueue:
+    """Очередь ИИ-агента в конвейере.
 
+    Идентификаторы завершившихся парсеров копятся, пока идёт предыдущий прогон
+    агента, и следующий прогон берёт их все сразу (--parser для каждого).
+    Так агент начинает работу после первого же парсера, но модель
+    загружается один раз на пачку, а не на каждый парсер.
+    """
+
+    def __init__(self, executor, run_id, metrics, timeout, pool=None):
+        self.executor = executor
+        self.run_id = run_id
+        self.metrics = metrics
+        self.timeout = timeout
+        self.pool = pool
+        self.lock = Lock()
+        self.pending = []
+        self.active = False
+        self.results = []
+
+    def add(self, parser_id):
+        with self.lock:
+            self.pending.append(parser_id)
+            if self.active:
+                return
+            self.active = True
+        self.executor.submit(self._drain)
+
+    def _drain(self):
+        while True:
+            with self.lock:
+                parser_ids, self.pending = self.pending, []
+                if not parser_ids:
+                    self.active = False
+                    return
+            logger.info(f"→ Запуск ИИ-агента для {', '.join(parser_ids)}")
+            args = [arg for parser_id in parser_ids for arg in ('--parser', parser_id)]
+            try:
+                result = run_agent(self.run_id, self.metrics, f"ai_agent_{'_'.join(parser_ids)}", self.timeout, args, self.pool)
+            except Exception as e:
+                logger.error(f"Не удалось запустить ИИ-агента для {', '.join(parser_ids)}: {e}")
+                continue
+            with self.lock:
+                self.results.append(result)
+
+def run_parsers(modules=None):
+    config = load_config()
+    # Отдельные расписания модулей помечаются в метриках своим набором модулей
+    partial = modules is not None and set(modules) != set(config.get('modules', []))
+    modules = claim_modules(config.get('modules', []) if modules is None else modules)
+    if not modules:
+        return
+
+    try:
+        run_id = new_run_id()
+        component = f"scheduler_{'_'.join(modules)}" if partial else 'scheduler'
+        metrics = Metrics(component, os.path.join(RUNS_DIR, run_id), run_id)
+        logger.info(f"=== Запуск парсеров по расписанию: {', '.join(modules)} (run_id {run_id}) ===")
+
+        jobs = []
         for name in modules:
             path = PARSER_PATHS.get(name)
             if not path or not os.path.isfile(path):
                 logger.warning(f"Парсер '{name}' не найден по пути '{path}', пропускаем.")
                 continue
-            run_script(path)
+            jobs.append((name, path))
 
-        if os.path.isfile(AGENT_SCRIPT):
-            logger.info(f"→ Запуск ИИ-агента")
-            run_script(AGENT_SCRIPT)
-        else:
+        agent_found = os.path.isfile(AGENT_SCRIPT)
+        if not agent_found:
             logger.warning(f"Агент не найден по пути '{AGENT_SCRIPT}'")
+        # pipeline: агент обрабатывает результаты парсера сразу после его завершения,
+        # не дожидаясь самого медленного; false — один прогон агента после всех парсеров
+        pipeline = agent_found and config.get('pipeline', True)
+        agent_timeout = job_timeout(config, 'ai_agent')
+        pool = get_warm_pool(config)
 
+        # Парсеры независимы и упираются в сеть, поэтому идут параллельно:
+        # цикл длится столько, сколько самый медленный из них
+        started = time.perf_counter()
+        results = []
+        agent_results = []
+        if jobs:
+            max_parallel = max(1, min(int(config.get('max_parallel', DEFAULT_MAX_PARALLEL)), len(jobs)))
+            with ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix='job') as executor, \
+                    ThreadPoolExecutor(max_workers=1, thread_name_prefix='agent') as agent_executor:
+                futures = [
+                    executor.submit(run_script, path, run_id, metrics, name, job_timeout(config, name), (), pool)
+                    for name, path in jobs
+                ]
+                agent_queue = AgentQueue(agent_executor, run_id, metrics, agent_timeout, pool)
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    record_run(run_id, result)
+                    metrics.inc('parsers_started')
+                    parser_id = AGENT_PARSER_IDS.get(result['name'])
+                    # Даже упавший парсер мог успеть сохранить часть результатов,
+                    # а агент обрабатывает только новые записи
+                    if pipeline and parser_id:
+                        agent_queue.add(parser_id)
+                parsers_elapsed = time.perf_counter() - started
+            # Выход из with дождался всех прогонов агента
+            for result in agent_queue.results:
+                agent_results.append(result)
+                record_run(run_id, result)
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"Парсеры завершены за {parsers_elapsed:.1f} с (сумма времени заданий {sum(r['seconds'] for r in results):.1f} с, "
+                f"параллельно {max_parallel}); ошибок: {sum(r['exit_code'] != 0 for r in results)}"
+            )
+            if agent_results:
+                metrics.observe('pipeline', elapsed)
+                logger.info(
+                    f"Агент запускался {len(agent_results)} раз, цикл завершён за {elapsed:.1f} с "
+                    f"(агент после парсеров: {elapsed - parsers_elapsed:.1f} с); "
+                    f"ошибок агента: {sum(r['exit_code'] != 0 for r in agent_results)}"
+                )
+
+        if agent_found and not (pipeline and jobs):
+            logger.info(f"→ Запуск ИИ-агента")
+            record_run(run_id, run_agent(run_id, metrics, 'ai_agent', agent_timeout, pool=pool))
+
+        summary = metrics.write()
+        prune_runs()
+        if summary:
+            timings = ', '.join(f"{stage} {entry['seconds']:.1f}s" for stage, entry in summary['stages'].items())
+            logger.info(f"Длительность этапов: {timings}")
         logger.info("=== Завершено ===")
+    finally:
+        with running_lock:
+            running_modules.difference_update(modules)
 
-def setup_schedule(frequency):
-    if frequency == 'hourly':
-        schedule.every().hour.do(run_parsers)
-    elif frequency == 'daily':
-        schedule.every().day.at("00:00").do(run_parsers)
-    elif frequency == 'weekly':
-        schedule.every().monday.at("00:00").do(run_parsers)
-    else:
-        logger.warning(f"Неизвестная частота: {frequency}")
+def schedule_trigger(spec):
+    """Разбирает расписание модуля и возвращает функцию, регистрирующую задание в schedule.
+
+    Допустимы hourly/daily/weekly, интервалы вида 15m, 2h, 1d и выражения cron
+    из пяти полей. Некорректное расписание — ValueError.
+    """
+    spec = str(spec).strip()
+    if spec == 'hourly':
+        return lambda job: schedule.every().hour.do(job)
+    if spec == 'daily':
+        return lambda job: schedule.every().day.at("00:00").do(job)
+    if spec == 'weekly':
+        return lambda job: schedule.every().monday.at("00:00").do(job)
+    match = INTERVAL_RE.match(spec)
+    if match:
+        count, unit = int(match.group(1)), INTERVAL_UNITS[match.group(2)]
+        if count < 1:
+            raise ValueError(f"Нулевой интервал: '{spec}'")
+        return lambda job: getattr(schedule.every(count), unit).do(job)
+    if is_cron(spec):
+        cron = CronExpression(spec)
+        # Проверка в начале каждой минуты
+        return lambda job: schedule.every().minute.at(":00").do(
+            lambda: job() if cron.matches(datetime.now()) else None
+        )
+    raise ValueError(f"Неизвестная частота: '{spec}'")
+
+def start_run(modules):
+    # Цикл идёт в отдельном потоке, чтобы долгий парсер не задерживал другие расписания
+    Thread(target=run_parsers, args=(modules,), name=f"run-{'-'.join(modules)}", daemon=True).start()
+
+def interval_minutes(spec):
+    # Интервал расписания в минутах; None для daily, weekly и cron
+    spec = str(spec).strip()
+    if spec == 'hourly':
+        return 60
+    match = INTERVAL_RE.match(spec)
+    return int(match.group(1)) * INTERVAL_MINUTES[match.group(2)] if match else None
+
+def adaptive_factor(runs):
+    """Множитель интервала по последним запускам модуля (новые первыми).
+
+    Каждый следующий подряд запуск с утечками вдвое сокращает интервал,
+    каждый следующий пустой — вдвое растягивает, в пределах
+    ADAPTIVE_MIN_FACTOR..ADAPTIVE_MAX_FACTOR.
+    """
+    if not runs:
+        return 1.0
+    productive = bool(runs[0]['leaks'])
+    streak = 0
+    for run in runs:
+        if bool(run['leaks']) != productive:
+            break
+        streak += 1
+    factor = 0.5 ** (streak - 1) if productive else 2.0 ** (streak - 1)
+    return min(ADAPTIVE_MAX_FACTOR, max(ADAPTIVE_MIN_FACTOR, factor))
+
+def plan_adaptive(name, base_minutes):
+    runs = run_history.recent(name, ADAPTIVE_HISTORY) if run_history else []
+    factor = adaptive_factor(runs)
+    last = runs[0]['finished_at'] if runs else datetime.now()
+    due = last + timedelta(minutes=base_minutes * factor)
+    with adaptive_lock:
+        adaptive_due[name] = due
+    logger.info(f"{name}: интервал {base_minutes * factor:g} мин (x{factor:g}), следующий запуск {due:%Y-%m-%d %H:%M}")
+
+def run_adaptive(name, base_minutes):
+    try:
+        run_parsers([name])
+    finally:
+        plan_adaptive(name, base_minutes)
+
+def adaptive_tick(name, base_minutes):
+    with running_lock:
+        busy = name in running_modules
+    with adaptive_lock:
+        due = adaptive_due.get(name)
+        if due is None or datetime.now() < due or busy:
+            return
+        adaptive_due[name] = None
+    Thread(target=run_adaptive, args=(name, base_minutes), name=f"run-{name}", daemon=True).start()
+
+def setup_schedule(config):
+    """Перестраивает расписание по config.json.
+
+    Модули из schedules запускаются по собственному расписанию, остальные
+    выбранные модули — вместе с частотой frequency. С adaptive интервальные
+    расписания модулей подстраиваются под историю запусков. При ошибке
+    в расписании прежние задания сохраняются.
+    """
+    modules = config.get('modules', [])
+    schedules = config.get('schedules', {})
+    shared = [name for name in modules if name not in schedules]
+    groups = []
+    if shared:
+        groups.append((config.get('frequency', 'daily'), shared))
+    groups += [(schedules[name], [name]) for name in modules if name in schedules]
+
+    try:
+        triggers = [(spec, group, schedule_trigger(spec)) for spec, group in groups]
+    except ValueError as e:
+        logger.error(f"Расписание не изменено: {e}")
+        return False
+
+    adaptive = config.get('adaptive', False)
+    if adaptive and run_history is None:
+        logger.warning("Адаптивный режим работает без истории запусков: не заданы настройки БД")
+
+    schedule.clear()
+    with adaptive_lock:
+        adaptive_due.clear()
+    for spec, group, trigger in triggers:
+        base_minutes = interval_minutes(spec)
+        if adaptive and base_minutes and len(group) == 1 and group[0] in schedules:
+            plan_adaptive(group[0], base_minutes)
+            schedule.every().minute.do(adaptive_tick, group[0], base_minutes)
+            continue
+        trigger(lambda group=group: start_run(group))
+        logger.info(f"Расписание {spec}: {', '.join(group)}")
+    if not triggers:
+        logger.warning("Не выбран ни один модуль, расписание пустое")
+    return True
+
+def config_mtime():
+    try:
+        return os.stat(CONFIG_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+def reload_config(known_mtime):
+    """Перечитывает config.json, если он изменился (например, после POST /api/settings)."""
+    mtime = config_mtime()
+    if mtime is None or mtime == known_mtime:
+        return known_mtime
+    try:
+        config = load_config()
+    except (OSError, ValueError) as e:
+        # Ошибка сообщается один раз: файл перечитается при следующем изменении
+        logger.error(f"Не удалось перечитать config.json, расписание не изменено: {e}")
+        return mtime
+    logger.info("config.json изменён, обновляем расписание")
+    setup_schedule(config)
+    return mtime
 
 def main():
     logger.info(f"Аргументы запуска: {sys.argv}")
 
     config = load_config()
-    frequency = config.get('frequency', 'daily')
-    setup_schedule(frequency)
+    mtime = config_mtime()
+    setup_schedule(config)
 
     if '--now' in sys.argv:
         logger.info("Ручной запуск через --now")
         run_parsers()
 
-    logger.info(f"Служба запущена. Частота запуска: {frequency}")
+    logger.info(f"Служба запущена. Частота запуска: {config.get('frequency', 'daily')}")
 
+    last_check = time.monotonic()
     while True:
+        if time.monotonic() - last_check >= CONFIG_POLL_SECONDS:
+            mtime = reload_config(mtime)
+            last_check = time.monotonic()
         schedule.run_pending()
         time.sleep(1)
 
@@ -317,6 +317,58 @@ app.get('/api/leak-types', async (req, res) => {
   }
 });
 
+// История запусков модулей (пишет scheduler.py): затраты и отдача по модулям
+app.get('/api/run-history', async (req, res) => {
+  const days = Math.min(Math.max(parseInt(req.query.days, 10) || 7, 1), 365);
+  try {
+    const modulesQuery = `
+      SELECT
+        module,
+        COUNT(*)::int AS runs,
+        COUNT(*) FILTER (WHERE exit_code <> 0 OR exit_code IS NULL OR timed_out)::int AS failures,
+        COALESCE(SUM(duration_seconds), 0)::float AS total_seconds,
+        COALESCE(AVG(duration_seconds), 0)::float AS avg_seconds,
+        COALESCE(SUM(items_in), 0)::int AS items,
+        COALESCE(SUM(leaks), 0)::int AS leaks,
+        MAX(started_at) AS last_run
+      FROM run_history
+      WHERE started_at >= NOW() - make_interval(days => $1)
+      GROUP BY module
+      ORDER BY module
+    `;
+    const runsQuery = `
+      SELECT run_id, module, started_at, finished_at, duration_seconds, exit_code, timed_out, items_in, leaks
+      FROM run_history
+      WHERE started_at >= NOW() - make_interval(days => $1)
+        AND ($2::text IS NULL OR module = $2)
+      ORDER BY started_at DESC
+      LIMIT 500
+    `;
+    const module = req.query.module || null;
+    const [modulesRes, runsRes] = await Promise.all([
+      pool.query(modulesQuery, [days]),
+      pool.query(runsQuery, [days, module])
+    ]);
+
+    res.json({
+      days,
+      modules: modulesRes.rows.map(row => ({
+        ...row,
+        // Утечек на час работы модуля — для сравнения стоимости и отдачи
+        leaks_per_hour: row.total_seconds > 0 ? row.leaks / (row.total_seconds / 3600) : 0
+      })),
+      runs: runsRes.rows
+    });
+  } catch (err) {
+    // Таблица создаётся планировщиком при первой записи
+    if (err.code === '42P01') {
+      return res.json({ days, modules: [], runs: [] });
+    }
+    console.error('Ошибка при получении истории запусков:', err);
+    res.status(500).json({ error: 'Внутренняя ошибка сервера' });
+  }
+});
+
 // Настройки (получение и сохранение)
 app.get('/api/settings', async (req, res) => {
   try {
@@ -334,13 +386,18 @@ app.get('/api/settings', async (req, res) => {
 
 app.post('/api/settings', async (req, res) => {
   try {
-    const { frequency, modules } = req.body;
+    const { frequency, modules, schedules } = req.body;
     if (!frequency || !['hourly', 'daily', 'weekly'].includes(frequency)) {
       return res.status(400).json({ error: 'Некорректная частота сканирования' });
     }
     if (!Array.isArray(modules) || !modules.every(m => ['webparser', 'GitHubparser', 'pastebinparser', 'telegramparser'].includes(m))) {
       return res.status(400).json({ error: 'Некорректный список модулей' });
     }
+    // Необязательные расписания по модулям: {"pastebinparser": "5m", "webparser": "0 3 * * *"}
+    if (schedules !== undefined && (typeof schedules !== 'object' || schedules === null || Array.isArray(schedules) ||
+        !Object.entries(schedules).every(([m, spec]) => ['webparser', 'GitHubparser', 'pastebinparser', 'telegramparser'].includes(m) && typeof spec === 'string'))) {
+      return res.status(400).json({ error: 'Некорректные расписания модулей' });
+    }
 
     const query = `
       INSERT INTO settings (frequency, modules, updated_at)
@@ -352,8 +409,22 @@ app.post('/api/settings', async (req, res) => {
     const values = [frequency, JSON.stringify(modules)];
     const result = await pool.query(query, values);
 
-    const config = { frequency, modules };
-    await fs.writeFile(path.join(__dirname, 'config.json'), JSON.stringify(config, null, 2));
+    // Остальные ключи планировщика (max_parallel, timeouts и т.д.) сохраняются
+    const configPath = path.join(__dirname, 'config.json');
+    let existing = {};
+    try {
+      existing = JSON.parse(await fs.readFile(configPath, 'utf8'));
+    } catch (e) {
+      existing = {};
+    }
+    const config = { ...existing, frequency, modules };
+    if (schedules !== undefined) {
+      config.schedules = schedules;
+    }
+    // Планировщик перечитывает config.json на лету, поэтому файл заменяется целиком
+    const tmpPath = `${configPath}.tmp`;
+    await fs.writeFile(tmpPath, JSON.stringify(config, null, 2));
+    await fs.rename(tmpPath, configPath);
 
     res.json(result.rows[0]);
   } catch (err) {
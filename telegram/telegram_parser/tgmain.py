@@ -1,6 +1,8 @@
 import os
 import re
+import sys
 import json
+import time
 import asyncio
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
@@ -13,6 +15,31 @@ ENV_PATH = BASE_DIR.parent.parent / '.env'
 CONFIG_PATH = BASE_DIR.parent / 'config.json'
 RESULTS_PATH = BASE_DIR / 'telegram_parser_result' / 'leaks_telegram.json'
 STATUS_PATH = BASE_DIR / 'telegram_parser_result' / 'status.json'
+# В режиме live-мониторинга метрики переписываются не чаще раза в минуту
+LIVE_METRICS_INTERVAL = 60
+
+sys.path.insert(0, str(BASE_DIR.parent.parent))
+
+from common.leak_detector import LeakDetector
+from common.entity_extractor import EntityExtractor
+from common.metrics import Metrics
+
+ANALYSIS_PATTERNS = {
+    'credentials': r'\b(парол[ей]+|логин[а-я]*|хешированн[ыо][йе]|учётн[ыо][йе]\sзапис[ий]|токены)\b',
+    'personal': r'\b(паспорт|снилс|телефон[ы]?|адрес[а]?|email|фамилия|ФИО|дата рождения)\b',
+    'financial': r'\b(карт[а-я]+|счет[а-я]*|банк[а-я]*|оплаты|суммы)\b',
+    'health': r'\b(медицинск[а-я]+|диагноз|медикамент|анализ[ы]?|здоровь[ея])\b',
+    'intellectual_property': r'\b(патент|торговая марка|искусство|код)\b',
+    'volume': r'\b(\d{1,3}([\s,]\d{3})*(\.|,)?\d*\s?(GB|MB|TB|тыс\.|млн\.|запис[йи]|строк[и]?))\b',
+    'leak': r'\b(утечк[а-я]+|слив|слили|кража|компрометация|хакер[а-я]*|взлом|leak|breach|скомпрометированн[ыо][йе]|база данных|Firebase)\b'
+}
+DETECTOR = LeakDetector(ANALYSIS_PATTERNS, lowercase=True)
+
+# Организации и признаки СНГ (страны, города) берутся из словарей common/dictionaries
+ENTITIES = EntityExtractor.from_directory(categories=('organizations', 'cis'))
+PROPER_NAME_RE = re.compile(r'\b[А-Я][а-я]+\b', re.IGNORECASE)
+COUNTRY_RE = re.compile(r'Страна:\s*([^\n.]+)', re.IGNORECASE)
+RU_DOMAIN_RE = re.compile(r'\.ru\b', re.IGNORECASE)
 
 load_dotenv(dotenv_path=ENV_PATH)
 
@@ -20,6 +47,8 @@ API_ID = int(os.getenv("API_ID", 0))
 API_HASH = os.getenv("API_HASH", "")
 PHONE = os.getenv("PHONE", "")
 REQUEST_DELAY = float(os.getenv("REQUEST_DELAY", 1.0))
+# Файл сессии Telethon; бенчмарки подставляют временный, чтобы не трогать рабочую сессию
+SESSION_PATH = os.getenv("TELEGRAM_SESSION", str(BASE_DIR / 'parser_session'))
 
 if not (API_ID and API_HASH and PHONE):
     raise RuntimeError("В .env должны быть заданы API_ID, API_HASH и PHONE")
@@ -59,34 +88,19 @@ def save_status(status=None, result=None, error=None, reset=False):
     STATUS_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
 
 def analyze_content(text):
-    patterns = {
-        'credentials': r'\b(парол[ей]+|логин[а-я]*|хешированн[ыо][йе]|учётн[ыо][йе]\sзапис[ий]|токены)\b',
-        'personal': r'\b(паспорт|снилс|телефон[ы]?|адрес[а]?|email|фамилия|ФИО|дата рождения)\b',
-        'financial': r'\b(карт[а-я]+|счет[а-я]*|банк[а-я]*|оплаты|суммы)\b',
-        'health': r'\b(медицинск[а-я]+|диагноз|медикамент|анализ[ы]?|здоровь[ея])\b',
-        'intellectual_property': r'\b(патент|торговая марка|искусство|код)\b',
-        'volume': r'\b(\d{1,3}([\s,]\d{3})*(\.|,)?\d*\s?(GB|MB|TB|тыс\.|млн\.|запис[йи]|строк[и]?))\b',
-        'leak': r'\b(утечк[а-я]+|слив|слили|кража|компрометация|хакер[а-я]*|взлом|leak|breach|скомпрометированн[ыо][йе]|база данных|Firebase)\b'
-    }
-    analysis = {k: bool(re.search(p, text, re.IGNORECASE)) for k, p in patterns.items()}
+    analysis = DETECTOR.analyze(text)
     
+    entities = ENTITIES.extract(text)
+
     # Проверка на сервис
-    service_pattern = r'\b(УК [А-Я][а-я]+(?: [А-Я][а-я]+)*|4Chan|Московский институт психоанализа|ЦАМ|ПРАВОКАРД|Steam|[А-Я][а-я]+(?: [А-Я][а-я]+)*|aviamed\.ru)\b'
-    analysis['has_service'] = bool(re.search(service_pattern, text, re.IGNORECASE))
+    analysis['has_service'] = bool(PROPER_NAME_RE.search(text)) or bool(entities['organizations'])
     
     # Проверка на СНГ
-    cis_countries = [
-        'Россия', 'Беларусь', 'Украина', 'Казахстан', 'Узбекистан', 'Кыргызстан',
-        'Таджикистан', 'Туркменистан', 'Армения', 'Азербайджан', 'Грузия', 'Молдова', 'СНГ'
-    ]
-    cis_pattern = r'\b(' + '|'.join(cis_countries) + r')\b'
-    country_match = re.search(r'Страна:\s*([^\n.]+)', text, re.IGNORECASE)
+    country_match = COUNTRY_RE.search(text)
     country = country_match.group(1).strip() if country_match else ''
     is_cis = (
-        bool(re.search(cis_pattern, text, re.IGNORECASE)) or
-        country in cis_countries or
-        bool(re.search(r'\.ru\b', text, re.IGNORECASE)) or
-        bool(re.search(r'\b(медицинский центр|Санкт-Петербург|Москва)\b', text, re.IGNORECASE))
+        bool(entities['cis']) or
+        bool(RU_DOMAIN_RE.search(text))
     )
     analysis['is_cis'] = is_cis
     analysis['country'] = country if country else ('Россия' if is_cis else 'Не указано')
@@ -115,12 +129,16 @@ async def handle_message(message, thread_id=None):
     if thread_id and message.reply_to_msg_id != thread_id and message.id != thread_id:
         return
 
-    analysis = analyze_content(content)
+    metrics.inc('items_in')
+    with metrics.timer('analyze'):
+        analysis = analyze_content(content)
     if not filter_results(analysis):
         return  # Silently skip non-CIS or non-leak messages
 
     chat_id = getattr(message, 'chat_id', None) or message.peer_id.channel_id
-    entity = await client.get_entity(chat_id)
+    metrics.inc('api_requests')
+    with metrics.timer('get_entity'):
+        entity = await client.get_entity(chat_id)
     username = getattr(entity, 'username', None)
     link = f"https://t.me/{username}/{message.id}" if username else f"https://t.me/c/{chat_id}/{message.id}"
 
@@ -134,7 +152,9 @@ async def handle_message(message, thread_id=None):
     }
 
     results["Утечки информации"].append(entry)
-    save_results(results)
+    metrics.inc('items_out')
+    with metrics.timer('save'):
+        save_results(results)
     print(f"⚠️ Утечка (СНГ): {link}")
 
 async def scan_history(entity, days=30, thread_id=None):
@@ -142,6 +162,7 @@ async def scan_history(entity, days=30, thread_id=None):
     name = entity.title or str(entity.id)
     print(f"Сканируем последние {days} дней для «{name}» с {cutoff.date()}" + (f" (ветка {thread_id})" if thread_id else ""))
 
+    started = time.perf_counter()
     try:
         if thread_id:
             async for message in client.iter_messages(entity, reply_to=thread_id):
@@ -158,7 +179,11 @@ async def scan_history(entity, days=30, thread_id=None):
     except (ChannelPrivateError, ChannelInvalidError) as e:
         err_msg = f"Ошибка доступа к каналу {name}: {e} (возможно, канал приватный)"
         print(err_msg)
+        metrics.inc('errors')
         save_status(error=err_msg)
+    finally:
+        # Время листания истории включает паузы REQUEST_DELAY между сообщениями
+        metrics.observe('history', time.perf_counter() - started)
 
 async def main(manual_trigger=False):
     save_status(status="Начал работу", result="", reset=True)
@@ -171,7 +196,8 @@ async def main(manual_trigger=False):
         return
 
     try:
-        await client.connect()
+        with metrics.timer('connect'):
+            await client.connect()
         if not await client.is_user_authorized():
             await client.send_code_request(PHONE)
             code = input("Введите код из Telegram: ")
@@ -223,26 +249,35 @@ async def main(manual_trigger=False):
         result_msg = "Обнаружены утечки" if leaks_found else "Утечек не найдено"
         save_status(status="Завершено", result=result_msg)
         print(result_msg)
+        metrics.write("Завершено")
+        last_metrics_write = time.monotonic()
 
         save_status(status="Live-мониторинг запущен")
         print("Live-мониторинг запущен")
 
         @client.on(events.NewMessage(chats=[ent for ent, _ in entities]))
         async def live_handler(event):
+            nonlocal last_metrics_write
             thread_id = next((tid for ent, tid in entities if ent.id == event.message.peer_id.channel_id and tid), None)
             await handle_message(event.message, thread_id=thread_id)
+            if time.monotonic() - last_metrics_write >= LIVE_METRICS_INTERVAL:
+                metrics.write("Live-мониторинг запущен")
+                last_metrics_write = time.monotonic()
 
         await client.run_until_disconnected()
 
     except Exception as e:
         err_msg = f"Ошибка в работе: {e}"
         print(err_msg)
+        metrics.inc('errors')
         save_status(error=err_msg, status="Завершено")
+        metrics.write("Ошибка")
 
 config = load_config()
 results = load_results()
+metrics = Metrics('telegramparser', STATUS_PATH.parent)
 
-client = TelegramClient(BASE_DIR / 'parser_session', API_ID, API_HASH)
+client = TelegramClient(SESSION_PATH, API_ID, API_HASH)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+# Модули проекта импортируются так же, как из скриптов: от корня репозитория и из ai-agent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / "ai-agent"))
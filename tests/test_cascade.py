@@ -0,0 +1,63 @@
+import itertools
+import random
+
+import pytest
+
+from cascade import Cascade, combine_confidence, decide, observed_model_range
+from classification_cache import ClassificationCache
+
+FLAGS = list(itertools.product([False, True], repeat=3))
+
+
+@pytest.fixture
+def stored_scores(tmp_path):
+    # Оценки модели, сохранённые в кэше классификации прошлого прогона
+    rng = random.Random(7)
+    cache = ClassificationCache(str(tmp_path / "cache" / "classification_cache.json"), version="test")
+    for index in range(300):
+        cache.put(cache.key(f"текст {index}"), {"model_confidence": round(rng.uniform(0.05, 0.45), 4)})
+    cache.save()
+    loaded = ClassificationCache(cache.path, version="test")
+    return [value["model_confidence"] for value in loaded.entries.values()]
+
+
+def full_decision(is_leak, trusted, volume, score):
+    return decide(is_leak, combine_confidence(is_leak, trusted, volume, score))
+
+
+def test_cascade_matches_full_model_on_stored_scores(stored_scores):
+    cascade = Cascade(*observed_model_range(stored_scores))
+    early = 0
+    for is_leak, trusted, volume in FLAGS:
+        decision = cascade.early_decision(is_leak, trusted, volume)
+        if decision is None:
+            continue
+        early += 1
+        for score in stored_scores:
+            assert decision[0] == full_decision(is_leak, trusted, volume, score)
+    assert early
+
+
+def test_full_range_never_skips_model():
+    cascade = Cascade()
+    assert all(cascade.early_decision(*flags) is None for flags in FLAGS)
+
+
+def test_disabled_cascade_defers_to_model():
+    cascade = Cascade(0.2, 0.3, enabled=False)
+    assert all(cascade.early_decision(*flags) is None for flags in FLAGS)
+
+
+def test_observed_range_does_not_cover_unseen_scores(stored_scores):
+    # Поэтому режим auto не включён по умолчанию: оценка вне диапазона кэша меняет решение
+    cascade = Cascade(*observed_model_range(stored_scores))
+    changed = [
+        flags for flags in FLAGS
+        if (decision := cascade.early_decision(*flags)) and decision[0] != full_decision(*flags, 0.95)
+    ]
+    assert changed
+
+
+def test_observed_range_needs_enough_samples():
+    assert observed_model_range([0.3] * 10) == (0.0, 1.0)
+    assert observed_model_range([0.3] * 200 + [None]) == pytest.approx((0.28, 0.32))
@@ -0,0 +1,53 @@
+import pytest
+
+from common.entity_extractor import EntityExtractor, normalize, is_case_sensitive
+
+DICTIONARIES = {
+    "geo": {"Россия": "Россия", "РФ": "Россия", "Мск": "Москва", "Москва": "Москва", "Straße": "Straße"},
+    "organizations": {"Сбербанк": "Сбербанк", "Сбер": "Сбербанк", "hh.ru": "hh.ru"},
+}
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return EntityExtractor(DICTIONARIES)
+
+
+@pytest.mark.parametrize("alias, sensitive", [
+    ("РФ", True),
+    ("Мск", True),
+    ("Сбер", True),
+    ("Россия", False),
+    ("hh.ru", False),
+])
+def test_short_aliases_are_case_sensitive(alias, sensitive):
+    assert is_case_sensitive(alias) == sensitive
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("утечка в РФ", ["Россия"]),
+    ("магазин shop.рф слил базу", []),
+    ("данные из МСК и Мск", ["Москва"]),
+    ("мск", []),
+    ("МОСКВА и россия", ["Москва", "Россия"]),
+    ("Straße и STRAßE", ["Straße"]),
+])
+def test_geo(extractor, text, expected):
+    assert sorted(extractor.extract(text)["geo"]) == sorted(expected)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("клиенты Сбер", ["Сбербанк"]),
+    ("сбер и СБЕР", []),
+    ("ПАО СБЕРБАНК", ["Сбербанк"]),
+    ("вакансии с HH.RU", ["hh.ru"]),
+    ("Сберкасса", []),
+])
+def test_organizations(extractor, text, expected):
+    assert extractor.find(text, ("organizations",)) == expected
+
+
+def test_normalize_keeps_positions_without_fold():
+    text = "Ёлка и  Straße"
+    assert len(normalize(text, fold=False)) == len(normalize(text))
+    assert normalize(text, fold=False) == "Елка и Straße"
@@ -0,0 +1,37 @@
+import os
+from datetime import datetime, timedelta
+
+from common.http_cache import HttpCache, INDEX_NAME
+
+URL = "https://example.org/news/1"
+
+
+def make_cache(directory):
+    return HttpCache(directory, revisit_after=timedelta(hours=24), revisit_for=timedelta(days=30))
+
+
+def test_due_urls_and_prune_use_index(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.store(URL, {"ETag": '"v1"'}, b"<html>1</html>")
+    assert cache.conditional_headers(URL) == {"If-None-Match": '"v1"'}
+    assert not cache.store(URL, {"ETag": '"v1"'}, b"<html>1</html>")
+
+    now = datetime.now()
+    assert cache.due_urls(now) == set()
+    assert cache.due_urls(now + timedelta(days=2)) == {URL}
+    assert cache.prune(now + timedelta(days=2)) == 0
+
+    assert cache.prune(now + timedelta(days=31)) == 1
+    assert cache.get(URL) is None
+    assert cache.due_urls(now + timedelta(days=2)) == set()
+
+
+def test_index_is_built_for_existing_cache(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store(URL, {}, b"body")
+    cache.close()
+    os.remove(tmp_path / INDEX_NAME)
+
+    reopened = make_cache(tmp_path)
+    assert reopened.due_urls(datetime.now() + timedelta(days=2)) == {URL}
+    assert reopened.body(URL) == b"body"
@@ -0,0 +1,71 @@
+import re
+import signal
+
+import pytest
+
+from common.leak_detector import LeakDetector, lower_pattern, is_lower_safe
+
+
+@pytest.fixture
+def deadline():
+    # Зависание разбора шаблона должно ронять тест, а не весь прогон
+    signal.signal(signal.SIGALRM, lambda *args: pytest.fail("разбор шаблона не завершился"))
+    signal.alarm(2)
+    yield
+    signal.alarm(0)
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    (r"(?P<a>X)(?P=a)", r"(?P<a>x)(?P=a)"),
+    (r"(?P=a)Y", r"(?P=a)y"),
+    (r"(?P<Name>X)Y(?P=Name)Z", r"(?P<Name>x)y(?P=Name)z"),
+    (r"(?P<a", r"(?P<a"),
+    (r"(?P=a", r"(?P=a"),
+])
+def test_lower_pattern_named_groups(deadline, pattern, expected):
+    assert lower_pattern(pattern) == expected
+
+
+@pytest.mark.parametrize("pattern, safe", [
+    (r"\bутечк[а-я]+", True),
+    (r"[А-Яа-я0-9]", True),
+    (r"[A-Z]{2}", True),
+    (r"[^]A-Z]", True),
+    (r"[-A]", True),
+    (r"[A-z]", False),
+    (r"[0-Z]", False),
+    (r"\x41", False),
+    (r"\u0410", False),
+    (r"\N{CYRILLIC CAPITAL LETTER A}", False),
+    (r"\101", False),
+    (r"(a)\1", True),
+    (r"\0101", False),
+])
+def test_is_lower_safe(pattern, safe):
+    assert is_lower_safe(pattern) is safe
+
+
+@pytest.mark.parametrize("pattern, text", [
+    (r"(?P<a>X)(?P=a)", "xX"),
+    (r"(?P<a>пароль)\s(?P=a)", "ПАРОЛЬ пароль"),
+    (r"\x41B", "ab"),
+    (r"\101", "a"),
+    (r"\u0410", "а"),
+    (r"АБ", "аБ"),
+    (r"[A-z]+", "Q_q"),
+    (r"[A-Z]{3}", "abc"),
+])
+@pytest.mark.parametrize("lowercase", [False, True])
+def test_detector_matches_ignorecase(deadline, pattern, text, lowercase):
+    detector = LeakDetector({"p": pattern}, lowercase=lowercase)
+    expected = re.search(pattern, text, re.IGNORECASE) is not None
+    assert detector.analyze(text) == {"p": expected}
+    assert detector.any_match(text) is expected
+    assert detector.scan(text) == ({"p"} if expected else set())
+
+
+def test_user_patterns_keep_their_flags():
+    # Шаблоны из конфигов компилируются с флагами как есть, без lower()
+    detector = LeakDetector({"p": r"[A-z]_"}, flags=re.MULTILINE)
+    assert detector.analyze("_") == {"p": False}
+    assert detector.analyze("a_") == {"p": True}
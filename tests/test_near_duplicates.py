@@ -0,0 +1,26 @@
+from near_duplicates import NearDuplicateIndex
+
+TEXT = "в открытом доступе оказалась база клиентов магазина с телефонами и адресами доставки"
+
+
+def test_decision_keeps_status_and_model_score(tmp_path):
+    path = str(tmp_path / "state" / "near_duplicates.json")
+    index = NearDuplicateIndex(path, max_distance=3)
+    cluster_id, is_representative = index.assign(TEXT, "a")
+    assert (cluster_id, is_representative) == ("a", True)
+    assert index.decision("a") is None
+    index.decide("a", None, "skip", 0.2)
+    index.save()
+
+    reloaded = NearDuplicateIndex(path, max_distance=3)
+    assert reloaded.assign(TEXT, "b") == ("a", False)
+    cluster = reloaded.decision("a")
+    assert (cluster["incident"], cluster["status"], cluster["model_confidence"]) == (None, "skip", 0.2)
+
+
+def test_undecided_clusters_are_not_saved(tmp_path):
+    path = str(tmp_path / "near_duplicates.json")
+    index = NearDuplicateIndex(path, max_distance=3)
+    index.assign(TEXT, "a")
+    index.save()
+    assert NearDuplicateIndex(path, max_distance=3).assign(TEXT, "b") == ("b", True)
@@ -0,0 +1,30 @@
+import pytest
+
+from common.url_canon import UrlCanonicalizer, canonical_url
+
+
+@pytest.mark.parametrize("url", [
+    "https://github.com/Owner/Repo/blob/main/src/x.py",
+    "https://github.com/owner/repo/raw/main/src/x.py",
+    "https://github.com/owner/repo/raw/refs/heads/main/src/x.py",
+    "https://github.com/owner/repo/blob/3f2a9c1d0b4e5f60718293a4b5c6d7e8f9012345/src/x.py",
+    "https://raw.githubusercontent.com/owner/repo/main/src/x.py",
+    "https://raw.githubusercontent.com/owner/repo/refs/heads/main/src/x.py",
+])
+def test_github_file_links_share_a_key(url):
+    assert canonical_url(url) == "github:owner/repo/src/x.py"
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("http://www.example.org/news/1/?utm_source=x&b=2&a=1#top", "https://example.org/news/1?a=1&b=2"),
+    ("https://m.example.org/news/1/amp", "https://example.org/news/1"),
+    ("https://example.org:443/news?fbclid=abc", "https://example.org/news"),
+    ("http://host:abc/page", "http://host:abc/page"),
+])
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+def test_rules_override():
+    canonical = UrlCanonicalizer({"force_https": False, "tracking_params": ["ref"]})
+    assert canonical("http://example.org/a?ref=1&utm_source=x") == "http://example.org/a?utm_source=x"
@@ -1,30 +1,62 @@
 import json
 import re
-import time
+import sys
 import random
+import threading
 from urllib.parse import urlparse
 from datetime import datetime, timedelta
 import requests
 from bs4 import BeautifulSoup
-from googlesearch import search
 import yaml
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from tqdm import tqdm
 
 BASE_DIR = Path(__file__).parent.resolve()
+sys.path.insert(0, str(BASE_DIR.parent))
+
+from common.leak_detector import LeakDetector
+from common.metrics import Metrics
+from common.http_cache import HttpCache
+from common.html_text import extract_text, decode_html
+from common.url_store import ProcessedUrlStore
+from common.search_stage import SearchStage, QueryCache, load_backend
+from common.url_canon import UrlCanonicalizer
+
 CONFIG_PATH = BASE_DIR / "config.yaml"
 RESULTS_DIR = BASE_DIR / "leak_parser_result"
+PROCESSED_DB_PATH = RESULTS_DIR / "processed_urls.sqlite3"
+# Прежний JSON-список: импортируется в базу при первом запуске
 PROCESSED_PATH = RESULTS_DIR / "processed_urls.json"
 RESULTS_PATH = RESULTS_DIR / "results.json"
 STATUS_PATH = RESULTS_DIR / "status.json"
+HTTP_CACHE_DIR = RESULTS_DIR / "http_cache"
+SEARCH_CACHE_PATH = RESULTS_DIR / "search_cache.json"
+
+# Шаблоны признаков утечек по категориям
+ANALYSIS_PATTERNS = {
+    "credentials": r"\b(парол[ей]+|логин[а-я]*)\b",
+    "personal": r"\b(паспорт|снилс|телефон|адрес|email)\b",
+    "financial": r"\b(карт[а-я]+|счет[а-я]*|банк[а-я]*)\b",
+    "health": r"\b(медицинск[а-я]+|диагноз|медикамент)\b",
+    "intellectual_property": r"\b(патент|торговая марка|искусство|код)\b",
+    "volume": r"\b\d{1,3}([\s,]\d{3})*(\.|,)?\d*\s?(GB|MB|TB|тыс\.|млн\.|запися[йи])\b",
+    "leak": r"\b(утечк[а-я]+|слив|кража|компрометация)\b"
+}
 
 class LeakParser:
     def __init__(self):
         self.load_config()
+        self.detector = LeakDetector(ANALYSIS_PATTERNS, lowercase=True)
+        self.metrics = Metrics("webparser", RESULTS_DIR)
+        # Разные написания адреса одной страницы (utm, www, AMP, http) — один ключ
+        self.canonical = UrlCanonicalizer(self.config.get("canonical"))
         self.processed_urls = self.load_processed_urls()
         self.results = []
+        # Результат страницы и её отметка «обработана» попадают на диск вместе (checkpoint)
+        self.results_lock = threading.Lock()
         self.validate_config()
+        self.cache = self.create_cache()
 
     def validate_config(self):
         # Проверяем наличие всех необходимых ключей в конфиге
@@ -35,23 +67,29 @@ class LeakParser:
         if not all(key in self.config for key in required_keys):
             raise ValueError("Invalid config structure")
 
+    def create_cache(self):
+        # cache.enabled: страницы хранятся с ETag/Last-Modified и перепроверяются условным GET
+        cache_config = self.config.get("cache", {})
+        if not cache_config.get("enabled", False):
+            return None
+        return HttpCache(
+            HTTP_CACHE_DIR,
+            revisit_after=timedelta(hours=cache_config.get("revisit_after_hours", 24)),
+            revisit_for=timedelta(days=cache_config.get("revisit_for_days", 30)),
+            key_func=self.canonical
+        )
+
     def load_config(self):
         with open(CONFIG_PATH, "r", encoding="utf-8") as f:
             self.config = yaml.safe_load(f)
 
     def load_processed_urls(self):
-        try:
-            if PROCESSED_PATH.exists():
-                with open(PROCESSED_PATH, "r", encoding="utf-8") as f:
-                    return set(json.load(f))
-            return set()
-        except Exception as e:
-            print(f"Произошла ошибка при загрузке обработанных URL: {e}")
-            return set()
+        # storage.bloom_filter: фильтр Блума перед базой для очень длинной истории
+        bloom = self.config.get("storage", {}).get("bloom_filter", False)
+        return ProcessedUrlStore(PROCESSED_DB_PATH, bloom=bloom, legacy_json=PROCESSED_PATH, key_func=self.canonical)
 
     def save_processed_urls(self):
-        with open(PROCESSED_PATH, "w", encoding="utf-8") as f:
-            json.dump(list(self.processed_urls), f, indent=2, ensure_ascii=False)
+        self.processed_urls.commit()
 
     def save_status(self, status, error=None):
         # Сохраняем текущий статус и ошибку (если есть) в файл
@@ -73,39 +111,60 @@ class LeakParser:
         parsed = urlparse(url)
         return any(parsed.netloc.endswith(d) for d in self.config["target_domains"])
 
+    def create_search_stage(self):
+        # search.backend: google, json (search.endpoint) или "модуль:функция"
+        search_config = self.config["search"]
+        ttl_hours = search_config.get("cache_ttl_hours", 12)
+        cache = QueryCache(SEARCH_CACHE_PATH, timedelta(hours=ttl_hours)) if ttl_hours > 0 else None
+        return SearchStage(
+            load_backend(search_config.get("backend", "google"), search_config),
+            results_per_query=search_config["results_per_query"],
+            rate_per_minute=search_config.get("rate_per_minute", 20),
+            burst=search_config.get("burst", 1),
+            workers=search_config.get("workers", 3),
+            retries=search_config.get("retries", 3),
+            backoff_base=search_config.get("backoff_base", 5),
+            backoff_max=search_config.get("backoff_max", 120),
+            cache=cache,
+            metrics=self.metrics
+        )
+
     def search_leak_references(self):
-        found_urls = set()
-        for query in self.generate_search_queries():
-            try:
-                print(f"Поиск по запросу: {query}")
-                time.sleep(random.uniform(*self.config["search"]["delay_range"]))
-                urls = search(
-                    query,
-                    num_results=self.config["search"]["results_per_query"],
-                    lang="ru"
-                )
-                for url in urls:
-                    if self.is_relevant_domain(url) and url not in self.processed_urls:
-                        found_urls.add(url)
-                        print(f"Найден кандидат: {url}")
-            except Exception as e:
-                self.save_status("Произошла ошибка", f"Ошибка поиска: {e}")
-                print(f"Произошла ошибка: Ошибка поиска: {e}")
-                time.sleep(60)
+        # Канонический адрес → первое найденное написание, оно и скачивается
+        found_urls = {}
+        seen = set()
+        avoided = 0
+        results, errors = self.create_search_stage().run(self.generate_search_queries())
+        for query, error in errors.items():
+            self.save_status("Произошла ошибка", f"Ошибка поиска: {error}")
+            print(f"Произошла ошибка: Ошибка поиска по запросу {query}: {error}")
+        for urls in results.values():
+            self.metrics.inc("search_results", len(urls))
+            for url in urls:
+                if url in seen or not self.is_relevant_domain(url):
+                    continue
+                seen.add(url)
+                key = self.canonical(url)
+                # Счётчики canonical_* — скачивания, которых удалось избежать только благодаря канонизации
+                if key in found_urls:
+                    self.metrics.inc("canonical_duplicates")
+                    avoided += 1
+                    continue
+                if key in self.processed_urls:
+                    if url != key:
+                        self.metrics.inc("canonical_processed")
+                        avoided += 1
+                    continue
+                found_urls[key] = url
+                print(f"Найден кандидат: {url}")
+        self.metrics.set("fetches_avoided", avoided)
+        if avoided:
+            print(f"Пропущено повторных скачиваний одних и тех же страниц: {avoided}")
         return found_urls
 
     def analyze_content(self, text):
-        # Проверяем текст на наличие признаков утечек по заданным шаблонам
-        patterns = {
-            "credentials": r"\b(парол[ей]+|логин[а-я]*)\b",
-            "personal": r"\b(паспорт|снилс|телефон|адрес|email)\b",
-            "financial": r"\b(карт[а-я]+|счет[а-я]*|банк[а-я]*)\b",
-            "health": r"\b(медицинск[а-я]+|диагноз|медикамент)\b",
-            "intellectual_property": r"\b(патент|торговая марка|искусство|код)\b",
-            "volume": r"\b\d{1,3}([\s,]\d{3})*(\.|,)?\d*\s?(GB|MB|TB|тыс\.|млн\.|запися[йи])\b",
-            "leak": r"\b(утечк[а-я]+|слив|кража|компрометация)\b"
-        }
-        return {k: bool(re.search(p, text, re.I)) for k, p in patterns.items()}
+        # Проверяем текст на наличие признаков утечек по заданным шаблонам за один проход
+        return self.detector.analyze(text)
 
     def filter_results(self, analysis):
         # Требуем совпадение хотя бы одного из ключевых триггеров
@@ -119,75 +178,219 @@ class LeakParser:
         volume = volume_match.group(0) if volume_match else ""
         return service, snippet, volume
 
-    def process_page(self, url):
-        try:
-            response = requests.get(
-                url,
-                headers={"User-Agent": random.choice(self.config["user_agents"])},
-                timeout=self.config["crawling"]["timeout"]
-            )
-            soup = BeautifulSoup(response.text, "lxml")
-            for element in soup(["script", "style", "nav", "footer", "header"]):
-                element.decompose()
-            text = " ".join(soup.stripped_strings)
+    def extract_text(self, html):
+        # crawling.extractor: stream — потоковый разбор с пропуском ненужных поддеревьев, bs4 — полное дерево
+        crawling = self.config["crawling"]
+        max_chars = crawling.get("max_text_chars", 200_000)
+        if crawling.get("extractor", "stream") == "stream":
+            return extract_text(html, max_chars)
+        soup = BeautifulSoup(html, "lxml")
+        for element in soup(["script", "style", "nav", "footer", "header"]):
+            element.decompose()
+        title = soup.title.text.strip() if soup.title else ""
+        return title, " ".join(soup.stripped_strings)[:max_chars]
+
+    def handle_page(self, url, html):
+        # Общая часть обоих движков обхода: извлечение текста, анализ, запись результата
+        with self.metrics.timer("extract"):
+            title, text = self.extract_text(html)
+        with self.metrics.timer("analyze"):
             analysis = self.analyze_content(text)
-            if self.filter_results(analysis):
-                service, snippet, volume = self.extract_details(text, url)
-                result = {
-                    "url": url,
-                    "service": service,
-                    "title": soup.title.text.strip() if soup.title else "",
-                    "snippet": snippet,
-                    "volume": volume,
-                    "analysis": analysis,
-                    "timestamp": datetime.now().isoformat()
-                }
+        self.metrics.inc("pages_processed")
+        result = None
+        if self.filter_results(analysis):
+            service, snippet, volume = self.extract_details(text, url)
+            result = {
+                "url": url,
+                "service": service,
+                "title": title,
+                "snippet": snippet,
+                "volume": volume,
+                "analysis": analysis,
+                "timestamp": datetime.now().isoformat()
+            }
+            self.metrics.inc("items_out")
+            print(f"Обнаружил утечки: {url}")
+        with self.results_lock:
+            if result:
                 self.results.append(result)
-                print(f"Обнаружил утечки: {url}")
             self.processed_urls.add(url)
+
+    def accept_response(self, url, status, headers, body):
+        """Решает по ответу и кэшу, нужно ли разбирать страницу. Общий для обоих движков."""
+        if status >= 400:
+            # Страница ошибки не анализируется и не отмечается обработанной: её проверят в следующий запуск
+            self.metrics.inc("http_errors")
+            print(f"Страница {url} недоступна: код {status}")
+            return False
+        if status == 304:
+            # Страница не изменилась с прошлой проверки: разбор и анализ не нужны
+            self.metrics.inc("cache_not_modified")
+            self.cache.touch(url)
+            self.processed_urls.add(url)
+            return False
+        if self.cache and status == 200:
+            if not self.cache.store(url, headers, body):
+                # Сервер не поддерживает валидаторы, но содержимое то же
+                self.metrics.inc("cache_unchanged")
+                self.processed_urls.add(url)
+                return False
+            self.metrics.inc("cache_stored")
+        return True
+
+    def request_headers(self, url):
+        headers = {"User-Agent": random.choice(self.config["user_agents"])}
+        if self.cache:
+            headers.update(self.cache.conditional_headers(url))
+        return headers
+
+    def fetch_page(self, url):
+        # Тело читается частями и обрезается на crawling.max_page_bytes
+        max_bytes = self.config["crawling"].get("max_page_bytes", 5_000_000)
+        with requests.get(
+            url,
+            headers=self.request_headers(url),
+            timeout=self.config["crawling"]["timeout"],
+            stream=True
+        ) as response:
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                body += chunk
+                if len(body) >= max_bytes:
+                    del body[max_bytes:]
+                    self.metrics.inc("responses_truncated")
+                    break
+            # Кодировка из Content-Type, только если она там указана явно
+            charset = response.encoding if "charset" in response.headers.get("Content-Type", "").lower() else None
+            return response.status_code, response.headers, bytes(body), charset
+
+    def process_page(self, url):
+        try:
+            self.metrics.inc("http_requests")
+            with self.metrics.timer("fetch"):
+                status, headers, body, charset = self.fetch_page(url)
+            self.metrics.inc("bytes_downloaded", len(body))
+            if not self.accept_response(url, status, headers, body):
+                return
+            self.handle_page(url, decode_html(body, charset))
         except Exception as e:
+            self.metrics.inc("page_errors")
             print(f"Произошла ошибка при обработке {url}: {e}")
 
+    def process_fetched(self, fetched):
+        # Вызывается асинхронным движком в потоке пула
+        try:
+            if not self.accept_response(fetched.url, fetched.status, fetched.headers, fetched.body):
+                return
+            self.handle_page(fetched.url, decode_html(fetched.body, fetched.charset))
+        except Exception as e:
+            self.metrics.inc("page_errors")
+            print(f"Произошла ошибка при обработке {fetched.url}: {e}")
+
+    def crawl_threads(self, urls):
+        threads = self.config["crawling"].get("threads", 5)
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            futures = {executor.submit(self.process_page, url): url for url in urls}
+            for idx, future in enumerate(tqdm(as_completed(futures), total=len(futures), desc="Обработка утечек")):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Произошла ошибка в потоке: {e}")
+                if (idx + 1) % 10 == 0:
+                    self.checkpoint()
+
+    def crawl_async(self, urls):
+        # aiohttp нужен только этому движку
+        from common.crawler import AsyncCrawler
+
+        crawling = self.config["crawling"]
+        crawler = AsyncCrawler(
+            concurrency=crawling.get("concurrency", 100),
+            per_host=crawling.get("per_host", 4),
+            delay_range=crawling.get("delay_range", [0, 0]),
+            timeout=crawling["timeout"],
+            max_bytes=crawling.get("max_page_bytes", 5_000_000),
+            user_agents=self.config["user_agents"],
+            workers=crawling.get("threads", 5),
+            metrics=self.metrics
+        )
+        progress = tqdm(total=len(urls), desc="Обработка утечек")
+        # Запись на диск и коммит SQLite не должны останавливать цикл событий
+        checkpoints = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint")
+
+        def on_done(url, error):
+            if error:
+                print(f"Произошла ошибка при обработке {url}: {error}")
+            progress.update(1)
+            if progress.n % 10 == 0:
+                checkpoints.submit(self.checkpoint)
+
+        try:
+            crawler.run(urls, self.process_fetched, on_done, self.cache.conditional_headers if self.cache else None)
+        finally:
+            checkpoints.shutdown(wait=True)
+            progress.close()
+
     def save_results(self):
         with open(RESULTS_PATH, "w", encoding="utf-8") as f:
             json.dump(self.results, f, indent=2, ensure_ascii=False)
 
+    def checkpoint(self):
+        # Под блокировкой потоки обработки не добавят страницу между записью результатов и коммитом
+        with self.results_lock:
+            self.save_results()
+            self.save_processed_urls()
+
     def run(self):
         # Очищаем старый статус перед началом
         self.save_status("Начал работу")
         print("Начал работу")
+        status = "Произошла ошибка"
         try:
             RESULTS_DIR.mkdir(parents=True, exist_ok=True)
-            new_urls = self.search_leak_references()
+            with self.metrics.timer("search_total"):
+                found_urls = self.search_leak_references()
+            new_urls = set(found_urls.values())
+            self.metrics.set("items_in", len(new_urls))
             print(f"В процессе выполнения... Найдено {len(new_urls)} потенциальных утечек")
 
-            if not new_urls:
-                self.save_status("Не обнаружил утечек")
-                print("Не обнаружил утечек")
+            # Уже обработанные страницы, которые пора перепроверить условным GET
+            revisit_urls = set()
+            if self.cache:
+                self.metrics.set("cache_pruned", self.cache.prune())
+                revisit_urls = {url for url in self.cache.due_urls() if self.canonical(url) not in found_urls}
+                self.metrics.set("revisits", len(revisit_urls))
+                if revisit_urls:
+                    print(f"Перепроверка {len(revisit_urls)} ранее обработанных страниц")
+            crawl_urls = new_urls | revisit_urls
+
+            if not crawl_urls:
+                status = "Не обнаружил утечек"
+                self.save_status(status)
+                print(status)
                 return
 
-            threads = self.config["crawling"].get("threads", 5)
-            with ThreadPoolExecutor(max_workers=threads) as executor:
-                futures = {executor.submit(self.process_page, url): url for url in new_urls}
-                for idx, future in enumerate(tqdm(as_completed(futures), total=len(futures), desc="Обработка утечек")):
-                    try:
-                        future.result()
-                    except Exception as e:
-                        print(f"Произошла ошибка в потоке: {e}")
-                    if (idx + 1) % 10 == 0:
-                        self.save_results()
-                        self.save_processed_urls()
+            # crawling.engine: threads — пул потоков с requests, async — AsyncCrawler
+            with self.metrics.timer("crawl_total"):
+                if self.config["crawling"].get("engine", "threads") == "async":
+                    self.crawl_async(crawl_urls)
+                else:
+                    self.crawl_threads(crawl_urls)
 
-            self.save_results()
-            self.save_processed_urls()
+            with self.metrics.timer("save"):
+                self.checkpoint()
             status = "Обнаружил утечки" if self.results else "Не обнаружил утечек"
             self.save_status(status)
             print(status)
-            self.save_status("Закончил работу успешно")
-            print("Закончил работу успешно")
+            status = "Закончил работу успешно"
+            self.save_status(status)
+            print(status)
         except Exception as e:
             self.save_status("Произошла ошибка", e)
             print(f"Произошла ошибка: {e}")
+        finally:
+            self.metrics.update("processed", self.processed_urls.stats())
+            self.metrics.write(status)
 
 if __name__ == "__main__":
     parser = LeakParser()